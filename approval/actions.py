@@ -7,9 +7,7 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
-from purchasing.models import Order
-
-from .models import Approval
+from .bulk import approve, approve_new_orders
 
 User = get_user_model()
 SITE_TITLE = getattr(settings, "SITE_TITLE", "BenchBaze")
@@ -20,106 +18,21 @@ SERVER_EMAIL_ADDRESS = getattr(settings, "SERVER_EMAIL_ADDRESS", "email@example.
 def approve_records(modeladmin, request, queryset):
     """Approve records"""
 
-    def approve_collection_model(approval):
-        """Approve a collection record that is not an oligo"""
-
-        obj = approval.content_object
-        if request.user.id in obj.formz_projects.all().values_list(
-            "project_leader__id", flat=True
-        ):
-            model = obj._meta.model
-            if approval.activity_type == "created":
-                if not obj.last_changed_approval_by_pi:
-                    model.objects.filter(id=obj.id).update(
-                        created_approval_by_pi=True,
-                        last_changed_approval_by_pi=True,
-                        approval_by_pi_date_time=now,
-                        approval_user=request.user,
-                    )
-                else:
-                    model.objects.filter(id=obj.id).update(
-                        created_approval_by_pi=True,
-                        approval_by_pi_date_time=now,
-                        approval_user=request.user,
-                    )
-            elif approval.activity_type == "changed":
-                model.objects.filter(id=obj.id).update(
-                    last_changed_approval_by_pi=True,
-                    approval_by_pi_date_time=now,
-                    approval_user=request.user,
-                )
-            approval.delete()
-            msg["success_message"] = True
-        else:
-            msg["warning_message"] = True
-
-    def approve_oligo(oligo_approval_record):
-        """Approve an oligo"""
-
-        oligo = oligo_approval_record.content_object
-        # New oligos
-        if oligo_approval_record.activity_type == "created":
-            if not oligo.last_changed_approval_by_pi:
-                oligo._meta.model.objects.filter(id=oligo.id).update(
-                    created_approval_by_pi=True,
-                    last_changed_approval_by_pi=True,
-                    approval_by_pi_date_time=now,
-                )
-            else:
-                oligo._meta.model.objects.filter(id=oligo.id).update(
-                    created_approval_by_pi=True,
-                    approval_by_pi_date_time=now,
-                )
-        # Existing changed oligos
-        elif oligo_approval_record.activity_type == "changed":
-            oligo._meta.model.objects.filter(id=oligo.id).update(
-                last_changed_approval_by_pi=True,
-                approval_by_pi_date_time=now,
-            )
-
-    now = timezone.now()
-    msg = {"success_message": False, "warning_message": False}
-
-    # Collection records
-    collection_approvals = queryset.filter(content_type__app_label="collection")
+    result = approve(queryset, request.user)
 
-    # Collection records, except oligos
-    [
-        approve_collection_model(approval)
-        for approval in collection_approvals.exclude(content_type__model="oligo")
-    ]
-
-    # Oligos
-    if request.user.is_pi:
-        oligo_approvals = collection_approvals.filter(content_type__model="oligo")
-        if oligo_approvals.exists():
-            [approve_oligo(oligo_approval) for oligo_approval in oligo_approvals]
-            oligo_approvals.delete()
-            msg["success_message"] = True
-    else:
-        messages.error(request, "You are not allowed to approve oligos")
-
-    # Orders
-    if request.user.is_pi:
-        order_approval_records = queryset.filter(content_type__app_label="purchasing")
-        if order_approval_records:
-            order_ids = order_approval_records.values_list("object_id", flat=True)
-            Order.objects.filter(id__in=order_ids).update(created_approval_by_pi=True)
-            order_approval_records.delete()
-            msg["success_message"] = True
-    else:
-        messages.error(request, "You are not allowed to approve orders")
-
-    if msg["success_message"]:
+    if result["approved"]:
         messages.success(request, "The records have been approved")
 
-    if msg["warning_message"]:
+    if result["not_project_leader"]:
         messages.warning(
             request,
             "Some/all of the records you have selected were not approved "
             "because you are not listed as a project leader for them",
         )
 
+    if result["not_pi"]:
+        messages.error(request, "You are not allowed to approve oligos or orders")
+
     return HttpResponseRedirect(".")
 
 
@@ -203,10 +116,7 @@ def approve_all_new_orders(modeladmin, request, queryset):
     """Approve all new orders"""
 
     if request.user.is_pi:
-        orders = Order.objects.filter(created_approval_by_pi=False)
-        if orders.exists():
-            orders.update(created_approval_by_pi=True)
-            Approval.objects.filter(content_type__app_label="purchasing").delete()
+        if approve_new_orders():
             messages.success(request, "New orders have been approved")
         else:
             messages.warning(request, "No new orders to approve")
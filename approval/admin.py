@@ -3,8 +3,6 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
 
-from purchasing.models import Order
-
 from .actions import approve_all_new_orders, approve_records, notify_user_edits_required
 from .search import (
     ActivityTypeFilter,
@@ -64,15 +62,23 @@ class ApprovalAdmin(admin.ModelAdmin):
             "action" in request.POST
             and request.POST["action"] == "approve_all_new_orders"
         ):
+            # The action approves the orders itself, run it without a
+            # selection by selecting across all approvals
             if not request.POST.getlist(admin.helpers.ACTION_CHECKBOX_NAME):
                 post = request.POST.copy()
-                for u in Order.objects.all():
-                    post.update({admin.helpers.ACTION_CHECKBOX_NAME: str(u.id)})
+                post["select_across"] = "1"
                 request._set_post(post)
         return super().changelist_view(request, extra_context=extra_context)
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        # Fetch the approved objects with one query per content type, rather
+        # than one per approval, and their cached content types
+        qs = (
+            super()
+            .get_queryset(request)
+            .select_related("content_type", "activity_user")
+            .prefetch_related("content_object")
+        )
 
         # If user is an Approval manager but not an elevated user
         # show only collection items, not orders
@@ -80,17 +86,11 @@ class ApprovalAdmin(admin.ModelAdmin):
         if request.user.is_elevated_user:
             return qs
         elif request.user.is_approval_manager:
-            qs = qs.filter(content_type__app_label="collection").exclude(
-                content_type__model="oligo"
-            )
-            approval_record_ids = []
-            for approval_record in qs:
-                obj = approval_record.content_object
-                if request.user.id in obj.formz_projects.all().values_list(
-                    "project_leader__id", flat=True
-                ):
-                    approval_record_ids.append(approval_record.id)
-            return qs.filter(id__in=approval_record_ids)
+            # Show only those for which the user is a project leader
+            return qs.filter(
+                content_type__app_label="collection",
+                project_leader_ids__contains=[request.user.id],
+            ).exclude(content_type__model="oligo")
         else:
             return qs
 
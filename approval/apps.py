@@ -1,5 +1,29 @@
 from django.apps import AppConfig
+from django.apps import apps as global_apps
+from django.db.models.signals import m2m_changed, post_delete
 
 
 class RecordApprovalConfig(AppConfig):
     name = "approval"
+
+    def ready(self):
+        from formz.models import Project
+
+        from .project_leaders import has_formz_projects
+        from .signals import (
+            formz_projects_changed_receiver,
+            project_leaders_changed_receiver,
+        )
+
+        # Keep the project leaders of approvals in sync with the FormZ
+        # projects of the approved objects and with the projects' leaders
+        for model in global_apps.get_models():
+            if has_formz_projects(model):
+                m2m_changed.connect(
+                    formz_projects_changed_receiver,
+                    sender=model.formz_projects.through,
+                )
+        m2m_changed.connect(
+            project_leaders_changed_receiver, sender=Project.project_leader.through
+        )
+        post_delete.connect(project_leaders_changed_receiver, sender=Project)
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from purchasing.models import Order
+
+from .models import Approval
+
+
+def _update_approved_objects(approvals, now, approval_user=None):
+    """
+    Mark the objects of approvals as approved by a PI, with one update per
+    model and activity type. For created objects, their last change is
+    approved too
+    """
+
+    object_ids = defaultdict(list)
+    for content_type_id, activity_type, object_id in approvals.values_list(
+        "content_type", "activity_type", "object_id"
+    ):
+        object_ids[(content_type_id, activity_type)].append(object_id)
+
+    fields = {"approval_by_pi_date_time": now, "last_changed_approval_by_pi": True}
+    if approval_user is not None:
+        fields["approval_user"] = approval_user
+    for (content_type_id, activity_type), ids in object_ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if activity_type == "created":
+            model._default_manager.filter(id__in=ids).update(
+                created_approval_by_pi=True, **fields
+            )
+        else:
+            model._default_manager.filter(id__in=ids).update(**fields)
+
+
+def approve(approvals, user):
+    """
+    Approve the records of approvals, a queryset, on behalf of user and delete
+    those approvals, in a single transaction. Collection records can only be
+    approved by their project leaders, oligos and orders only by PIs.
+
+    Return the number of approved records, and of those not approved because
+    user is not their project leader or not a PI
+    """
+
+    now = timezone.now()
+    result = {"approved": 0, "not_project_leader": 0, "not_pi": 0}
+
+    collection_approvals = approvals.filter(content_type__app_label="collection")
+    record_approvals = collection_approvals.exclude(content_type__model="oligo")
+    oligo_approvals = collection_approvals.filter(content_type__model="oligo")
+    order_approvals = approvals.filter(content_type__app_label="purchasing")
+
+    with transaction.atomic():
+        # Collection records, except oligos
+        approved_ids = list(
+            record_approvals.filter(project_leader_ids__contains=[user.id]).values_list(
+                "id", flat=True
+            )
+        )
+        result["not_project_leader"] = record_approvals.count() - len(approved_ids)
+        _update_approved_objects(
+            Approval.objects.filter(id__in=approved_ids), now, approval_user=user
+        )
+
+        if user.is_pi:
+            # Oligos
+            oligo_ids = list(oligo_approvals.values_list("id", flat=True))
+            _update_approved_objects(Approval.objects.filter(id__in=oligo_ids), now)
+
+            # Orders
+            order_ids = list(order_approvals.values_list("id", flat=True))
+            Order.objects.filter(
+                id__in=Approval.objects.filter(id__in=order_ids).values("object_id")
+            ).update(created_approval_by_pi=True)
+
+            approved_ids += oligo_ids + order_ids
+        else:
+            result["not_pi"] = oligo_approvals.count() + order_approvals.count()
+
+        result["approved"], _ = Approval.objects.filter(id__in=approved_ids).delete()
+
+    return result
+
+
+def approve_new_orders():
+    """Approve all new orders and delete their approvals, in a single
+    transaction. Return the number of approved orders"""
+
+    with transaction.atomic():
+        count = Order.objects.filter(created_approval_by_pi=False).update(
+            created_approval_by_pi=True
+        )
+        Approval.objects.filter(content_type__app_label="purchasing").delete()
+    return count
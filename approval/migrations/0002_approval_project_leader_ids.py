@@ -0,0 +1,74 @@
+# Generated by Django 4.2.17 on 2026-10-17 21:24
+
+from collections import defaultdict
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations, models
+
+
+def populate_project_leader_ids(apps, schema_editor):
+    Approval = apps.get_model("approval", "Approval")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for content_type in ContentType.objects.filter(
+        id__in=Approval.objects.values("content_type")
+    ):
+        try:
+            model = apps.get_model(content_type.app_label, content_type.model)
+            model._meta.get_field("formz_projects")
+        except (LookupError, FieldDoesNotExist):
+            continue
+        approvals = Approval.objects.filter(content_type=content_type)
+
+        # Project leaders by object, joining through formz_projects
+        project_leader_ids = defaultdict(set)
+        for object_id, user_id in (
+            model._default_manager.filter(
+                id__in=approvals.values("object_id"),
+                formz_projects__project_leader__isnull=False,
+            )
+            .values_list("id", "formz_projects__project_leader")
+            .distinct()
+        ):
+            project_leader_ids[object_id].add(user_id)
+
+        # One update per distinct set of project leaders, approvals of objects
+        # without any keep the empty default
+        object_ids = defaultdict(list)
+        for object_id, user_ids in project_leader_ids.items():
+            object_ids[tuple(sorted(user_ids))].append(object_id)
+        for user_ids, ids in object_ids.items():
+            approvals.filter(object_id__in=ids).update(
+                project_leader_ids=list(user_ids)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("approval", "0001_initial"),
+        ("collection", "0008_otherbacteriumstrain_otherbacteriumstraindoc_and_more"),
+        ("formz", "0004_remove_species_name_for_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="approval",
+            name="project_leader_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.PositiveIntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+                verbose_name="project leaders",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="approval",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["project_leader_ids"], name="approval_ap_project_79bd83_gin"
+            ),
+        ),
+        migrations.RunPython(populate_project_leader_ids, migrations.RunPython.noop),
+    ]
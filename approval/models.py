@@ -1,7 +1,11 @@
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from .project_leaders import get_project_leader_ids, has_formz_projects
+
 AUTH_USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")
 
 
@@ -22,7 +26,28 @@ class Approval(models.Model):
     message_date_time = models.DateTimeField(blank=True, null=True)
     edited = models.BooleanField("edited?", blank=True, default=False)
     created_date_time = models.DateTimeField(auto_now_add=True)
+    # Ids of the project leaders of the approved object's FormZ projects, kept
+    # in sync by the signal receivers in approval.signals
+    project_leader_ids = ArrayField(
+        models.PositiveIntegerField(),
+        verbose_name="project leaders",
+        blank=True,
+        default=list,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = "approval"
         verbose_name_plural = "approvals"
+        indexes = [GinIndex(fields=["project_leader_ids"])]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.project_leader_ids:
+            model = self.content_type.model_class()
+            if has_formz_projects(model):
+                self.project_leader_ids = sorted(
+                    get_project_leader_ids(
+                        model._default_manager.filter(id=self.object_id)
+                    ).get(self.object_id, ())
+                )
+        super().save(*args, **kwargs)
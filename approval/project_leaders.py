@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+
+
+def has_formz_projects(model):
+    """Check whether the objects of a model belong to FormZ projects"""
+
+    try:
+        model._meta.get_field("formz_projects")
+    except (AttributeError, FieldDoesNotExist):
+        return False
+    return True
+
+
+def get_project_leader_ids(objects):
+    """
+    Return the ids of the project leaders of the FormZ projects of objects,
+    a queryset, by object id, joining through formz_projects to
+    project_leader in one query
+    """
+
+    project_leader_ids = defaultdict(set)
+    for object_id, user_id in (
+        objects.filter(formz_projects__project_leader__isnull=False)
+        .values_list("id", "formz_projects__project_leader")
+        .distinct()
+    ):
+        project_leader_ids[object_id].add(user_id)
+    return project_leader_ids
+
+
+def update_project_leaders(approvals, content_type, model):
+    """
+    Store the ids of the project leaders of the approved objects in the
+    project_leader_ids of the approvals for a model, with one update per
+    distinct set of project leaders
+    """
+
+    approvals = approvals.filter(content_type=content_type)
+    project_leader_ids = get_project_leader_ids(
+        model._default_manager.filter(id__in=approvals.values("object_id"))
+    )
+
+    object_ids = defaultdict(list)
+    for object_id in approvals.values_list("object_id", flat=True).distinct():
+        object_ids[tuple(sorted(project_leader_ids.get(object_id, ())))].append(
+            object_id
+        )
+    for user_ids, ids in object_ids.items():
+        approvals.filter(object_id__in=ids).update(project_leader_ids=list(user_ids))
+
+
+def refresh_project_leaders(model=None, object_ids=None):
+    """
+    Refresh the project leaders of the approvals for the objects of model with
+    ids object_ids or, if they are None, for all objects of model or for all
+    objects that belong to FormZ projects
+    """
+
+    from .models import Approval
+
+    approvals = Approval.objects.all()
+    if object_ids is not None:
+        approvals = approvals.filter(object_id__in=object_ids)
+
+    if model is not None:
+        content_types = [ContentType.objects.get_for_model(model)]
+    else:
+        content_types = ContentType.objects.filter(
+            id__in=approvals.values("content_type")
+        )
+
+    for content_type in content_types:
+        model_class = content_type.model_class()
+        if has_formz_projects(model_class):
+            update_project_leaders(approvals, content_type, model_class)
@@ -19,18 +19,18 @@ class ContentTypeFilter(admin.SimpleListFilter):
 
         # Get content types for which approvals exist, and show them in order of model name
         approval_ct_ids = (
-            Approval.objects.all()
-            .values_list("content_type__id", "content_type__model")
+            Approval.objects.order_by("content_type__model")
+            .values_list("content_type", flat=True)
             .distinct()
-            .order_by("content_type__model")
-            .values_list("content_type__id", flat=True)
         )
-        # Get the content type names for the content type ids, and return as choices for the filter
+        # Get the content type names from the cached content types, and return as choices for the filter
         return tuple(
             (
                 str(ct_id),
                 capfirst(
-                    ContentType.objects.get(id=ct_id).model_class()._meta.verbose_name
+                    ContentType.objects.get_for_id(ct_id)
+                    .model_class()
+                    ._meta.verbose_name
                 ),
             )
             for ct_id in approval_ct_ids
@@ -0,0 +1,24 @@
+from .project_leaders import refresh_project_leaders
+
+
+def formz_projects_changed_receiver(
+    sender, instance, action, reverse, model, pk_set=None, **kwargs
+):
+    """Refresh the project leaders of the approvals for objects whose FormZ
+    projects change"""
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_project_leaders(instance._meta.model, [instance.pk])
+    else:
+        # instance is a project, model that of the objects added or removed
+        refresh_project_leaders(model, None if action == "post_clear" else pk_set)
+
+
+def project_leaders_changed_receiver(sender, action=None, **kwargs):
+    """Refresh the project leaders of all approvals when the leaders of a
+    project change or a project is deleted"""
+
+    if action is None or action in ("post_add", "post_remove", "post_clear"):
+        refresh_project_leaders()
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from collection.antibody.models import Antibody
 from collection.oligo.models import Oligo
@@ -335,3 +338,221 @@ class ApprovalEdgeCasesTest(TestCase):
 
         with self.assertRaises(ProtectedError):
             self.user.delete()
+
+
+class ApprovalProjectLeadersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import date
+
+        from django.contrib.auth.models import Group
+
+        from formz.models import Project
+
+        cls.user = User.objects.create_user(
+            email="leaders@example.com", password="password"
+        )
+        cls.leader = User.objects.create_user(
+            email="leader@example.com", password="password"
+        )
+        cls.leader.groups.add(
+            Group.objects.get_or_create(name=settings.APPROVAL_MANAGER_GROUP)[0]
+        )
+        cls.project = Project.objects.create(
+            title="Approval project",
+            short_title="Approval project",
+            short_title_english="Approval project",
+            safety_level=1,
+            beginning_work_date=date(2024, 1, 1),
+        )
+        cls.project.project_leader.add(cls.leader)
+
+    def _get_admin_queryset(self, user):
+        from django.contrib import admin
+        from django.test import RequestFactory
+
+        from .admin import ApprovalAdmin
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(id=user.id)
+        return ApprovalAdmin(Approval, admin.site).get_queryset(request)
+
+    def test_project_leaders_set_on_creation(self):
+        """Test project leaders are stored when an approval is created"""
+        plasmid = _make_plasmid(self.user)
+        plasmid.formz_projects.add(self.project)
+        approval = _make_approval(self.user, plasmid)
+        self.assertEqual(approval.project_leader_ids, [self.leader.id])
+
+    def test_project_leaders_follow_formz_projects(self):
+        """Test project leaders are refreshed when FormZ projects change"""
+        plasmid = _make_plasmid(self.user)
+        approval = _make_approval(self.user, plasmid)
+        self.assertEqual(approval.project_leader_ids, [])
+
+        plasmid.formz_projects.add(self.project)
+        approval.refresh_from_db()
+        self.assertEqual(approval.project_leader_ids, [self.leader.id])
+
+        plasmid.formz_projects.clear()
+        approval.refresh_from_db()
+        self.assertEqual(approval.project_leader_ids, [])
+
+    def test_project_leaders_follow_project(self):
+        """Test project leaders are refreshed when a project's leaders change"""
+        plasmid = _make_plasmid(self.user)
+        plasmid.formz_projects.add(self.project)
+        approval = _make_approval(self.user, plasmid)
+
+        self.project.project_leader.add(self.user)
+        approval.refresh_from_db()
+        self.assertEqual(
+            sorted(approval.project_leader_ids), sorted([self.leader.id, self.user.id])
+        )
+
+    def test_approval_manager_sees_own_projects_only(self):
+        """Test approval managers see only approvals of their projects, with a
+        query count independent of the number of approvals"""
+        own = [_make_plasmid(self.user, name=f"Own {i}") for i in range(3)]
+        for plasmid in own:
+            plasmid.formz_projects.add(self.project)
+        other = _make_plasmid(self.user, name="Other")
+        own_approvals = [_make_approval(self.user, plasmid) for plasmid in own]
+        _make_approval(self.user, other)
+
+        queryset = self._get_admin_queryset(self.leader)
+        with self.assertNumQueries(1):
+            approvals = list(queryset)
+        self.assertCountEqual(approvals, own_approvals)
+
+
+class ApprovalChangelistTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="changelist@example.com", password="password", is_superuser=True
+        )
+        for i in range(3):
+            _make_approval(cls.user, _make_plasmid(cls.user, name=f"Plasmid {i}"))
+            _make_approval(cls.user, _make_antibody(cls.user, name=f"Antibody {i}"))
+
+    def test_content_objects_fetched_per_content_type(self):
+        """Test the approved objects of the changelist are fetched with one
+        query per content type"""
+        from django.contrib import admin
+        from django.test import RequestFactory
+
+        from .admin import ApprovalAdmin
+
+        model_admin = ApprovalAdmin(Approval, admin.site)
+        request = RequestFactory().get("/")
+        request.user = self.user
+        # Resolve the user's roles and cache the content types beforehand
+        request.user.is_elevated_user
+        ContentType.objects.get_for_models(Plasmid, Antibody)
+
+        with self.assertNumQueries(3):
+            approvals = list(model_admin.get_queryset(request))
+            for approval in approvals:
+                model_admin.record_link(approval)
+                model_admin.history_link(approval)
+                model_admin.titled_content_type(approval)
+        self.assertEqual(len(approvals), 6)
+
+    def test_content_type_filter_lookups(self):
+        """Test the record type filter lists the approved models by name"""
+        from .search import ContentTypeFilter
+
+        lookups = ContentTypeFilter.lookups(None, None, None)
+        self.assertEqual([name for _, name in lookups], ["Antibody", "Plasmid"])
+
+
+class BulkApprovalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import date
+
+        from formz.models import Project
+
+        cls.user = User.objects.create_user(
+            email="bulkuser@example.com", password="password"
+        )
+        cls.pi = User.objects.create_user(
+            email="bulkpi@example.com", password="password", is_pi=True
+        )
+        cls.project = Project.objects.create(
+            title="Bulk project",
+            short_title="Bulk project",
+            short_title_english="Bulk project",
+            safety_level=1,
+            beginning_work_date=date(2024, 1, 1),
+        )
+        cls.project.project_leader.add(cls.pi)
+
+    def test_approve_records(self):
+        """Test records are approved by their project leaders, oligos by PIs,
+        and their approvals deleted"""
+        from .bulk import approve
+
+        created = [_make_plasmid(self.user, name=f"Created {i}") for i in range(3)]
+        changed = _make_plasmid(self.user, name="Changed")
+        other = _make_plasmid(self.user, name="Other")
+        for plasmid in created + [changed]:
+            plasmid.formz_projects.add(self.project)
+        oligo = _make_oligo(self.user)
+        for plasmid in created:
+            _make_approval(self.user, plasmid)
+        _make_approval(self.user, changed, activity_type="changed")
+        other_approval = _make_approval(self.user, other)
+        _make_approval(self.user, oligo)
+
+        result = approve(Approval.objects.all(), self.pi)
+
+        self.assertEqual(result["approved"], 5)
+        self.assertEqual(result["not_project_leader"], 1)
+        self.assertEqual(result["not_pi"], 0)
+        self.assertQuerySetEqual(Approval.objects.all(), [other_approval])
+        for plasmid in created:
+            plasmid.refresh_from_db()
+            self.assertTrue(plasmid.created_approval_by_pi)
+            self.assertTrue(plasmid.last_changed_approval_by_pi)
+            self.assertEqual(plasmid.approval_user, self.pi)
+        changed.refresh_from_db()
+        self.assertFalse(changed.created_approval_by_pi)
+        self.assertTrue(changed.last_changed_approval_by_pi)
+        oligo.refresh_from_db()
+        self.assertTrue(oligo.created_approval_by_pi)
+
+    def test_approve_oligos_requires_pi(self):
+        """Test oligos are not approved by users who are not PIs"""
+        from .bulk import approve
+
+        approval = _make_approval(self.user, _make_oligo(self.user))
+
+        result = approve(Approval.objects.all(), self.user)
+
+        self.assertEqual(result, {"approved": 0, "not_project_leader": 0, "not_pi": 1})
+        self.assertQuerySetEqual(Approval.objects.all(), [approval])
+
+    def test_approve_query_count_independent_of_records(self):
+        """Test the number of queries does not grow with the number of
+        approvals"""
+        from .bulk import approve
+
+        def approve_plasmids(count):
+            for i in range(count):
+                plasmid = _make_plasmid(self.user, name=f"Plasmid {count} {i}")
+                plasmid.formz_projects.add(self.project)
+                _make_approval(self.user, plasmid)
+            with CaptureQueriesContext(connection) as queries:
+                approve(Approval.objects.all(), self.pi)
+            return len(queries)
+
+        ContentType.objects.get_for_model(Plasmid)
+        self.assertEqual(approve_plasmids(2), approve_plasmids(10))
+
+    def test_approve_new_orders_without_orders(self):
+        """Test approving new orders when there are none"""
+        from .bulk import approve_new_orders
+
+        self.assertEqual(approve_new_orders(), 0)
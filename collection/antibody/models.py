@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db import models
 
 from common.models import DocFileMixin, DownloadFileNameMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     BaseCollectionModel,
@@ -41,6 +42,7 @@ class Antibody(
     class Meta:
         verbose_name = "antibody"
         verbose_name_plural = "antibodies"
+        indexes = get_trigram_indexes("antibody", ["id", "name"])
 
     _model_upload_to = "collection/antibody/"
 
@@ -71,6 +73,7 @@ class Antibody(
         "history_locations": "collection.LocationItem",
     }
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
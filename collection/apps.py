@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CollectionManagementConfig(AppConfig):
     name = "collection"
     verbose_name = "Collections"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -7,6 +7,7 @@ from import_export.fields import Field
 from simple_history.models import HistoricalRecords
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 from formz.models import ZkbsCellLine
 
 from ..shared.models import (
@@ -60,6 +61,7 @@ class CellLine(
     class Meta:
         verbose_name = "cell line"
         verbose_name_plural = "cell lines"
+        indexes = get_trigram_indexes("cellline", ["id", "name"])
 
     name = models.CharField("name", max_length=255, unique=True, blank=False)
     box_name = models.CharField("box", max_length=255, blank=False)
@@ -143,6 +145,7 @@ class CellLine(
     _is_guarded_model = True
     _related_name_base = "cellline"
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -236,7 +239,7 @@ class CellLine(
     _history_array_fields = {
         "history_integrated_plasmids": "collection.Plasmid",
         "history_episomal_plasmids": "collection.Plasmid",
-        "history_formz_projects": "forms.FormZProject",
+        "history_formz_projects": "formz.Project",
         "history_formz_gentech_methods": "formz.GenTechMethod",
         "history_sequence_features": "formz.SequenceFeature",
         "history_documents": "collection.CellLineDoc",
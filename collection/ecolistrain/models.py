@@ -1,6 +1,7 @@
 from django.db import models
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 from ..shared.models import (
     ApprovalFieldsMixin,
     BaseCollectionModel,
@@ -36,6 +37,7 @@ class EColiStrain(
     class Meta:
         verbose_name = "strain - E. coli"
         verbose_name_plural = "strains - E. coli"
+        indexes = get_trigram_indexes("ecolistrain", ["id", "name"])
 
     name = models.CharField("name", max_length=255, blank=False)
     resistance = models.CharField("resistance", max_length=255, blank=True)
@@ -81,6 +83,7 @@ class EColiStrain(
         + BaseCollectionModel._history_view_ignore_fields
     )
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db import models
 
 from common.models import DocFileMixin, DownloadFileNameMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     BaseCollectionModel,
@@ -37,6 +38,7 @@ class Inhibitor(
     class Meta:
         verbose_name = "inhibitor"
         verbose_name_plural = "inhibitors"
+        indexes = get_trigram_indexes("inhibitor", ["id", "name"])
 
     _model_upload_to = "collection/inhibitor/"
 
@@ -67,6 +69,7 @@ class Inhibitor(
         "history_locations": "collection.LocationItem",
     }
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -0,0 +1,422 @@
+# Generated by Django 4.2.17 on 2026-10-17 21:44
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("collection", "0008_otherbacteriumstrain_otherbacteriumstraindoc_and_more"),
+        ("common", "0006_trigram_extension"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="antibody",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="antibody_id_dac51d_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="antibody",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="antibody_name_290914_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cellline",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="cellline_id_6a8615_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cellline",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="cellline_name_0e96ac_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ecolistrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="ecolistrain_id_426959_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ecolistrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="ecolistrain_name_5ebaa5_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inhibitor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="inhibitor_id_515dc3_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inhibitor",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="inhibitor_name_4431ab_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="oligo",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="oligo_id_7862d1_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="oligo",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="oligo_name_5e91cc_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="otherbacteriumstrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="otherbacteri_id_32d380_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="otherbacteriumstrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="otherbacteri_name_d0a95b_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="plasmid",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="plasmid_id_406c79_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="plasmid",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="plasmid_name_f53542_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sacerevisiaestrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sacerevisiae_id_f10815_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sacerevisiaestrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sacerevisiae_name_9219f5_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scpombestrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="scpombestrai_id_bfcc80_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scpombestrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="scpombestrai_name_c36e05_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sirna",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sirna_id_8e637a_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sirna",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sirna_name_f8e378_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="virusinsect",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="virusinsect_id_e1d451_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="virusinsect",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="virusinsect_name_ac172c_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="virusmammalian",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="virusmammali_id_cd265f_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="virusmammalian",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="virusmammali_name_60f46d_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wormstrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="wormstrain_id_99c1b8_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wormstrain",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="wormstrain_name_665827_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wormstrainallele",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="wormstrainal_id_e2f8fa_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wormstrainallele",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "mutation", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="wormstrainal_mutat_a524ea_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wormstrainallele",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "transgene", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="wormstrainal_trans_9447af_trgm",
+            ),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
 from common.models import DocFileMixin, DownloadFileNameMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     ApprovalFieldsMixin,
@@ -42,6 +43,7 @@ class Oligo(
     class Meta:
         verbose_name = "oligo"
         verbose_name_plural = "oligos"
+        indexes = get_trigram_indexes("oligo", ["id", "name"])
 
     _model_upload_to = "collection/oligo/"
 
@@ -90,7 +92,7 @@ class Oligo(
     _show_formz = False
     _backup = True
     _history_array_fields = {
-        "history_sequence_features": "forms.SequenceFeature",
+        "history_sequence_features": "formz.SequenceFeature",
         "history_documents": "collection.OligoDoc",
         "history_locations": "collection.LocationItem",
     }
@@ -99,6 +101,7 @@ class Oligo(
         + BaseCollectionModel._history_view_ignore_fields
     )
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
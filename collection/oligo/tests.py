@@ -1,11 +1,20 @@
+import json
+import random
+import shutil
+import tempfile
+from pathlib import Path
 from unittest import skip
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.db import IntegrityError
-from django.test import TestCase
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
+from collection.shared.map_dna.utils import oligo_search
 from .models import Oligo, OligoDoc
 
 User = get_user_model()
@@ -303,6 +312,53 @@ class OligoModelTest(TestCase):
         self.assertIn("created_date_time", readonly)
 
 
+class OligoHistoryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="oligohistorytest@example.com", password="password"
+        )
+        self.oligo = _make_oligo(self.user)
+
+    def _rename(self, times):
+        for i in range(times):
+            self.oligo.name = f"Renamed {i}"
+            self.oligo._history_user = self.user
+            self.oligo.save()
+
+    def _get_name_changes(self, history_changes):
+        return [
+            field_change.new_value
+            for change in history_changes
+            for field_change in change.field_changes
+            if field_change.field.name == "name"
+        ]
+
+    def test_history_changes(self):
+        self._rename(3)
+        history_changes = self.oligo.history_changes
+        self.assertEqual(
+            self._get_name_changes(history_changes),
+            ["Renamed 2", "Renamed 1", "Renamed 0"],
+        )
+        self.assertEqual(history_changes[0].activity_user, self.user)
+
+    def test_history_changes_limit(self):
+        self._rename(5)
+        self.assertEqual(
+            self._get_name_changes(self.oligo.get_history_changes(limit=2, offset=1)),
+            ["Renamed 3", "Renamed 2"],
+        )
+
+    def test_history_queries_do_not_depend_on_number_of_changes(self):
+        self._rename(2)
+        with CaptureQueriesContext(connection) as few_changes:
+            self.oligo.history_changes
+        self._rename(10)
+        with CaptureQueriesContext(connection) as many_changes:
+            self.oligo.history_changes
+        self.assertEqual(len(few_changes), len(many_changes))
+
+
 class OligoDocModelTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -634,3 +690,165 @@ class OligoAPITest(APITestCase):
         if response.data["count"] > 0:
             item = response.data["results"][0]
             self.assertIn("created_by", item)
+
+
+class OligoIndexTest(SimpleTestCase):
+    """Tests for the oligo index used to find oligos in maps"""
+
+    def setUp(self):
+        self.index_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.index_dir, ignore_errors=True)
+        patcher = patch.object(oligo_search, "OLIGO_INDEX_DIR", self.index_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        oligo_search._write_index({"1": "ACGTACGTACGTACGTA"}, 1)
+
+    def _refresh(self, oligos):
+        with patch.object(oligo_search, "_get_searchable_oligos", return_value=oligos):
+            return oligo_search.refresh_oligo_index()
+
+    def test_refresh_adds_oligo_and_bumps_version(self):
+        self._refresh({"1": "ACGTACGTACGTACGTA", "2": "TTTTTTTTTTGGGGGGGGG"})
+        index = oligo_search.get_oligo_index()
+        self.assertEqual(index["version"], 2)
+        self.assertEqual(index["oligos"]["2"], "TTTTTTTTTTGGGGGGGGG")
+        self.assertEqual(index["seeds"]["CCCCCCCCCAAAAAA"], [["2", -1]])
+
+        export_path = oligo_search.get_oligo_export_path()
+        self.assertTrue(export_path.endswith("oligos.v2.snapgene.json"))
+        with open(export_path) as export_file:
+            self.assertEqual(
+                [o["Sequence"] for o in json.load(export_file)],
+                ["ACGTACGTACGTACGTA", "TTTTTTTTTTGGGGGGGGG"],
+            )
+        # The previous export is kept for requests that resolved its path
+        # before the update
+        self.assertTrue((self.index_dir / "oligos.v1.snapgene.json").exists())
+
+    def test_superseded_exports_deleted_after_grace_period(self):
+        self._refresh({"1": "ACGTACGTACGTACGTA", "2": "TTTTTTTTTTGGGGGGGGG"})
+        with patch.object(oligo_search, "OLIGO_EXPORT_GRACE_PERIOD", -1):
+            self._refresh({"3": "CCCCCCCCCCAAAAAAAAA"})
+        self.assertEqual(
+            [p.name for p in self.index_dir.glob("*.snapgene.json")],
+            ["oligos.v3.snapgene.json"],
+        )
+
+    def test_unchanged_oligos_do_not_bump_version(self):
+        self._refresh({"1": "ACGTACGTACGTACGTA"})
+        self.assertEqual(oligo_search.get_oligo_index()["version"], 1)
+
+    def test_no_oligos(self):
+        self._refresh({})
+        self.assertEqual(oligo_search.get_oligo_index()["oligos"], {})
+        with self.assertRaises(Exception):
+            oligo_search.get_oligo_export_path()
+
+    def test_matcher_loaded_from_stored_seeds(self):
+        self._refresh({"1": "ACGTACGTACGTACGTA", "2": "TTTTTTTTTTGGGGGGGGG"})
+        with patch.object(oligo_search, "_get_seeds") as get_seeds:
+            matcher = oligo_search.get_oligo_matcher()
+        get_seeds.assert_not_called()
+        self.assertEqual(
+            list(matcher.search("AA" + "CCCCCCCCCAAAAAAAAAA")),
+            [("2", 2, 21, -1)],
+        )
+
+
+class OligoIndexRefreshTest(TestCase):
+    def test_refresh_queued_once_for_many_changes(self):
+        from background_task.models import Task
+
+        user = User.objects.create_user(
+            email="oligoindex@example.com", password="password"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            oligo = Oligo.objects.create(
+                name="oIndex", sequence="ACGTACGTACGTACGTA", created_by=user
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            oligo.sequence = "TTTTTTTTTTGGGGGGGGG"
+            oligo.save()
+        self.assertEqual(
+            Task.objects.filter(
+                task_name=oligo_search.refresh_oligo_index_task.name
+            ).count(),
+            1,
+        )
+
+
+class OligoMatcherTest(SimpleTestCase):
+    """Tests for the native search of oligos in maps"""
+
+    OLIGOS = {
+        "1": "GGATCCAAGCTTGAATTC",
+        "2": "CATGCCATGGTACCGAGC",
+        # Palindromic
+        "3": "GAATTCAAGCTTGAATTC",
+    }
+
+    def _brute_force(self, sequence, circular):
+        sequence = sequence.upper()
+        length = len(sequence)
+        text = sequence + sequence if circular else sequence
+        matches = set()
+        for oligo_id, oligo in self.OLIGOS.items():
+            for strand, pattern in (
+                (1, oligo),
+                (-1, str(Seq(oligo).reverse_complement())),
+            ):
+                if strand == -1 and pattern == oligo:
+                    continue
+                for start in range(length):
+                    if text[start : start + len(pattern)] == pattern:
+                        matches.add((oligo_id, start, start + len(pattern), strand))
+        return matches
+
+    def test_same_matches_as_brute_force(self):
+        rng = random.Random(0)
+        matcher = oligo_search.OligoMatcher(self.OLIGOS)
+        for _ in range(20):
+            parts = []
+            for _ in range(6):
+                parts.append(
+                    "".join(rng.choice("ACGT") for _ in range(rng.randint(0, 40)))
+                )
+                oligo = rng.choice(list(self.OLIGOS.values()))
+                if rng.random() < 0.5:
+                    oligo = str(Seq(oligo).reverse_complement())
+                parts.append(oligo)
+            sequence = "".join(parts)
+            # Put part of an oligo across the origin
+            sequence = sequence[10:] + sequence[:10]
+            for circular in (False, True):
+                self.assertEqual(
+                    set(matcher.search(sequence, circular)),
+                    self._brute_force(sequence, circular),
+                )
+
+    def test_primer_features_added_to_seqrecord(self):
+        sequence = (
+            "TTGAATTC"
+            + "A" * 30
+            + str(Seq(self.OLIGOS["2"]).reverse_complement())
+            + "GGATCCAAGC"
+        )
+        seq_record = SeqRecord(Seq(sequence), annotations={"topology": "circular"})
+        with patch.object(
+            oligo_search,
+            "get_oligo_index",
+            return_value={"version": -1, "oligos": self.OLIGOS},
+        ):
+            oligo_search.find_oligos_in_seqrecord(seq_record)
+
+        features = {f.qualifiers["label"][0]: f for f in seq_record.features}
+        name_1, name_2 = (oligo_search.get_oligo_primer_name(i) for i in (1, 2))
+        self.assertEqual(set(features), {name_1, name_2})
+        self.assertEqual(features[name_2].location.strand, -1)
+        self.assertEqual(
+            str(features[name_2].extract(seq_record.seq)), self.OLIGOS["2"]
+        )
+        # Oligo 1 spans the origin
+        self.assertEqual(
+            str(features[name_1].extract(seq_record.seq)), self.OLIGOS["1"]
+        )
@@ -2,6 +2,7 @@ from django.db import models
 from import_export.fields import Field
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     ApprovalFieldsMixin,
@@ -40,6 +41,7 @@ class OtherBacteriumStrain(
     class Meta:
         verbose_name = "strain - Other Bacterium"
         verbose_name_plural = "strains - Other Bacterium"
+        indexes = get_trigram_indexes("otherbacteriumstrain", ["id", "name"])
 
     name = models.CharField("name", max_length=255, blank=False)
     species = models.ForeignKey(
@@ -78,6 +80,7 @@ class OtherBacteriumStrain(
         + BaseCollectionModel._history_view_ignore_fields
     )
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -12,8 +12,13 @@ from django.utils import timezone
 from django.utils.html import format_html
 
 from collection.shared.forms import PersistentClearableFileInput
+from collection.shared.map_dna.utils.cache import invalidate_map_dna_cache
 from collection.shared.map_dna.utils.common import get_map_dna_feature_names
 from collection.shared.map_dna.utils.detect_features import detect_map_dna_features
+from collection.shared.map_dna.utils.ove_json import (
+    delete_ove_json_rendition,
+    save_ove_json_rendition,
+)
 from common.admin import AddDocFileInlineMixin, DocFileInlineMixin
 from formz.models import SequenceFeature
 
@@ -184,10 +189,20 @@ class PlasmidAdmin(
                 f"{self.model._model_abbreviation}{LAB_ABBREVIATION_FOR_FILES}{obj.id}_{timestamp}{map_ext}",
             )
             new_dna_file_path = os.path.join(MEDIA_ROOT, new_dna_file_name)
+            invalidate_map_dna_cache(old_dna_file_path)
+            delete_ove_json_rendition(old_dna_file_path)
             os.rename(old_dna_file_path, new_dna_file_path)
             obj.map_dna.name = new_dna_file_name
             obj.save()
 
+            # Store the OVE JSON rendition of the map, so that the viewer does not
+            # have to convert it on every view. If this fails, it is created
+            # lazily on first view
+            try:
+                save_ove_json_rendition(new_dna_file_path)
+            except Exception as e:
+                logger.warning(f"Could not create OVE JSON rendition for map: {e}")
+
             # For new records
             # 1) delete first history record, which contains the unformatted map name
             # 2) change the newest history record's history_type from changed (~) to created (+)
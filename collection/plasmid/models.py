@@ -7,6 +7,7 @@ from django.db import models
 from import_export.fields import Field
 
 from common.models import DocFileMixin, DownloadFileNameMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     ApprovalFieldsMixin,
@@ -49,6 +50,7 @@ class Plasmid(
     class Meta:
         verbose_name = "plasmid"
         verbose_name_plural = "plasmids"
+        indexes = get_trigram_indexes("plasmid", ["id", "name"])
 
     _model_upload_to = "collection/plasmid/"
 
@@ -140,6 +142,7 @@ class Plasmid(
     _show_formz = True
     german_name = "Plasmid"
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -1,19 +1,57 @@
+import gzip
+import json
+import os
+import random
+import shutil
+import tempfile
 from unittest import skip
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
+import pandas as pd
+from Bio.Seq import Seq
+from Bio.SeqFeature import CompoundLocation, FeatureLocation, SeqFeature
+from Bio.SeqRecord import SeqRecord
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms import ValidationError
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 from common.admin_site import admin_site
 from common.model_clone import CustomClonableModelAdmin
 from collection.shared.admin import FieldSequenceFeature
-from formz.models import SequenceFeature
+from collection.shared.map_dna.plannotate.plannotate import (
+    resources as plannotate_resources,
+)
+from collection.shared.map_dna.snapgene import client_pool as snapgene_client_pool
+from collection.shared.map_dna.snapgene.utils import snapgene_request
+from collection.shared.map_dna.utils.cache import MapDnaCache
+from collection.shared.map_dna.utils.common import get_map_dna_seqrecord
+from collection.shared.map_dna.utils.ove_json import (
+    get_ove_json_rendition,
+    get_ove_json_rendition_path,
+    save_ove_json_rendition,
+)
+from collection.shared.map_dna.utils.detect_features import (
+    compare_seqrecord_features,
+    detect_map_dna_features,
+)
+from collection.shared.map_dna.views import convert_any_to_ove_json
+from formz.models import (
+    NucleicAcidPurity,
+    NucleicAcidRisk,
+    SequenceFeature,
+    SequenceFeatureAlias,
+    Species,
+)
 from .models import Plasmid, PlasmidDoc
 
 User = get_user_model()
 
+MAP_DNA_TEST_FILES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "shared/map_dna/parsers/gbk_for_testing",
+)
+
 
 def _make_plasmid(user, name="pUC19", **kwargs):
     defaults = {
@@ -155,15 +193,15 @@ class PlasmidModelTest(TestCase):
         p.refresh_from_db()
         self.assertEqual(p.name, "pGEX-6P-1 (α)")
 
-    def test_sequence_feature_get_options_does_not_use_limit_method(self):
-        """Test sequence feature suggestion options return a sliced list."""
+    def test_sequence_feature_get_options_returns_all_matches(self):
+        """Test sequence feature suggestion options are not truncated, they
+        are paginated by the suggestions view"""
         field = FieldSequenceFeature(model=Plasmid)
-        field.limit_options = 5
         for i in range(10):
             SequenceFeature.objects.create(name=f"pbb{i}", common_feature=True)
+        SequenceFeature.objects.create(name="xpbb", common_feature=True)
         options = field.get_options("pbb")
-        self.assertEqual(len(options), 6)
-        self.assertEqual(options[-1], "...")
+        self.assertEqual(options, [f"pbb{i}" for i in range(10)] + ["xpbb"])
 
     def test_very_long_name_within_limit(self):
         """Test name can be up to 255 characters"""
@@ -385,6 +423,40 @@ class PlasmidAPITest(APITestCase):
         response = self.client.get(f"{self.url}999999/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_autocomplete_cursor_pagination(self):
+        for i in range(4):
+            _make_plasmid(self.user, name=f"pCursor{i}")
+        expected = list(Plasmid.objects.order_by("-id").values_list("id", flat=True))
+
+        ids = []
+        url = f"{self.url}autocomplete/?pagination=cursor&limit=2&count=exact"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["count"], 5)
+            ids += [r["id"] for r in response.data["results"]]
+            previous_url = response.data["previous"]
+            url = response.data["next"]
+        self.assertEqual(ids, expected)
+
+        # Follow the previous link of the last page
+        response = self.client.get(previous_url)
+        self.assertEqual([r["id"] for r in response.data["results"]], expected[2:4])
+
+    @patch("common.viewsets.API_QUERY_COUNT_HEADER", True)
+    def test_autocomplete_query_count_does_not_depend_on_page_size(self):
+        response = self.client.get(f"{self.url}autocomplete/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        query_count = int(response["X-Query-Count"])
+
+        plasmids = [_make_plasmid(self.user, name=f"pQuery{i}") for i in range(5)]
+        response = self.client.get(f"{self.url}autocomplete/")
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertEqual(int(response["X-Query-Count"]), query_count)
+        self.assertEqual(
+            response.data["results"][0]["representation"], str(plasmids[-1])
+        )
+
     def test_retrieve_returns_complete_data(self):
         """Test that retrieve returns all plasmid fields"""
         p = _make_plasmid(
@@ -549,3 +621,392 @@ class PlasmidAPITest(APITestCase):
         response = self.client.get(f"{self.url}{p.id}/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["received_from"], "Addgene #12345")
+
+
+class MapDnaCacheTest(SimpleTestCase):
+    """Tests for the content-addressed map_dna parse cache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.map_path = os.path.join(self.tmp_dir, "p1.gbk")
+        shutil.copy(os.path.join(MAP_DNA_TEST_FILES_DIR, "1.gbk"), self.map_path)
+        self.cache = MapDnaCache(maxsize=2)
+
+    def test_repeated_reads_parse_once(self):
+        with patch(
+            "collection.shared.map_dna.utils.cache.get_map_dna_seqrecord",
+            wraps=get_map_dna_seqrecord,
+        ) as parser:
+            first = self.cache.get_seqrecord(self.map_path)
+            second = self.cache.get_seqrecord(self.map_path)
+        self.assertEqual(parser.call_count, 1)
+        self.assertEqual(str(first.seq), str(second.seq))
+        self.assertEqual(len(first.features), len(second.features))
+
+    def test_hits_return_independent_copies(self):
+        first = self.cache.get_seqrecord(self.map_path)
+        first.features = []
+        second = self.cache.get_seqrecord(self.map_path)
+        self.assertGreater(len(second.features), 0)
+
+    def test_changed_file_is_reparsed(self):
+        self.cache.get_seqrecord(self.map_path)
+        shutil.copy(os.path.join(MAP_DNA_TEST_FILES_DIR, "2.gbk"), self.map_path)
+        os.utime(self.map_path, ns=(0, 0))
+        self.assertEqual(
+            str(self.cache.get_seqrecord(self.map_path).seq),
+            str(get_map_dna_seqrecord(self.map_path).seq),
+        )
+
+    def test_invalidate_and_lru_eviction(self):
+        digest = self.cache.get_digest(self.map_path)
+        self.cache.get_seqrecord(self.map_path)
+        self.cache.invalidate(self.map_path)
+        self.assertNotIn(digest, self.cache._records)
+
+        for name in ("2.gbk", "3.gbk", "4.gbk"):
+            path = os.path.join(self.tmp_dir, name)
+            shutil.copy(os.path.join(MAP_DNA_TEST_FILES_DIR, name), path)
+            self.cache.get_seqrecord(path)
+        self.assertEqual(len(self.cache._records), 2)
+
+    def test_disk_store_survives_memory_clear(self):
+        disk_cache = MapDnaCache(
+            maxsize=2, disk_dir=os.path.join(self.tmp_dir, "cache")
+        )
+        disk_cache.get_seqrecord(self.map_path)
+        disk_cache.clear()
+        with patch(
+            "collection.shared.map_dna.utils.cache.get_map_dna_seqrecord"
+        ) as parser:
+            seq_record = disk_cache.get_seqrecord(self.map_path)
+        parser.assert_not_called()
+        self.assertGreater(len(seq_record.seq), 0)
+
+    def test_disk_store_evicts_least_recently_used(self):
+        disk_cache = MapDnaCache(
+            maxsize=2, disk_dir=os.path.join(self.tmp_dir, "cache"), disk_max_files=3
+        )
+        digests = [f"{i:02x}" * 32 for i in range(4)]
+        for digest in digests[:3]:
+            disk_cache._disk_set(digest, b"data")
+        for i, digest in enumerate(digests[:3]):
+            os.utime(disk_cache._disk_path(digest), ns=(i, i))
+        # Reading the oldest pickle makes it the most recently used
+        self.assertEqual(disk_cache._disk_get(digests[0]), b"data")
+
+        with patch.object(
+            disk_cache, "_disk_evict", wraps=disk_cache._disk_evict
+        ) as evict:
+            disk_cache._disk_set(digests[3], b"data")
+        evict.assert_called_once()
+        self.assertEqual(
+            [disk_cache._disk_path(d).exists() for d in digests],
+            [True, False, False, True],
+        )
+        self.assertEqual(disk_cache._disk_files, 2)
+
+    def test_derived_values_are_memoized(self):
+        func = Mock(return_value=[("a", "CDS", (0, 10, "+"))])
+        self.cache.get_derived(self.map_path, "features_simple", func)
+        self.cache.get_derived(self.map_path, "features_simple", func)
+        self.assertEqual(func.call_count, 1)
+
+
+class MapDnaOveJsonRenditionTest(SimpleTestCase):
+    """Tests for the persisted OVE JSON rendition of stored maps"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.media_root = os.path.join(self.tmp_dir, "uploads")
+        os.mkdir(self.media_root)
+        self.map_path = os.path.join(self.media_root, "p1.gbk")
+        shutil.copy(os.path.join(MAP_DNA_TEST_FILES_DIR, "1.gbk"), self.map_path)
+        for target, value in [
+            ("collection.shared.map_dna.views.BASE_DIR", self.tmp_dir),
+            ("collection.shared.map_dna.utils.ove_json.MEDIA_ROOT", self.media_root),
+        ]:
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.url = "/utils/map_dna/convert_any_to_ove_json/"
+
+    def test_rendition_is_stored_and_reused(self):
+        response = convert_any_to_ove_json(
+            self.factory.get(self.url, {"map_file_path": "uploads/p1.gbk"})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.exists(get_ove_json_rendition_path(self.map_path)))
+        stored_json = json.loads(
+            gzip.decompress(get_ove_json_rendition(self.map_path)[0])
+        )
+        self.assertEqual(json.loads(response.content), stored_json)
+
+        with patch(
+            "collection.shared.map_dna.utils.ove_json.map_file_to_ove_json"
+        ) as converter:
+            response = convert_any_to_ove_json(
+                self.factory.post(self.url, {"map_file_path": "uploads/p1.gbk"})
+            )
+        converter.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_not_modified(self):
+        response = convert_any_to_ove_json(
+            self.factory.get(self.url, {"map_file_path": "uploads/p1.gbk"})
+        )
+        response = convert_any_to_ove_json(
+            self.factory.get(
+                self.url,
+                {"map_file_path": "uploads/p1.gbk"},
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzip_served_when_accepted(self):
+        response = convert_any_to_ove_json(
+            self.factory.get(
+                self.url,
+                {"map_file_path": "uploads/p1.gbk"},
+                HTTP_ACCEPT_ENCODING="gzip",
+            )
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIsInstance(json.loads(gzip.decompress(response.content)), list)
+
+    def test_stale_rendition_is_regenerated(self):
+        get_ove_json_rendition(self.map_path)
+        rendition_path = get_ove_json_rendition_path(self.map_path)
+        os.utime(rendition_path, ns=(0, 0))
+        with patch(
+            "collection.shared.map_dna.utils.ove_json.save_ove_json_rendition",
+            return_value=b"",
+        ) as save:
+            get_ove_json_rendition(self.map_path)
+        save.assert_called_once_with(self.map_path)
+
+    def test_no_rendition_outside_media_root(self):
+        map_path = os.path.join(self.tmp_dir, "p2.gbk")
+        shutil.copy(self.map_path, map_path)
+
+        response = convert_any_to_ove_json(
+            self.factory.get(self.url, {"map_file_path": "p2.gbk"})
+        )
+        self.assertEqual(response.status_code, 405)
+        response = convert_any_to_ove_json(
+            self.factory.post(self.url, {"map_file_path": "p2.gbk"})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(os.path.exists(get_ove_json_rendition_path(map_path)))
+        with self.assertRaises(ValueError):
+            save_ove_json_rendition(map_path)
+
+
+class CompareSeqRecordFeaturesTest(SimpleTestCase):
+    """Tests for compare_seqrecord_features"""
+
+    @staticmethod
+    def _random_seqrecord(rng, n_features):
+        features = []
+        for _ in range(n_features):
+            start = rng.randint(0, 60)
+            end = start + rng.randint(1, 30)
+            strand = rng.choice([1, -1, None])
+            location = FeatureLocation(start, end, strand)
+            if rng.random() < 0.2:
+                location = CompoundLocation(
+                    [location, FeatureLocation(end + 5, end + 10, strand)]
+                )
+            features.append(SeqFeature(location, type=rng.choice(["CDS", "promoter"])))
+        return SeqRecord(Seq("A" * 200), features=features)
+
+    @staticmethod
+    def _compare_pairwise(seq_record_a, seq_record_b, fuzz=3):
+        """Reference implementation, comparing every pair of features"""
+
+        def span(feature):
+            parts = feature.location.parts
+            return (
+                min(int(p.start) for p in parts),
+                max(int(p.end) for p in parts),
+                feature.location.strand,
+            )
+
+        used_b = set()
+        matched_pairs = []
+        for feature_a in seq_record_a.features:
+            a_start, a_end, a_strand = span(feature_a)
+            for idx_b, feature_b in enumerate(seq_record_b.features):
+                b_start, b_end, b_strand = span(feature_b)
+                if (
+                    idx_b not in used_b
+                    and feature_a.type == feature_b.type
+                    and a_strand == b_strand
+                    and abs(a_start - b_start) <= fuzz
+                    and abs(a_end - b_end) <= fuzz
+                ):
+                    matched_pairs.append((feature_a, feature_b))
+                    used_b.add(idx_b)
+                    break
+        matched_a = [id(a) for a, _ in matched_pairs]
+        return {
+            "matched_pairs": matched_pairs,
+            "unique_in_a": [f for f in seq_record_a.features if id(f) not in matched_a],
+            "unique_in_b": [
+                f for i, f in enumerate(seq_record_b.features) if i not in used_b
+            ],
+        }
+
+    def test_same_result_as_pairwise_comparison(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            seq_record_a = self._random_seqrecord(rng, 40)
+            seq_record_b = self._random_seqrecord(rng, 40)
+            result = compare_seqrecord_features(seq_record_a, seq_record_b)
+            expected = self._compare_pairwise(seq_record_a, seq_record_b)
+            for key in expected:
+                self.assertEqual(
+                    [
+                        tuple(map(id, f)) if isinstance(f, tuple) else id(f)
+                        for f in result[key]
+                    ],
+                    [
+                        tuple(map(id, f)) if isinstance(f, tuple) else id(f)
+                        for f in expected[key]
+                    ],
+                )
+
+
+class DetectMapDnaFeaturesDatabaseTest(TestCase):
+    """Tests for the annotation of detected features with database information"""
+
+    def setUp(self):
+        purity = NucleicAcidPurity.objects.create(
+            english_name="Total RNA", german_name="Gesamt-RNA"
+        )
+        risk = NucleicAcidRisk.objects.create(english_name="Low", german_name="Niedrig")
+        self.labels = []
+        for i in range(5):
+            species = Species.objects.create(latin_name=f"Species {i}", risk_group=1)
+            feature = SequenceFeature.objects.create(
+                name=f"Feature {i}",
+                nuc_acid_purity=purity,
+                nuc_acid_risk=risk,
+                common_feature=bool(i % 2),
+            )
+            feature.donor_organism.add(species)
+            for j in range(2):
+                SequenceFeatureAlias.objects.create(
+                    label=f"alias {i}-{j}", sequence_feature=feature
+                )
+                self.labels.append(f"alias {i}-{j}")
+
+    def _seq_record(self):
+        features = [
+            SeqFeature(
+                FeatureLocation(i, i + 10, 1),
+                type="misc_feature",
+                qualifiers={"label": label},
+            )
+            for i, label in enumerate(self.labels + ["unknown"])
+        ]
+        return SeqRecord(
+            Seq("A" * 100), features=features, annotations={"topology": "circular"}
+        )
+
+    @patch(
+        "collection.shared.map_dna.utils.detect_features.annotation_service.annotate",
+        return_value=pd.DataFrame(columns=plannotate_resources.DF_COLS),
+    )
+    def test_constant_number_of_queries(self, annotate):
+        # One query for the aliases and their features, one for the donor species
+        with self.assertNumQueries(2):
+            seq_record = detect_map_dna_features(self._seq_record(), compare=False)
+
+        qualifiers = {f.qualifiers["label"]: f.qualifiers for f in seq_record.features}
+        self.assertNotIn("bb_feat_id", qualifiers["unknown"])
+        self.assertEqual(
+            qualifiers["alias 0-1"]["bb_feat_name"], "Feature 0 - Species 0"
+        )
+        self.assertEqual(qualifiers["alias 1-0"]["bb_feat_name"], "Feature 1")
+        self.assertEqual(qualifiers["alias 3-1"]["bb_feat_org"], "<i>Species 3</i>")
+        self.assertEqual(qualifiers["alias 3-1"]["bb_feat_org_risk"], "1")
+        self.assertEqual(qualifiers["alias 3-1"]["bb_feat_nuc_risk"], "Low")
+        self.assertEqual(qualifiers["alias 3-1"]["bb_feat_oncogene"], "none")
+
+
+class SnapGeneClientPoolTest(SimpleTestCase):
+    """Tests for the pooled SnapGene server clients"""
+
+    def setUp(self):
+        self.pool = snapgene_client_pool.SnapGeneClientPool()
+        self.clients = []
+
+        def make_client(port, context):
+            client = Mock(tcp_port=port)
+            client.requestResponse.return_value = {"code": 0, "port": port}
+            self.clients.append(client)
+            return client
+
+        for target, kwargs in (
+            ("Client", {"side_effect": make_client}),
+            ("Config", {}),
+        ):
+            patcher = patch.object(snapgene_client_pool, target, **kwargs)
+            mock = patcher.start()
+            self.addCleanup(patcher.stop)
+            if target == "Config":
+                mock.return_value.get_server_ports.return_value = {1: 5556, 2: 5557}
+
+    def test_clients_are_reused_and_balanced(self):
+        ports = [self.pool.request({"request": "x"})["port"] for _ in range(4)]
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(ports, [5556, 5557, 5556, 5557])
+
+    def test_client_replaced_after_error(self):
+        self.pool.request({"request": "x"})
+        # The first client was put back at the end of the queue
+        self.clients[1].requestResponse.side_effect = Exception("Request timeout")
+        with self.assertRaises(Exception):
+            self.pool.request({"request": "x"})
+        self.clients[1].close.assert_called_once()
+        self.assertEqual(len(self.clients), 3)
+        self.assertEqual(self.clients[2].tcp_port, 5557)
+
+    def test_port_queued_when_replacement_fails(self):
+        self.pool.request({"request": "x"})
+        self.clients[1].requestResponse.side_effect = Exception("Request timeout")
+        with patch.object(
+            snapgene_client_pool, "Client", side_effect=Exception("No server")
+        ):
+            with self.assertRaises(Exception):
+                self.pool.request({"request": "x"})
+        self.clients[1].close.assert_called_once()
+
+        # The closed client is not reused, a new one is created for its port
+        ports = [self.pool.request({"request": "x"})["port"] for _ in range(2)]
+        self.assertEqual(ports, [5556, 5557])
+        self.assertEqual(len(self.clients), 3)
+        self.clients[1].requestResponse.assert_called_once()
+
+    def test_snapgene_request_retries(self):
+        with patch(
+            "collection.shared.map_dna.snapgene.utils.snapgene_client_pool.request",
+            side_effect=[Exception("Request timeout"), {"code": 2}, {"code": 0}],
+        ):
+            messages = []
+            self.assertEqual(
+                snapgene_request({"request": "x"}, messages=messages), {"code": 0}
+            )
+        self.assertEqual(messages, ["x - Request timeout", "x - error 2"])
+
+        with patch(
+            "collection.shared.map_dna.snapgene.utils.snapgene_client_pool.request",
+            return_value={"code": 1},
+        ):
+            with self.assertRaises(snapgene_client_pool.SnapGeneServerError):
+                snapgene_request({"request": "x"})
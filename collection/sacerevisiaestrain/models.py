@@ -7,6 +7,7 @@ from django.forms import ValidationError
 from import_export.fields import Field
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     ApprovalFieldsMixin,
@@ -60,6 +61,7 @@ class SaCerevisiaeStrain(
     class Meta:
         verbose_name = "strain - Sa. cerevisiae"
         verbose_name_plural = "strains - Sa. cerevisiae"
+        indexes = get_trigram_indexes("sacerevisiaestrain", ["id", "name"])
 
     name = models.CharField("name", max_length=255, blank=False)
     relevant_genotype = models.CharField(
@@ -155,6 +157,7 @@ class SaCerevisiaeStrain(
     )
     _m2m_save_ignore_fields = ["history_all_plasmids_in_stocked_strain"]
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
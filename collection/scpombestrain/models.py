@@ -7,6 +7,7 @@ from django.forms import ValidationError
 from import_export.fields import Field
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     ApprovalFieldsMixin,
@@ -47,6 +48,7 @@ class ScPombeStrain(
     class Meta:
         verbose_name = "strain - Sc. pombe"
         verbose_name_plural = "strains - Sc. pombe"
+        indexes = get_trigram_indexes("scpombestrain", ["id", "name"])
 
     box_number = models.SmallIntegerField("box number", blank=False)
     parent_1 = models.ForeignKey(
@@ -123,6 +125,7 @@ class ScPombeStrain(
     }
     _m2m_save_ignore_fields = ["history_all_plasmids_in_stocked_strain"]
     _representation_field = "name"
+    _str_fields = ["id", "auxotrophic_marker", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
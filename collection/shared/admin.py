@@ -19,6 +19,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import re_path, reverse
 from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.text import smart_split, unescape_string_literal
 from djangoql.admin import DjangoQLSearchMixin
 from djangoql.schema import DateTimeField, IntField, StrField
 from guardian.admin import GuardedModelAdmin
@@ -38,7 +39,9 @@ from common.admin import (
     save_history_fields,
 )
 from common.model_clone import CustomClonableModelAdmin
+from common.quick_search import quick_search
 from common.search import check_search_length
+from common.suggestions import SuggestionIndex
 from formz.models import (
     Project as FormZProject,
 )
@@ -49,13 +52,12 @@ from formz.models import (
 
 from ..storage.models import LocationItem
 from .forms import LocationCheckNumberInlineFormSet
+from .models import FIND_OLIGOS_ENABLED
 
 User = get_user_model()
 MEDIA_ROOT = settings.MEDIA_ROOT
 LAB_ABBREVIATION_FOR_FILES = getattr(settings, "LAB_ABBREVIATION_FOR_FILES", "")
 
-SNAPGENE_ENABLED = getattr(settings, "SNAPGENE_ENABLED", False)
-
 
 ################################################
 #                Custom classes                #
@@ -193,7 +195,7 @@ class CollectionBaseAdmin(
 
     def change_view(self, request, object_id, form_url="", extra_context=None):
         extra_context = extra_context or {}
-        extra_context["snapgene_enabled"] = SNAPGENE_ENABLED
+        extra_context["snapgene_enabled"] = FIND_OLIGOS_ENABLED
 
         return super().change_view(request, object_id, form_url, extra_context)
 
@@ -218,6 +220,20 @@ class CollectionBaseAdmin(
         # Ensure that no duplicates are returned ever
         queryset = queryset.distinct()
 
+        # Use the quick search backend, instead of Django's default search,
+        # for each word of the search term
+        if self.search_mode_toggle_enabled() and not self.djangoql_search_enabled(
+            request
+        ):
+            search_fields = self.get_search_fields(request)
+            for bit in smart_split(search_term):
+                if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                    bit = unescape_string_literal(bit)
+                queryset = quick_search(
+                    queryset, bit, rank=False, search_fields=search_fields
+                )
+            return queryset, False
+
         return super().get_search_results(request, queryset, search_term)
 
 
@@ -679,14 +695,14 @@ class FieldFormZSpecies(StrField):
         self.show_for_model = show_for_model
 
     suggest_options = True
-    limit_options = 20
 
     def get_options(self, search):
         if default_option := check_search_length(search):
             return default_option
 
-        options = list(
-            Species.objects.filter(**{self.show_for_model: True})
+        return SuggestionIndex(
+            f"formz.species.{self.show_for_model}",
+            lambda: Species.objects.filter(**{self.show_for_model: True})
             .annotate(
                 unified_name=Coalesce(
                     NullIf("latin_name", Value("")),
@@ -695,16 +711,9 @@ class FieldFormZSpecies(StrField):
                     output_field=CharField(),
                 )
             )
-            .filter(unified_name__icontains=search)
-            .values_list("unified_name", flat=True)
-            .distinct()
-            .order_by("unified_name")[: self.limit_options + 1]
-        )
-        options = [option for option in options if option]
-
-        if len(options) > self.limit_options:
-            return options[: self.limit_options] + ["..."]
-        return options
+            .values_list("unified_name", flat=True),
+            [Species],
+        ).search(search)
 
     def get_lookup_name(self):
         return f"{self.name}__name_for_search"
@@ -727,21 +736,16 @@ class FieldParent2(IntField):
 class FieldSequenceFeature(StrField):
     name = "sequence_features_name"
     suggest_options = True
-    limit_options = 20
 
     def get_options(self, search):
         if default_option := check_search_length(search):
             return default_option
 
-        options = list(
-            SequenceFeature.objects.filter(name__icontains=search).values_list(
-                "name", flat=True
-            )[: self.limit_options + 1]
-        )
-
-        if len(options) > self.limit_options:
-            return options[: self.limit_options] + ["..."]
-        return options
+        return SuggestionIndex(
+            "formz.sequencefeature.name",
+            lambda: SequenceFeature.objects.values_list("name", flat=True),
+            [SequenceFeature],
+        ).search(search)
 
     def get_lookup_name(self):
         return "sequence_features__name"
@@ -1,5 +1,7 @@
 import shlex
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import NamedTemporaryFile
 
 import numpy as np
@@ -173,60 +175,54 @@ def clean(inDf):
         inDf = pd.DataFrame(columns=rsc.DF_COLS)
         return inDf
 
-    # create a conceptual sequence space
-    seqSpace = []
     end = int(inDf["qlen"][0])
 
     # for some reason some int columns are behaving as floats -- this converts them
     inDf = inDf.apply(pd.to_numeric, errors="ignore", downcast="integer")
 
-    for i in inDf.index:
-        # end    = inDf['qlen'][0]
-        wstart = inDf.loc[i]["wstart"]  # changed from qstart
-        wend = inDf.loc[i]["wend"]  # changed from qend
-
-        sseqid = [inDf.loc[i]["sseqid"]]
-
-        if wend < wstart:  # if hit crosses ori
-            left = (wend + 1) * [inDf.loc[i]["kind"]]
-            center = (wstart - wend - 1) * [None]
-            right = (end - wstart + 0) * [inDf.loc[i]["kind"]]
-        else:  # if normal
-            left = wstart * [None]
-            center = (wend - wstart + 1) * [inDf.loc[i]["kind"]]
-            right = (end - wend - 1) * [None]
-
-        seqSpace.append(sseqid + left + center + right)  # index, not append
-
-    seqSpace = pd.DataFrame(seqSpace, columns=["sseqid"] + list(range(0, end)))
-    seqSpace = seqSpace.set_index([seqSpace.index, "sseqid"])  # multi-indexed
     # filter through overlaps in sequence space
-    toDrop = set()
-    for i in range(len(seqSpace)):
-        if seqSpace.iloc[i].name in toDrop:
-            continue  # need to test speed
+    # rather than building a dense hits x plasmid length sequence space, each
+    # hit is represented by the (at most two) intervals it covers, which are
+    # compared with the columns of every kept hit in one vectorized step
+    # a hit is dropped if it covers, with the same kind, a column of a
+    # higher-ranked hit that was not dropped itself
+    wstart = inDf["wstart"].to_numpy()  # changed from qstart
+    wend = inDf["wend"].to_numpy()  # changed from qend
+    crosses_ori = wend < wstart
+    # empty intervals have start > end
+    covered = [
+        (np.where(crosses_ori, 0, wstart), wend),
+        (np.where(crosses_ori, wstart, 1), np.where(crosses_ori, end - 1, 0)),
+    ]
+
+    kinds = inDf["kind"]
+
+    toDrop = np.zeros(len(inDf), dtype=bool)
+    for i in range(len(inDf)):
+        if toDrop[i]:
+            continue
 
-        end = inDf["qlen"][0]  # redundant, but more readable
-        qstart = inDf.loc[seqSpace.iloc[i].name[0]]["qstart"]
-        qend = inDf.loc[seqSpace.iloc[i].name[0]]["qend"]
-        kind = inDf.loc[seqSpace.iloc[i].name[0]]["kind"]
+        qstart = inDf.at[i, "qstart"]
+        qend = inDf.at[i, "qend"]
+        kind = inDf.at[i, "kind"]
 
-        # columnSlice=seqSpace.columns[(seqSpace.iloc[i]==1)] #only columns of hit
         if qstart < qend:
-            columnSlice = list(range(qstart + 1, qend + 1))
+            columnSlices = [(qstart + 1, qend)]
         else:
-            columnSlice = list(range(0, qend + 1)) + list(range(qstart, end))
-
-        # only the rows that are in the columns of hit
-        rowSlice = (seqSpace[columnSlice] == kind).any(axis=1)
-        toDrop = toDrop | set(
-            seqSpace[rowSlice].loc[i + 1 :].index
-        )  # add the indexs below the current to the drop-set
-
-    seqSpace = seqSpace.drop(toDrop)
-    inDf = inDf.loc[
-        seqSpace.index.get_level_values(0)
-    ]  # needs shared index labels to work
+            columnSlices = [(0, qend), (qstart, end - 1)]
+
+        overlaps = np.zeros(len(inDf), dtype=bool)
+        for columnStart, columnEnd in columnSlices:
+            for coveredStart, coveredEnd in covered:
+                overlaps |= np.maximum(coveredStart, columnStart) <= np.minimum(
+                    coveredEnd, columnEnd
+                )
+        # NaN/None kinds never match, as in the dense sequence space
+        overlaps &= (kinds == kind).to_numpy()
+        overlaps[: i + 1] = False  # only the hits below the current one
+        toDrop |= overlaps
+
+    inDf = inDf.loc[~toDrop]
     inDf = inDf.reset_index(drop=True)
     # may need to run this with df that "passes" the origin
 
@@ -249,7 +245,11 @@ def get_details(inDf, yaml_file_loc):
         return gz_details
 
     # loop through databases
-    databases = rsc.get_yaml(yaml_file_loc)
+    # a parsed database config can be passed instead of the yaml location
+    if isinstance(yaml_file_loc, dict):
+        databases = yaml_file_loc
+    else:
+        databases = rsc.get_yaml(yaml_file_loc)
 
     assert (
         len(set(inDf["db"].to_list())) == 1
@@ -268,25 +268,20 @@ def get_details(inDf, yaml_file_loc):
     inDf["sseqid"] = inDf["sseqid"].str.replace(problem_name, r"\1", regex=True)
 
     db_details = database["details"]
+    details_file_loc = rsc.get_details_file_loc(database_name, db_details)
 
-    if db_details["location"] == "None":
+    if details_file_loc is None:
         # if no file is passed, data should already be in dataframe
         feat_desc = inDf.loc[inDf["db"] == database_name][
             ["sseqid", "Feature", "Description"]
         ]
 
     else:
-        if db_details["location"] == "Default":
-            details_file_loc = rsc.get_details(database_name) + ".csv"
-        else:  # if a file path is passed, use that
-            details_file_loc = db_details["location"]
-
         # if the description file is compressed
         if db_details["compressed"] is True:
-            details_file_loc += ".gz"
             feat_desc = parse_gz(sseqids, details_file_loc)
         else:  # if it is uncompressed
-            feat_desc = pd.read_csv(details_file_loc)
+            feat_desc = rsc.get_details_csv(details_file_loc)
 
         # bespoke extraction of swissprot protein exisitence level
         if database_name == "swissprot":
@@ -324,73 +319,80 @@ def get_details(inDf, yaml_file_loc):
     return feat_desc
 
 
-def cache(*args, **kwargs):
-    def decorator(func):
-        return func
-
-    return decorator
-
-
-@cache(
-    hash_funcs={pd.DataFrame: lambda _: None},
-    suppress_st_warning=True,
-    max_entries=10,
-    show_spinner=False,
-)
-def get_raw_hits(query, linear, yaml_file_loc):
-    progress_amt = 5
-
+def get_raw_hits(query, linear, yaml_file_loc, max_workers=None):
     databases = rsc.get_yaml(yaml_file_loc)
-    increment = int(90 / len(databases))
 
-    raw_hits = []
-    for database_name in databases:
-        database = databases[database_name]
-        hits = BLAST(seq=query, db=database)
+    # each database search is a separate, blocking subprocess,
+    # so run them concurrently, at most max_workers at a time
+    # (all at once if None, one after the other if 1)
+    # the time spent on each database is stored in attrs["db_timings"]
+    def timed_database_hits(database_name):
+        start = time.perf_counter()
+        hits = get_database_hits(query, linear, database_name, databases[database_name])
+        return hits, time.perf_counter() - start
+
+    max_workers = max_workers or max(len(databases), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(timed_database_hits, databases))
+
+    db_timings = {
+        database_name: elapsed
+        for database_name, (_, elapsed) in zip(databases, results)
+    }
+    raw_hits = [hits for hits, _ in results if hits is not None]
+
+    if len(raw_hits) == 0:
+        blastDf = pd.DataFrame()
+        blastDf.attrs["db_timings"] = db_timings
+        return blastDf
 
-        hits["db"] = database_name
-        hits["sseqid"] = hits["sseqid"].astype(str)
+    blastDf = pd.concat(raw_hits)
 
-        if hits.empty:
-            continue
+    blastDf = blastDf.sort_values(
+        by=["score", "length", "percmatch"], ascending=[False, False, False]
+    )
+    blastDf.attrs["db_timings"] = db_timings
+    return blastDf
 
-        feat_descriptions = get_details(hits, yaml_file_loc)
-        # `suffixes = ('_x', None)` means the descriptions for Rfam will be copied,
-        # the original descriptions will be appeneded with `_x` and can be ignored
-        # the Rfam descriptions are in the original df due to the quirks of how the details
-        # are stored, so this is a work around. Possibly condsider dropping the `_x`` column
-        hits = hits.merge(
-            feat_descriptions, on="sseqid", how="left", suffixes=("_x", None)
-        )
-        hits = hits[hits.columns.drop(list(hits.filter(regex="_x")))]
 
-        # removes primer binding site annotations
-        hits = hits.loc[hits["Type"] != "primer_bind"]
+def get_database_hits(query, linear, database_name, database):
+    hits = BLAST(seq=query, db=database)
 
-        hits["priority"] = database["priority"]
-        try:
-            hits["priority"] = hits["priority"] + hits["priority_mod"]
-            hits = hits.drop("priority_mod", axis=1)
-        except KeyError:
-            pass
-        hits = calculate(hits, is_linear=linear)
+    hits["db"] = database_name
+    hits["sseqid"] = hits["sseqid"].astype(str)
 
-        raw_hits.append(hits)
+    if hits.empty:
+        return None
 
-        progress_amt += increment
+    feat_descriptions = get_details(hits, {database_name: database})
+    # `suffixes = ('_x', None)` means the descriptions for Rfam will be copied,
+    # the original descriptions will be appeneded with `_x` and can be ignored
+    # the Rfam descriptions are in the original df due to the quirks of how the details
+    # are stored, so this is a work around. Possibly condsider dropping the `_x`` column
+    hits = hits.merge(feat_descriptions, on="sseqid", how="left", suffixes=("_x", None))
+    hits = hits[hits.columns.drop(list(hits.filter(regex="_x")))]
 
-    if len(raw_hits) == 0:
-        return pd.DataFrame()
+    # removes primer binding site annotations
+    hits = hits.loc[hits["Type"] != "primer_bind"]
 
-    blastDf = pd.concat(raw_hits)
+    hits["priority"] = database["priority"]
+    try:
+        hits["priority"] = hits["priority"] + hits["priority_mod"]
+        hits = hits.drop("priority_mod", axis=1)
+    except KeyError:
+        pass
+    hits = calculate(hits, is_linear=linear)
 
-    blastDf = blastDf.sort_values(
-        by=["score", "length", "percmatch"], ascending=[False, False, False]
-    )
-    return blastDf
+    return hits
 
 
-def annotate(inSeq, yaml_file=rsc.get_yaml_path(), linear=False, is_detailed=False):
+def annotate(
+    inSeq,
+    yaml_file=rsc.get_yaml_path(),
+    linear=False,
+    is_detailed=False,
+    max_workers=None,
+):
     # This catches errors in sequence via Biopython
     fileloc = NamedTemporaryFile()
     SeqIO.write(
@@ -411,10 +413,12 @@ def annotate(inSeq, yaml_file=rsc.get_yaml_path(), linear=False, is_detailed=Fal
     else:
         raise ValueError("linear must be a boolean")
 
-    blastDf = get_raw_hits(query, linear, yaml_file)
+    blastDf = get_raw_hits(query, linear, yaml_file, max_workers=max_workers)
+    db_timings = blastDf.attrs.get("db_timings", {})
 
     if blastDf.empty:  # if no hits are found
         blastDf = pd.DataFrame(columns=rsc.DF_COLS)
+        blastDf.attrs["db_timings"] = db_timings
         return blastDf
 
     # this has to re-parse the yaml, so not an elegant solution
@@ -427,6 +431,7 @@ def annotate(inSeq, yaml_file=rsc.get_yaml_path(), linear=False, is_detailed=Fal
 
     if blastDf.empty:  # if no hits are found
         blastDf = pd.DataFrame(columns=rsc.DF_COLS)
+        blastDf.attrs["db_timings"] = db_timings
         return blastDf
 
     def is_fragment(feature):
@@ -449,6 +454,7 @@ def annotate(inSeq, yaml_file=rsc.get_yaml_path(), linear=False, is_detailed=Fal
 
     if blastDf.empty:  # if no hits are found
         blastDf = pd.DataFrame(columns=rsc.DF_COLS)
+        blastDf.attrs["db_timings"] = db_timings
         return blastDf
 
     blastDf["qend"] = blastDf["qend"] + 1  # corrects position for gbk
@@ -468,4 +474,5 @@ def annotate(inSeq, yaml_file=rsc.get_yaml_path(), linear=False, is_detailed=Fal
     blastDf["Description"] = blastDf["Description"].fillna("")
     blastDf["Type"] = blastDf["Type"].fillna("misc_feature")
 
+    blastDf.attrs["db_timings"] = db_timings
     return blastDf
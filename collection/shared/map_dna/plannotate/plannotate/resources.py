@@ -1,7 +1,12 @@
+import copy
+import glob
+import hashlib
 import os
 import subprocess
 import sys
+import time
 from datetime import date
+from functools import lru_cache
 from importlib.resources import files
 from tempfile import NamedTemporaryFile
 
@@ -299,6 +304,14 @@ def get_clean_csv_df(recordDf):
 
 
 def get_yaml(yaml_file_loc):
+    # parsed yaml is cached per file version; return a copy so that callers
+    # can't alter the cached config
+    mtime = os.stat(yaml_file_loc).st_mtime_ns
+    return copy.deepcopy(_parse_yaml(yaml_file_loc, mtime))
+
+
+@lru_cache(maxsize=8)
+def _parse_yaml(yaml_file_loc, mtime):
     # file_name = get_resource("data", "databases.yml")
     with open(yaml_file_loc) as f:
         dbs = yaml.load(f, Loader=yaml.SafeLoader)
@@ -327,6 +340,49 @@ def get_yaml(yaml_file_loc):
     return dbs
 
 
+def get_details_csv(details_file_loc):
+    # details CSVs are static, cache them per file version and
+    # return a copy, as callers add columns
+    mtime = os.stat(details_file_loc).st_mtime_ns
+    return _read_details_csv(details_file_loc, mtime).copy()
+
+
+@lru_cache(maxsize=16)
+def _read_details_csv(details_file_loc, mtime):
+    return pd.read_csv(details_file_loc)
+
+
+def get_details_file_loc(database_name, db_details):
+    if db_details["location"] == "None":
+        return None
+    elif db_details["location"] == "Default":
+        details_file_loc = get_details(database_name) + ".csv"
+    else:  # if a file path is passed, use that
+        details_file_loc = db_details["location"]
+
+    # if the description file is compressed
+    if db_details["compressed"] is True:
+        details_file_loc += ".gz"
+
+    return details_file_loc
+
+
+def preload_databases(yaml_file_loc=None):
+    # parses the database config and loads the uncompressed details CSVs,
+    # so that long-lived processes don't pay for it on every annotation
+    if yaml_file_loc is None:
+        yaml_file_loc = get_yaml_path()
+
+    databases = get_yaml(yaml_file_loc)
+    for database_name, database in databases.items():
+        db_details = database["details"]
+        details_file_loc = get_details_file_loc(database_name, db_details)
+        if details_file_loc and db_details["compressed"] is not True:
+            get_details_csv(details_file_loc)
+
+    return databases
+
+
 def databases_exist():
     return os.path.exists(f"{ROOT_DIR}/data/BLAST_dbs/")
 
@@ -364,3 +420,53 @@ def download_databases():
 
     print("Done.")
     print()
+
+
+# seconds for which the databases digest is reused, as long as the database
+# config is unchanged, rather than globbing and stat'ing every database file
+DATABASES_DIGEST_TTL = 60
+
+# digests by database config file: (config mtime, time computed, digest)
+_databases_digests = {}
+
+
+def get_databases_digest(yaml_file_loc=None, ttl=DATABASES_DIGEST_TTL):
+    # fingerprint of the database config and of the database and details
+    # files it points to, changes whenever any of them is edited or rebuilt.
+    # Changes to the config are picked up right away, rebuilt database files
+    # after at most ttl seconds
+    if yaml_file_loc is None:
+        yaml_file_loc = get_yaml_path()
+
+    mtime = os.stat(yaml_file_loc).st_mtime_ns
+    now = time.monotonic()
+    cached = _databases_digests.get(yaml_file_loc)
+    if cached and cached[0] == mtime and now - cached[1] < ttl:
+        return cached[2]
+
+    digest = _compute_databases_digest(yaml_file_loc)
+    _databases_digests[yaml_file_loc] = (mtime, now, digest)
+    return digest
+
+
+def _compute_databases_digest(yaml_file_loc):
+    digest = hashlib.sha256()
+    with open(yaml_file_loc, "rb") as f:
+        digest.update(f.read())
+
+    paths = []
+    for database_name, database in get_yaml(yaml_file_loc).items():
+        for db_loc in database["db_loc"].split(" "):
+            paths.extend(glob.glob(glob.escape(db_loc) + "*"))
+        details_file_loc = get_details_file_loc(database_name, database["details"])
+        if details_file_loc:
+            paths.append(details_file_loc)
+
+    for path in sorted(set(paths)):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+
+    return digest.hexdigest()
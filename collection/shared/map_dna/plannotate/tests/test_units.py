@@ -20,6 +20,51 @@ def test_yaml():
     assert isinstance(snapgene_db, dict)
 
 
+def _hit(sseqid, qstart, qend, kind, evalue=0.0, pi_permatch=100.0):
+    return {
+        "sseqid": sseqid,
+        "qstart": qstart,
+        "qend": qend,
+        "length": qend - qstart + 1,
+        "qlen": 1000,
+        "evalue": evalue,
+        "pi_permatch": pi_permatch,
+        "score": 1.0,
+        "percmatch": 100.0,
+        "wiggle": 0,
+        "wstart": qstart,
+        "wend": qend,
+        "kind": kind,
+    }
+
+
+def test_clean():
+    # hits are ranked, a hit is dropped if it overlaps, with the same kind, a
+    # higher-ranked hit that is kept
+    hits = pd.DataFrame(
+        [
+            _hit("A", 100, 399, "CDS"),
+            _hit("B", 350, 500, "CDS"),  # overlaps A
+            _hit("C", 350, 500, "promoter"),  # overlaps A, other kind
+            _hit("D", 900, 1099, "terminator"),  # crosses the origin
+            _hit("E", 50, 80, "terminator"),  # overlaps D after the origin
+            _hit("F", 600, 700, "CDS", evalue=2.0),
+            _hit("G", 600, 700, "CDS", pi_permatch=2.0),
+            _hit("ISS", 700, 800, "CDS"),  # problem hit
+            _hit("J", 400, 450, "CDS"),  # overlaps only B, which is dropped
+            _hit("K", 60, 100, "CDS"),  # ends at the first base of A
+            _hit("L", 1950, 1990, "misc_feature"),  # second copy of the plasmid
+        ]
+    )
+
+    cleaned = annotate.clean(hits)
+
+    assert cleaned["sseqid"].tolist() == ["A", "C", "D", "J", "K", "L"]
+    assert cleaned["qstart"].tolist() == [100, 350, 900, 400, 60, 950]
+    assert cleaned["qend"].tolist() == [399, 500, 99, 450, 100, 990]
+    assert cleaned.index.tolist() == list(range(6))
+
+
 def test_BLAST():
     db_meta = resources.get_yaml(resources.get_yaml_path())
     snapgene_db = db_meta["snapgene"]
@@ -0,0 +1,87 @@
+import os
+import queue
+import threading
+
+import zmq
+
+from .pyclasses.client import Client
+from .pyclasses.config import Config
+
+
+class SnapGeneServerError(Exception):
+    """Raised when a request to the SnapGene server fails"""
+
+
+class SnapGeneClientPool:
+    """Long-lived clients for the SnapGene servers enabled in the SnapGene
+    server config, one per server port.
+
+    Like MutliClient, requests are sent to whichever server is idle. When all
+    of them are busy, a request waits for the first one to become available"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._context = None
+        self._idle = None
+
+    def _setup(self):
+        with self._lock:
+            # ZMQ contexts must not be shared across forked processes
+            if self._pid == os.getpid():
+                return
+
+            server_ports = Config().get_server_ports()
+            if not server_ports:
+                raise SnapGeneServerError("No SnapGene server is configured")
+
+            self._context = zmq.Context()
+            self._idle = queue.Queue()
+            for port in server_ports.values():
+                self._idle.put(Client(port, self._context))
+            self._pid = os.getpid()
+
+    def request(self, argument, timeout=10000):
+        """Send a request to an idle server and return its response. The timeout
+        is in milliseconds and also applies to waiting for an idle server"""
+
+        self._setup()
+
+        try:
+            client = self._idle.get(timeout=timeout / 1000)
+        except queue.Empty:
+            raise SnapGeneServerError("All SnapGene servers are busy")
+
+        port = client if isinstance(client, int) else client.tcp_port
+        try:
+            if isinstance(client, int):
+                # Creating the client of this server failed before, retry
+                client = None
+                client = Client(port, self._context)
+            return client.requestResponse(argument, timeout)
+        except Exception:
+            if client is not None:
+                # A REQ socket that did not receive a reply cannot send
+                # another request, therefore replace the client
+                client.close()
+                try:
+                    client = Client(port, self._context)
+                except Exception:
+                    client = None
+            raise
+        finally:
+            # Queue the port instead of a client that could not be created,
+            # so that the next request for this server creates it
+            self._idle.put(client if client is not None else port)
+
+    def close(self):
+        with self._lock:
+            if self._idle is not None:
+                while not self._idle.empty():
+                    client = self._idle.get_nowait()
+                    if not isinstance(client, int):
+                        client.close()
+            self._pid = None
+
+
+snapgene_client_pool = SnapGeneClientPool()
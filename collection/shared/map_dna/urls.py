@@ -1,7 +1,12 @@
 from django.contrib.auth.decorators import login_required
 from django.urls import path
 
-from .views import convert_any_to_ove_json, create_map_file, find_oligos_in_map
+from .views import (
+    convert_any_to_ove_json,
+    create_map_file,
+    find_oligos_in_map,
+    snapgene_job,
+)
 
 urlpatterns = [
     path(
@@ -19,4 +24,9 @@ urlpatterns = [
         login_required(find_oligos_in_map),
         name="find_oligos_in_map",
     ),
+    path(
+        "snapgene_job/<str:job_id>/",
+        login_required(snapgene_job),
+        name="snapgene_job",
+    ),
 ]
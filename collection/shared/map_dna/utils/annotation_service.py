@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..plannotate.plannotate import resources as plannotate_resources
+from ..plannotate.plannotate.annotate import annotate as plannotate_annotate
+
+logger = logging.getLogger("logfile")
+
+PLANNOTATE_POOL_WORKERS = getattr(settings, "PLANNOTATE_POOL_WORKERS", 2)
+PLANNOTATE_POOL_MAX_QUEUE = getattr(settings, "PLANNOTATE_POOL_MAX_QUEUE", 8)
+PLANNOTATE_POOL_TIMEOUT = getattr(settings, "PLANNOTATE_POOL_TIMEOUT", 300)
+# Max number of databases searched concurrently per annotation, None for all
+PLANNOTATE_MAX_PARALLEL_SEARCHES = getattr(
+    settings, "PLANNOTATE_MAX_PARALLEL_SEARCHES", None
+)
+# Cache that stores annotation results, None to disable caching. Its size is
+# bounded by the cache's own settings, e.g. MAX_ENTRIES, and it can be a
+# file-based cache to share results between processes
+PLANNOTATE_CACHE = getattr(settings, "PLANNOTATE_CACHE", "default")
+PLANNOTATE_CACHE_TIMEOUT = getattr(settings, "PLANNOTATE_CACHE_TIMEOUT", 604800)
+
+
+class AnnotationServiceBusy(Exception):
+    """Raised when the annotation queue is full"""
+
+
+class AnnotationService:
+    """Long-lived pool of plannotate worker processes.
+
+    Workers are spawned once, preload the database config and details CSVs,
+    and are then reused by every web request, which submit their sequences
+    through a bounded queue. When the queue is full, requests fail fast with
+    AnnotationServiceBusy instead of piling up BLAST subprocesses. With
+    max_workers set to 0, sequences are annotated in the calling process.
+
+    Results are memoized in a Django cache, by sequence, topology, level of
+    detail and version of the plannotate databases"""
+
+    def __init__(
+        self,
+        max_workers=PLANNOTATE_POOL_WORKERS,
+        max_queue=PLANNOTATE_POOL_MAX_QUEUE,
+        timeout=PLANNOTATE_POOL_TIMEOUT,
+        yaml_file_loc=None,
+        max_parallel_searches=PLANNOTATE_MAX_PARALLEL_SEARCHES,
+        cache_alias=PLANNOTATE_CACHE,
+        cache_timeout=PLANNOTATE_CACHE_TIMEOUT,
+    ):
+        self.max_workers = max_workers
+        self.max_parallel_searches = max_parallel_searches
+        self.cache_alias = cache_alias
+        self.cache_timeout = cache_timeout
+        self.timeout = timeout
+        self.yaml_file_loc = yaml_file_loc or plannotate_resources.get_yaml_path()
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawn, rather than fork, the workers so that they do not
+                # inherit the state, e.g. DB connections, of the web worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=plannotate_resources.preload_databases,
+                    initargs=(self.yaml_file_loc,),
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def annotate(self, seq, linear=False, is_detailed=False):
+        """Annotate a sequence with plannotate and return the resulting DataFrame"""
+
+        seq = str(seq)
+
+        cache = caches[self.cache_alias] if self.cache_alias else None
+        if cache is not None:
+            cache_key = self.get_cache_key(seq, linear, is_detailed)
+            hits = cache.get(cache_key)
+            if hits is not None:
+                return hits
+
+        hits = self._annotate(seq, linear, is_detailed)
+
+        if cache is not None:
+            cache.set(cache_key, hits, self.cache_timeout)
+
+        db_timings = hits.attrs.get("db_timings")
+        if db_timings:
+            logger.debug(
+                "Plannotate search times: "
+                + ", ".join(f"{db} {secs:.2f}s" for db, secs in db_timings.items())
+            )
+
+        return hits
+
+    def get_cache_key(self, seq, linear, is_detailed):
+        """Return the cache key for an annotation"""
+
+        seq_digest = hashlib.sha256(seq.encode()).hexdigest()
+        databases_digest = plannotate_resources.get_databases_digest(self.yaml_file_loc)
+        return (
+            f"plannotate:{seq_digest}:{int(bool(linear))}:{int(bool(is_detailed))}:"
+            f"{databases_digest}"
+        )
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            raise AnnotationServiceBusy(
+                "Too many feature detection requests are being processed. "
+                "Please try again later."
+            )
+
+    def _release_slot(self, future=None):
+        self._slots.release()
+
+    def _annotate(self, seq, linear, is_detailed):
+        kwargs = {
+            "linear": linear,
+            "is_detailed": is_detailed,
+            "max_workers": self.max_parallel_searches,
+        }
+
+        if self.max_workers < 1:
+            self._acquire_slot()
+            try:
+                return plannotate_annotate(seq, self.yaml_file_loc, **kwargs)
+            finally:
+                self._release_slot()
+
+        # Retry once if a worker died, e.g. killed by the OOM killer, which
+        # breaks the whole pool
+        for attempt in range(2):
+            self._acquire_slot()
+            executor = self._get_executor()
+            future = None
+            try:
+                future = executor.submit(
+                    plannotate_annotate, seq, self.yaml_file_loc, **kwargs
+                )
+                # Free the slot only when the worker is done, also if waiting
+                # for it times out, so that running annotations stay bounded
+                future.add_done_callback(self._release_slot)
+                return future.result(timeout=self.timeout)
+            except BrokenProcessPool:
+                logger.warning("Plannotate worker pool broken, restarting it")
+                self._reset_executor(executor)
+                if attempt:
+                    raise
+            finally:
+                if future is None:
+                    self._release_slot()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+annotation_service = AnnotationService()
@@ -0,0 +1,263 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+
+from .common import get_map_dna_seqrecord
+
+MAP_DNA_CACHE_SIZE = getattr(settings, "MAP_DNA_CACHE_SIZE", 128)
+MAP_DNA_CACHE_DISK_ENABLE = getattr(settings, "MAP_DNA_CACHE_DISK_ENABLE", False)
+MAP_DNA_CACHE_DISK_MAX_FILES = getattr(settings, "MAP_DNA_CACHE_DISK_MAX_FILES", 2000)
+MAP_DNA_CACHE_DIR = Path(
+    getattr(
+        settings,
+        "MAP_DNA_CACHE_DIR",
+        Path(settings.MEDIA_ROOT) / "cache" / "map_dna",
+    )
+)
+
+
+class LRUCache:
+    """Minimal thread-safe, size-bounded least-recently-used cache"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class MapDnaCache:
+    """Content-addressed cache for parsed map_dna files.
+
+    Parsed SeqRecords are stored pickled, keyed by the SHA-256 digest of the file
+    content, so that every hit returns a fresh copy that callers can mutate freely
+    (e.g. detect_map_dna_features). A path index, validated against the file's
+    mtime and size, avoids re-hashing unchanged files. Optionally, pickles are
+    also persisted to disk so that they survive worker restarts"""
+
+    def __init__(
+        self,
+        maxsize=MAP_DNA_CACHE_SIZE,
+        disk_dir=MAP_DNA_CACHE_DIR if MAP_DNA_CACHE_DISK_ENABLE else None,
+        disk_max_files=MAP_DNA_CACHE_DISK_MAX_FILES,
+    ):
+        self._records = LRUCache(maxsize)
+        self._derived = LRUCache(maxsize)
+        self._path_index = LRUCache(maxsize * 4)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_files = disk_max_files
+        # Number of pickles in the disk store, counted when first needed and
+        # then kept up to date by this process
+        self._disk_files = None
+        self._disk_lock = threading.Lock()
+
+    # Keys
+
+    def get_digest(self, path):
+        """Return the content digest for a file, re-hashing only if its mtime
+        or size have changed since it was last seen"""
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        indexed = self._path_index.get(path)
+        if indexed and indexed[0] == signature:
+            return indexed[1]
+
+        with open(path, "rb") as handle:
+            digest = hashlib.sha256(handle.read()).hexdigest()
+        self._path_index.set(path, (signature, digest))
+        return digest
+
+    # Disk store
+
+    def _disk_path(self, digest):
+        return self.disk_dir / digest[:2] / f"{digest}.pickle"
+
+    def _disk_get(self, digest):
+        if not self.disk_dir:
+            return None
+        file_path = self._disk_path(digest)
+        try:
+            data = file_path.read_bytes()
+            # Mark the pickle as recently used for eviction
+            os.utime(file_path)
+        except OSError:
+            return None
+        return data
+
+    def _disk_set(self, digest, data):
+        if not self.disk_dir:
+            return
+        file_path = self._disk_path(digest)
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so that concurrent readers never see a
+            # partially written pickle
+            temp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, file_path)
+        except OSError:
+            return
+        self._disk_count_write()
+
+    def _disk_delete(self, digest):
+        if not self.disk_dir:
+            return
+        try:
+            self._disk_path(digest).unlink()
+        except OSError:
+            return
+        with self._disk_lock:
+            if self._disk_files:
+                self._disk_files -= 1
+
+    def _disk_count_write(self):
+        """Count a pickle written to the disk store and evict pickles only once
+        the count exceeds disk_max_files, instead of listing the store on every
+        write. Pickles written by other processes are only counted when the
+        store is listed, i.e. on the first write and on eviction"""
+
+        with self._disk_lock:
+            if self._disk_files is None:
+                self._disk_files = sum(1 for _ in self.disk_dir.glob("*/*.pickle"))
+            else:
+                self._disk_files += 1
+            if self._disk_files > self.disk_max_files:
+                self._disk_files = self._disk_evict()
+
+    def _disk_evict(self):
+        """Delete the least recently used pickles, down to 90% of
+        disk_max_files so that eviction is not run again on the next writes,
+        and return the number of pickles left"""
+
+        files = []
+        for file_path in self.disk_dir.glob("*/*.pickle"):
+            try:
+                files.append((file_path.stat().st_mtime, file_path))
+            except OSError:
+                pass
+        excess = len(files) - int(self.disk_max_files * 0.9)
+        if excess <= 0:
+            return len(files)
+        files.sort(key=lambda f: f[0])
+        for _, file_path in files[:excess]:
+            try:
+                file_path.unlink()
+            except OSError:
+                pass
+        return len(files) - excess
+
+    # Public API
+
+    def get_seqrecord(self, path):
+        """Return a SeqRecord for path, parsing the file only on a cache miss.
+        Returns None for invalid files, like get_map_dna_seqrecord"""
+
+        digest = self.get_digest(path)
+
+        data = self._records.get(digest)
+        if data is None:
+            data = self._disk_get(digest)
+            if data is None:
+                seq_record = get_map_dna_seqrecord(path)
+                if seq_record is None:
+                    return None
+                data = pickle.dumps(seq_record, protocol=pickle.HIGHEST_PROTOCOL)
+                self._disk_set(digest, data)
+            self._records.set(digest, data)
+
+        return pickle.loads(data)
+
+    def get_derived(self, path, name, func):
+        """Return func(seq_record) for the map at path, memoized per content
+        digest. Only use for functions that return immutable-ish data, which
+        callers will not modify"""
+
+        digest = self.get_digest(path)
+        derived = self._derived.get(digest)
+        if derived is None:
+            derived = {}
+            self._derived.set(digest, derived)
+
+        if name not in derived:
+            seq_record = self.get_seqrecord(path)
+            if seq_record is None:
+                return None
+            derived[name] = func(seq_record)
+        return derived[name]
+
+    def invalidate(self, path):
+        """Drop everything cached for the file currently or last seen at path"""
+
+        indexed = self._path_index.pop(path)
+        digests = {indexed[1]} if indexed else set()
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as handle:
+                    digests.add(hashlib.sha256(handle.read()).hexdigest())
+            except OSError:
+                pass
+
+        for digest in digests:
+            self._records.pop(digest)
+            self._derived.pop(digest)
+            self._disk_delete(digest)
+
+    def clear(self):
+        self._records.clear()
+        self._derived.clear()
+        self._path_index.clear()
+
+
+map_dna_cache = MapDnaCache()
+
+
+def get_cached_map_dna_seqrecord(path):
+    """Returns a SeqRecord object for the map_dna file, or None if invalid.
+    Cached version of get_map_dna_seqrecord"""
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Map DNA file not found at path: {path}")
+
+    return map_dna_cache.get_seqrecord(path)
+
+
+def invalidate_map_dna_cache(path):
+    """Invalidate cached data for the map_dna file at path"""
+
+    map_dna_cache.invalidate(path)
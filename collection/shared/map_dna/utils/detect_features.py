@@ -1,3 +1,5 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from io import BytesIO, StringIO
 
 from Bio import SeqIO
@@ -7,9 +9,9 @@ from Bio.SeqRecord import SeqRecord
 from django.utils import timezone
 from sgffp import SgffReader, SgffWriter
 
-from formz.models import SequenceFeature
+from formz.models import SequenceFeatureAlias
 
-from ..plannotate.plannotate.annotate import annotate as plannotate_annotate
+from .annotation_service import annotation_service
 from .common import get_feature_label, get_map_dna_feature_names
 
 
@@ -215,38 +217,40 @@ def compare_seqrecord_features(seq_record_a, seq_record_b, fuzz=3):
             return False
         return abs(a_start - b_start) <= fuzz and abs(a_end - b_end) <= fuzz
 
-    def _span_matches(a_span, b_span):
-        """Check if two merged spans match within the fuzz criteria."""
-        a_start, a_end, a_strand = a_span
-        b_start, b_end, b_strand = b_span
-        if a_strand != b_strand:
-            return False
-        return abs(a_start - b_start) <= fuzz and abs(a_end - b_end) <= fuzz
-
-    def _overlaps(a, b):
-        """Check if features a and b fully overlap by the defined criteria."""
-
-        # The type must be the same for matching features
-        if a.type != b.type:
-            return False
-
-        return _span_matches(_get_span(a), _get_span(b))
-
     features_a = list(seq_record_a.features)
     features_b = list(seq_record_b.features)
 
+    # Bucket the features in B by type and strand, each bucket sorted by start,
+    # so that only the features starting within fuzz bases of a feature in A
+    # have to be checked
+    buckets_b = defaultdict(list)
+    for idx_b, feature_b in enumerate(features_b):
+        start, end, strand = _get_span(feature_b)
+        buckets_b[(feature_b.type, strand)].append((start, idx_b, end))
+    for bucket in buckets_b.values():
+        bucket.sort()
+    bucket_starts = {key: [b[0] for b in bucket] for key, bucket in buckets_b.items()}
+
     matched_pairs = []
     used_b = set()
 
-    # For each feature in A, find a matching feature in B
+    # For each feature in A, find the first unused matching feature in B
     for feature_a in features_a:
+        a_start, a_end, a_strand = _get_span(feature_a)
+        key = (feature_a.type, a_strand)
+        bucket = buckets_b.get(key)
+        if not bucket:
+            continue
+
+        starts = bucket_starts[key]
         match_index = None
-        for idx_b, feature_b in enumerate(features_b):
-            if idx_b in used_b:
+        for b_start, idx_b, b_end in bucket[
+            bisect_left(starts, a_start - fuzz) : bisect_right(starts, a_start + fuzz)
+        ]:
+            if idx_b in used_b or abs(a_end - b_end) > fuzz:
                 continue
-            if _overlaps(feature_a, feature_b):
+            if match_index is None or idx_b < match_index:
                 match_index = idx_b
-                break
 
         # If a match is found, record the pair and mark the B feature as used
         if match_index is not None:
@@ -361,7 +365,7 @@ def detect_map_dna_features(
         remove_feature_qualifiers(feature, prefix="plannot_")
 
     # Annotate the sequence record with features
-    annotations = plannotate_annotate(
+    annotations = annotation_service.annotate(
         seq_record.seq, linear=topology, is_detailed=is_detailed
     )
     seq_record_annotated = get_seq_record(annotations, seq_record.seq)
@@ -398,18 +402,22 @@ def detect_map_dna_features(
         for n in get_map_dna_feature_names(seq_record)
     ]
 
-    # Query the database for SequenceFeature objects that have aliases matching any of the
-    # feature names from the processed record
-    sequence_features = SequenceFeature.objects.filter(
-        alias__label__in=feature_names
-    ).distinct()
+    # Query the database for the aliases matching any of the feature names from the
+    # processed record, together with their SequenceFeature objects and all the
+    # related objects needed below, so that the number of queries does not depend
+    # on the number of features
+    aliases = (
+        SequenceFeatureAlias.objects.filter(label__in=set(feature_names))
+        .select_related(
+            "sequence_feature__nuc_acid_purity",
+            "sequence_feature__nuc_acid_risk",
+            "sequence_feature__zkbs_oncogene",
+        )
+        .prefetch_related("sequence_feature__donor_organism")
+    )
 
     # Create a mapping of feature labels to SequenceFeature objects for quick lookup
-    feature_map = {
-        label: sf
-        for sf in sequence_features
-        for label in sf.alias.values_list("label", flat=True)
-    }
+    feature_map = {alias.label: alias.sequence_feature for alias in aliases}
 
     # Annotate features with database information, where available
     for feat in seq_record.features:
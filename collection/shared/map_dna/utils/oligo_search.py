@@ -0,0 +1,386 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from background_task import background
+from background_task.models import Task
+from Bio import SeqIO
+from Bio.SeqFeature import CompoundLocation, FeatureLocation, SeqFeature
+from django.conf import settings
+
+from collection.models import Oligo
+from common.jobs import get_job_result_path
+
+from ..snapgene.client_pool import SnapGeneServerError
+from .cache import get_cached_map_dna_seqrecord
+
+logger = logging.getLogger("logfile")
+
+LAB_ABBREVIATION_FOR_FILES = getattr(settings, "LAB_ABBREVIATION_FOR_FILES", "")
+SNAPGENE_ENABLED = getattr(settings, "SNAPGENE_ENABLED", False)
+# "snapgene" or "native" force an engine, "auto" uses SnapGene server, if
+# enabled, and falls back to the native search if the server is not available
+OLIGO_SEARCH_ENGINE = getattr(settings, "OLIGO_SEARCH_ENGINE", "auto")
+OLIGO_INDEX_DIR = Path(
+    getattr(
+        settings,
+        "OLIGO_INDEX_DIR",
+        Path(settings.MEDIA_ROOT) / "cache" / "oligos",
+    )
+)
+# Oligo changes are written to the index by a background task, this many
+# seconds after the first change, together with those made in the meantime
+OLIGO_INDEX_REFRESH_DELAY = getattr(settings, "OLIGO_INDEX_REFRESH_DELAY", 10)
+# Superseded exports are kept for this many seconds, so that requests that
+# resolved their path just before an update can still read them
+OLIGO_EXPORT_GRACE_PERIOD = getattr(settings, "OLIGO_EXPORT_GRACE_PERIOD", 600)
+OLIGO_MIN_LENGTH = 15
+
+_VALID_OLIGO_RE = re.compile(r"^[ATCG]+$", re.IGNORECASE)
+_INDEX_FILE_NAME = "oligos.json"
+_EXPORT_FILE_PREFIX = "oligos.v"
+_EXPORT_FILE_SUFFIX = ".snapgene.json"
+
+
+# ---------------------------------------------------------------------------
+# Oligo index
+# ---------------------------------------------------------------------------
+
+
+def is_searchable_oligo(sequence):
+    """Only oligos with valid sequences (only A, T, C, G) and length >= 15 are
+    searched for in maps"""
+
+    return (
+        bool(sequence)
+        and len(sequence) >= OLIGO_MIN_LENGTH
+        and bool(_VALID_OLIGO_RE.match(sequence))
+    )
+
+
+def get_oligo_primer_name(oligo_id):
+    """Return the name used for an oligo when annotated as primer on a map"""
+
+    return f"! o{LAB_ABBREVIATION_FOR_FILES}{oligo_id}"
+
+
+@contextmanager
+def _index_lock():
+    """Serialize updates of the index across processes"""
+
+    OLIGO_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    with open(OLIGO_INDEX_DIR / "oligos.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _get_export_path(version):
+    return OLIGO_INDEX_DIR / f"{_EXPORT_FILE_PREFIX}{version}{_EXPORT_FILE_SUFFIX}"
+
+
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+def _reverse_complement(sequence):
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def _get_seeds(oligos):
+    """
+    Return the seed index of oligos, {seed: [[oligo_id, strand], ...]}, where
+    seed is the first OLIGO_MIN_LENGTH bases of an oligo or of its reverse
+    complement. Palindromic oligos are indexed once
+    """
+
+    seeds = {}
+    for oligo_id, sequence in oligos.items():
+        rc_sequence = _reverse_complement(sequence)
+        for strand, pattern in ((1, sequence), (-1, rc_sequence)):
+            if strand == -1 and rc_sequence == sequence:
+                continue
+            seeds.setdefault(pattern[:OLIGO_MIN_LENGTH], []).append([oligo_id, strand])
+    return seeds
+
+
+_index_cache_lock = threading.Lock()
+_index_cache = (None, None)
+
+
+def _read_index():
+    """Return the current index, loaded again only when its file changes. The
+    returned index is shared and must not be modified"""
+
+    global _index_cache
+
+    path = OLIGO_INDEX_DIR / _INDEX_FILE_NAME
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    with _index_cache_lock:
+        cached_key, index = _index_cache
+        if cached_key != key:
+            try:
+                with open(path) as index_file:
+                    index = json.load(index_file)
+            except (OSError, ValueError):
+                return None
+            _index_cache = (key, index)
+
+    if not _get_export_path(index["version"]).exists():
+        return None
+    return index
+
+
+def _write_index(oligos, version):
+    """Write a new version of the SnapGene export and of the index, with the
+    seeds used by OligoMatcher, then delete the exports superseded more than
+    OLIGO_EXPORT_GRACE_PERIOD ago"""
+
+    export_path = _get_export_path(version)
+    export = [
+        {"Name": get_oligo_primer_name(oligo_id), "Sequence": sequence, "Notes": ""}
+        for oligo_id, sequence in oligos.items()
+    ]
+    index = {"version": version, "oligos": oligos, "seeds": _get_seeds(oligos)}
+    for path, content in (
+        (export_path, export),
+        (OLIGO_INDEX_DIR / _INDEX_FILE_NAME, index),
+    ):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as temp_file:
+            json.dump(content, temp_file)
+        os.replace(temp_path, path)
+
+    # Mark the export that was current until now as superseded now
+    try:
+        os.utime(_get_export_path(version - 1))
+    except OSError:
+        pass
+
+    now = time.time()
+    for path in glob.glob(
+        str(OLIGO_INDEX_DIR / f"{_EXPORT_FILE_PREFIX}*{_EXPORT_FILE_SUFFIX}")
+    ):
+        if path == str(export_path):
+            continue
+        try:
+            if now - os.path.getmtime(path) > OLIGO_EXPORT_GRACE_PERIOD:
+                os.remove(path)
+        except OSError:
+            pass
+
+    return index
+
+
+def _get_searchable_oligos():
+    return {
+        str(oligo_id): sequence.upper()
+        for oligo_id, sequence in Oligo.objects.order_by("id").values_list(
+            "id", "sequence"
+        )
+        if is_searchable_oligo(sequence)
+    }
+
+
+def refresh_oligo_index():
+    """Rebuild the oligo index from the database and write a new version of
+    it, and of the export, if any oligo changed"""
+
+    oligos = _get_searchable_oligos()
+    with _index_lock():
+        index = _read_index()
+        if index is None:
+            return _write_index(oligos, 1)
+        if index["oligos"] == oligos:
+            return index
+        return _write_index(oligos, index["version"] + 1)
+
+
+@background(schedule=OLIGO_INDEX_REFRESH_DELAY)
+def refresh_oligo_index_task():
+    """Refresh the oligo index in the background_task worker"""
+
+    refresh_oligo_index()
+
+
+def schedule_oligo_index_refresh():
+    """Queue a refresh of the oligo index, unless one is already waiting to
+    run, so that the changes of many oligos are written at once"""
+
+    if not Task.objects.filter(
+        task_name=refresh_oligo_index_task.name, locked_by__isnull=True
+    ).exists():
+        refresh_oligo_index_task(verbose_name="Refresh oligo index")
+
+
+def get_oligo_index():
+    """Return the oligo index, {"version": int, "oligos": {id: sequence},
+    "seeds": {seed: [[id, strand], ...]}}, building it if it does not exist"""
+
+    index = _read_index()
+    if index is None:
+        with _index_lock():
+            index = _read_index() or _write_index(_get_searchable_oligos(), 1)
+    return index
+
+
+def get_oligo_export_path():
+    """Return the path of the current oligo export in the format used by
+    SnapGene server's importPrimersFromList"""
+
+    index = get_oligo_index()
+    if not index["oligos"]:
+        raise Exception("No valid oligos found in database")
+    return str(_get_export_path(index["version"]))
+
+
+# ---------------------------------------------------------------------------
+# Native primer binding search
+# ---------------------------------------------------------------------------
+
+
+class OligoMatcher:
+    """
+    Find all exact occurrences of a set of oligos, and of their reverse
+    complements, in a sequence. Each window of OLIGO_MIN_LENGTH bases is
+    looked up in the seeds of the oligos, as returned by _get_seeds, and only
+    the oligos that start with it are compared in full
+    """
+
+    def __init__(self, oligos, seeds=None):
+        self.oligos = oligos
+        self.seeds = seeds if seeds is not None else _get_seeds(oligos)
+        self.max_length = max(map(len, oligos.values()), default=0)
+
+    def search(self, sequence, circular=False):
+        """Yield (oligo_id, start, end, strand) for each match. For circular
+        sequences, matches that span the origin have end > len(sequence)"""
+
+        sequence = str(sequence).upper()
+        length = len(sequence)
+        if circular:
+            sequence += sequence[: self.max_length - 1]
+
+        oligos = self.oligos
+        seeds = self.seeds
+        # Matches starting in the repeated part were already found
+        for start in range(min(length, len(sequence) - OLIGO_MIN_LENGTH + 1)):
+            candidates = seeds.get(sequence[start : start + OLIGO_MIN_LENGTH])
+            if candidates is None:
+                continue
+            for oligo_id, strand in candidates:
+                pattern = oligos[oligo_id]
+                if strand == -1:
+                    pattern = _reverse_complement(pattern)
+                end = start + len(pattern)
+                if sequence[start:end] == pattern:
+                    yield oligo_id, start, end, strand
+
+
+_matcher_lock = threading.Lock()
+_matcher = (None, None)
+
+
+def get_oligo_matcher():
+    """Return an OligoMatcher for the current version of the oligo index,
+    from the seeds stored in the index"""
+
+    global _matcher
+
+    index = get_oligo_index()
+    with _matcher_lock:
+        version, matcher = _matcher
+        if version != index["version"]:
+            matcher = OligoMatcher(index["oligos"], index.get("seeds"))
+            _matcher = (index["version"], matcher)
+    return matcher
+
+
+def find_oligos_in_seqrecord(seq_record):
+    """Add a primer_bind feature to a SeqRecord for each binding site of an oligo"""
+
+    length = len(seq_record.seq)
+    circular = seq_record.annotations.get("topology", "") != "linear"
+
+    for oligo_id, start, end, strand in get_oligo_matcher().search(
+        seq_record.seq, circular
+    ):
+        if end <= length:
+            location = FeatureLocation(start, end, strand)
+        else:
+            location = CompoundLocation(
+                [
+                    FeatureLocation(start, length, strand),
+                    FeatureLocation(0, end - length, strand),
+                ]
+            )
+            if strand == -1:
+                location = CompoundLocation(location.parts[::-1])
+        name = get_oligo_primer_name(oligo_id)
+        seq_record.features.append(
+            SeqFeature(location, type="primer_bind", qualifiers={"label": [name]})
+        )
+
+    return seq_record
+
+
+def find_oligos_in_map_native(map_path):
+    """Find oligos in a map without SnapGene server and return the map, with the
+    binding sites as primer_bind features, in GenBank format"""
+
+    seq_record = get_cached_map_dna_seqrecord(map_path)
+    if seq_record is None:
+        raise ValueError("Invalid map file")
+
+    find_oligos_in_seqrecord(seq_record)
+    seq_record.annotations.setdefault("molecule_type", "DNA")
+    seq_record.name = seq_record.name[:16]
+
+    content = StringIO()
+    SeqIO.write(seq_record, content, "genbank")
+    return content.getvalue().encode()
+
+
+def find_oligos_in_map(map_path):
+    """Find oligos in a map with the configured engine. Returns the resulting
+    map and its file extension"""
+
+    use_snapgene = OLIGO_SEARCH_ENGINE == "snapgene" or (
+        OLIGO_SEARCH_ENGINE == "auto" and SNAPGENE_ENABLED
+    )
+    if use_snapgene:
+        from ..snapgene.utils import find_oligos_in_map_snapgene
+
+        try:
+            return find_oligos_in_map_snapgene(map_path), ".dna"
+        except SnapGeneServerError as e:
+            if OLIGO_SEARCH_ENGINE == "snapgene":
+                raise
+            logger.warning(f"SnapGene server not available to find oligos: {e}")
+
+    return find_oligos_in_map_native(map_path), ".gbk"
+
+
+def find_oligos_in_map_job(job_id, map_path, file_name):
+    """Background job for find_oligos_in_map, which stores the resulting map
+    as the result of the job"""
+
+    content, ext = find_oligos_in_map(map_path)
+    with open(get_job_result_path(job_id, ext), "wb") as result_file:
+        result_file.write(content)
+
+    return {"file_name": f"{os.path.splitext(file_name)[0]}{ext}", "ext": ext}
@@ -0,0 +1,104 @@
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..parsers.genbank import genbank_to_json
+from ..parsers.snapgene import snapgene_to_json
+from .cache import map_dna_cache
+from .common import get_map_file_format
+
+# Bump whenever the output of the parsers changes, so that stale renditions
+# are regenerated and browsers do not reuse outdated copies
+OVE_JSON_RENDITION_VERSION = 1
+OVE_JSON_RENDITION_SUFFIX = f".ove.v{OVE_JSON_RENDITION_VERSION}.json.gz"
+
+MEDIA_ROOT = getattr(settings, "MEDIA_ROOT", "")
+
+
+def map_file_to_ove_json(map_file, file_format):
+    """Convert the content of a map file to OVE JSON"""
+
+    if file_format == ".dna":
+        return snapgene_to_json(map_file)
+    elif file_format in (".gbk", ".gb"):
+        if isinstance(map_file, bytes):
+            map_file = map_file.decode("utf-8")
+        return genbank_to_json(map_file)
+
+    raise ValueError("Unsupported file format")
+
+
+def has_ove_json_rendition(map_path):
+    """Check whether a map file can have a stored rendition, only uploaded
+    maps, under MEDIA_ROOT, can"""
+
+    media_root = os.path.normpath(MEDIA_ROOT)
+    return bool(MEDIA_ROOT) and (
+        os.path.commonpath([media_root, os.path.normpath(map_path)]) == media_root
+    )
+
+
+def get_ove_json_rendition_path(map_path):
+    """Return the path of the OVE JSON rendition stored next to a map file"""
+
+    return f"{map_path}{OVE_JSON_RENDITION_SUFFIX}"
+
+
+def save_ove_json_rendition(map_path):
+    """Convert a map file to OVE JSON and store it, gzipped, next to the map.
+    Returns the compressed content"""
+
+    if not has_ove_json_rendition(map_path):
+        raise ValueError("Map file has no OVE JSON rendition")
+
+    file_format = get_map_file_format(map_path)
+    with open(map_path, "rb") as map_file:
+        ove_json = map_file_to_ove_json(map_file.read(), file_format)
+
+    content = gzip.compress(
+        json.dumps(ove_json, cls=DjangoJSONEncoder, ensure_ascii=False).encode("utf-8")
+    )
+
+    # Write to a temp file first so that concurrent readers never see a
+    # partially written rendition
+    rendition_path = get_ove_json_rendition_path(map_path)
+    temp_path = f"{rendition_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as rendition_file:
+            rendition_file.write(content)
+        os.replace(temp_path, rendition_path)
+    except OSError:
+        pass
+
+    return content
+
+
+def get_ove_json_rendition(map_path):
+    """Return (gzipped OVE JSON, ETag) for a map file. The rendition is created
+    lazily if it does not exist or is older than the map"""
+
+    rendition_path = get_ove_json_rendition_path(map_path)
+    try:
+        if os.stat(rendition_path).st_mtime_ns >= os.stat(map_path).st_mtime_ns:
+            with open(rendition_path, "rb") as rendition_file:
+                content = rendition_file.read()
+        else:
+            content = save_ove_json_rendition(map_path)
+    except FileNotFoundError:
+        content = save_ove_json_rendition(map_path)
+
+    etag = f'"{map_dna_cache.get_digest(map_path)}-v{OVE_JSON_RENDITION_VERSION}"'
+
+    return content, etag
+
+
+def delete_ove_json_rendition(map_path):
+    """Delete the OVE JSON rendition for a map file, if any"""
+
+    try:
+        os.remove(get_ove_json_rendition_path(map_path))
+    except OSError:
+        pass
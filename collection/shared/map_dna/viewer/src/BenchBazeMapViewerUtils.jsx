@@ -533,11 +533,16 @@ function reformatMapFeatures(mapDnaJson) {
   return mapDnaJson;
 }
 
-export async function getMapFileWithOligos(fileName) {
-  // Fetch the map file with oligos from the server
+export async function getMapFileWithOligos(
+  fileName,
+  { pollInterval = 1000, maxWait = 300000 } = {},
+) {
+  // Queue a job on the server to find oligos in the map file and poll its
+  // status, so that the SnapGene server calls do not block a web worker
   const csrfToken = getCookie("csrftoken");
   const formData = new FormData();
   formData.append("map_file_path", fileName);
+  formData.append("async", "true");
 
   const response = await fetch("/utils/map_dna/find_oligos_in_map/", {
     method: "POST",
@@ -552,8 +557,44 @@ export async function getMapFileWithOligos(fileName) {
     );
   }
 
-  const blob = await response.blob();
-  const contentDisposition = response.headers.get("Content-Disposition");
+  const { status_url: statusUrl } = await response.json();
+
+  const startTime = Date.now();
+  for (;;) {
+    if (Date.now() - startTime > maxWait) {
+      throw new Error("Timed out while finding oligos in map file.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, pollInterval));
+
+    const statusResponse = await fetch(statusUrl, {
+      credentials: "same-origin",
+    });
+    if (!statusResponse.ok) {
+      throw new Error(
+        `Failed to find oligos in map file (Error ${statusResponse.status}).`,
+      );
+    }
+
+    const { status, error } = await statusResponse.json();
+    if (status === "done") {
+      break;
+    }
+    if (status === "failed") {
+      throw new Error(`Failed to find oligos in map file (${error}).`);
+    }
+  }
+
+  const resultResponse = await fetch(`${statusUrl}?result=true`, {
+    credentials: "same-origin",
+  });
+  if (!resultResponse.ok) {
+    throw new Error(
+      `Failed to find oligos in map file (Error ${resultResponse.status}).`,
+    );
+  }
+
+  const blob = await resultResponse.blob();
+  const contentDisposition = resultResponse.headers.get("Content-Disposition");
   const fileNameFromHeader =
     parseContentDispositionFileName(contentDisposition);
   const finalFileName = fileNameFromHeader || getFileNameFromPath(fileName);
@@ -605,14 +646,24 @@ export async function convertMapToOveJson({
     formData.append("detect_features", "true");
   }
 
-  // Send the form data to the server for conversion to OVE JSON
-  const csrfToken = getCookie("csrftoken");
-  const response = await fetch("/utils/map_dna/convert_any_to_ove_json/", {
-    method: "POST",
-    credentials: "same-origin",
-    headers: csrfToken ? { "X-CSRFToken": csrfToken } : undefined,
-    body: formData,
-  });
+  // Stored maps are requested via GET, so that the browser can revalidate
+  // its cached copy of the server-side OVE JSON rendition via its ETag.
+  // Otherwise, send the form data to the server for conversion to OVE JSON
+  let response;
+  if (!payload && !detectFeatures) {
+    response = await fetch(
+      `/utils/map_dna/convert_any_to_ove_json/?${new URLSearchParams(formData)}`,
+      { method: "GET", credentials: "same-origin" },
+    );
+  } else {
+    const csrfToken = getCookie("csrftoken");
+    response = await fetch("/utils/map_dna/convert_any_to_ove_json/", {
+      method: "POST",
+      credentials: "same-origin",
+      headers: csrfToken ? { "X-CSRFToken": csrfToken } : undefined,
+      body: formData,
+    });
+  }
 
   if (!response.ok) {
     throw new Error(
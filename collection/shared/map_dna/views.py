@@ -1,19 +1,37 @@
+import gzip
 import os
 from io import BytesIO
 
 from django.conf import settings
-from django.http import FileResponse, HttpResponse, JsonResponse
-
-from collection.shared.map_dna.snapgene.utils import find_oligos_in_map_snapgene
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    JsonResponse,
+)
+from django.urls import reverse
+from django.utils.http import parse_etags
+
+from common.jobs import (
+    JOB_DONE,
+    get_job,
+    get_job_result_path,
+    submit_job,
+    user_can_access_job,
+)
 
-from .parsers.genbank import genbank_to_json
 from .parsers.seqrecord import seqrecord_to_json
-from .parsers.snapgene import snapgene_to_json
 from .utils.common import (
     get_map_file_format,
     process_genbank_map_file,
 )
 from .utils.detect_features import detect_map_dna_features
+from .utils.oligo_search import find_oligos_in_map as find_oligos_in_map_file
+from .utils.ove_json import (
+    get_ove_json_rendition,
+    has_ove_json_rendition,
+    map_file_to_ove_json,
+)
 from .utils.save_snapgene import update_snapgene_map_file
 
 BASE_DIR = getattr(settings, "BASE_DIR", "")
@@ -53,25 +71,117 @@ def _resolve_map_file_path(file_path):
 
 
 def find_oligos_in_map(request):
-    """Find oligos in the map file and return the processed content"""
+    """Find oligos in the map file and return the processed content, a .dna map
+    if SnapGene server is used, otherwise a .gbk map.
+    If the async flag is set, the map is processed as a background job and
+    the id of the job is returned, which can be polled with snapgene_job"""
+
     file_path = request.POST.get("map_file_path")
     if not file_path:
         return _bad_request(
             "Missing required file or parameter: map_file_path or map_file_content"
         )
     normalized_path = _resolve_map_file_path(file_path)
-    file_name = os.path.splitext(file_path)[0] + ".dna"
 
-    return FileResponse(
-        BytesIO(find_oligos_in_map_snapgene(normalized_path)), filename=file_name
+    if request.POST.get("async", "false").lower() == "true":
+        job_id = submit_job(
+            "collection.shared.map_dna.utils.oligo_search.find_oligos_in_map_job",
+            normalized_path,
+            os.path.basename(file_path),
+            user=request.user,
+            name="Find oligos in map",
+        )
+        return JsonResponse(
+            {
+                "success": True,
+                "job_id": job_id,
+                "status_url": reverse("snapgene_job", args=[job_id]),
+            },
+            status=202,
+        )
+
+    content, ext = find_oligos_in_map_file(normalized_path)
+    file_name = os.path.splitext(file_path)[0] + ext
+
+    return FileResponse(BytesIO(content), filename=file_name)
+
+
+def snapgene_job(request, job_id):
+    """Return the status of a map background job, e.g. finding oligos, or, if the
+    result flag is set and the job is done, its resulting map file"""
+
+    job = get_job(job_id)
+    if not user_can_access_job(request.user, job):
+        return JsonResponse({"success": False, "error": "Job not found"}, status=404)
+
+    if request.GET.get("result", "false").lower() == "true":
+        if job["status"] != JOB_DONE:
+            return _bad_request("Job is not done")
+        return FileResponse(
+            open(get_job_result_path(job_id, job["result"]["ext"]), "rb"),
+            filename=job["result"]["file_name"],
+        )
+
+    return JsonResponse(
+        {
+            "success": True,
+            "status": job["status"],
+            "error": job.get("error", ""),
+        }
     )
 
 
+def _ove_json_rendition_response(request, map_path):
+    """Return the stored OVE JSON rendition of a map file, honouring
+    If-None-Match so that browsers can reuse their cached copy"""
+
+    content, etag = get_ove_json_rendition(map_path)
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        # Serve the gzipped rendition as is, if the client accepts it
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = HttpResponse(content, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                gzip.decompress(content), content_type="application/json"
+            )
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    response["Vary"] = "Accept-Encoding"
+
+    return response
+
+
 def convert_any_to_ove_json(request):
     """Accept uploaded map file as content or file path, convert it to OVE JSON
     for the viewer, and return the JSON content.
     Optionally detects features during conversion if detect_features flag is set
-    in the request."""
+    in the request.
+    Stored maps, requested by file path, are served from their persisted OVE JSON
+    rendition, also via GET, so that browsers can cache them."""
+
+    if request.method not in ("GET", "POST"):
+        return _method_not_allowed()
+    data = request.POST if request.method == "POST" else request.GET
+
+    # Check if detect_features flag is set in the request (default to false)
+    detect_features = data.get("detect_features", "false").lower() == "true"
+
+    # Serve stored maps from their persisted rendition. Only uploaded maps
+    # have one, other files are converted without storing anything
+    if data.get("map_file_path") and not detect_features:
+        try:
+            normalized_path = _resolve_map_file_path(data["map_file_path"])
+            if has_ove_json_rendition(normalized_path):
+                return _ove_json_rendition_response(request, normalized_path)
+        except ValueError as e:
+            return _bad_request(str(e))
+        except Exception as e:
+            return _bad_request(f"Error processing map file: {e}")
 
     if request.method != "POST":
         return _method_not_allowed()
@@ -93,9 +203,6 @@ def convert_any_to_ove_json(request):
     if not file_format:
         return _bad_request("Could not determine file format from request")
 
-    # Check if detect_features flag is set in the request (default to false)
-    detect_features = request.POST.get("detect_features", "false").lower() == "true"
-
     # Convert the map file content to OVE JSON for the viewer, optionally detecting features
     try:
         # Check if file content is provided directly in the request
@@ -121,14 +228,10 @@ def convert_any_to_ove_json(request):
         return _bad_request(f"Error processing map file: {e}")
 
     # Convert the map file content to JSON format for the viewer
-    if file_format == ".dna":
-        processed_content = snapgene_to_json(map_file)
-    elif file_format in (".gbk", ".gb"):
-        if isinstance(map_file, bytes):
-            map_file = map_file.decode("utf-8")
-        processed_content = genbank_to_json(map_file)
-    elif file_format == ".seqrecord":
+    if file_format == ".seqrecord":
         processed_content = seqrecord_to_json(map_file)
+    elif file_format in (".dna", ".gbk", ".gb"):
+        processed_content = map_file_to_ove_json(map_file, file_format)
     else:
         return _bad_request("Unsupported file format")
 
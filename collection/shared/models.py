@@ -17,11 +17,14 @@ from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
 
 from approval.models import Approval
+from collection.shared.map_dna.utils.cache import (
+    get_cached_map_dna_seqrecord,
+    map_dna_cache,
+)
 from collection.shared.map_dna.utils.common import (
     convert_map_dna_to_svg,
     get_map_dna_feature_names,
     get_map_dna_features_simple,
-    get_map_dna_seqrecord,
 )
 from common.actions import export_action_tsv, export_action_xlsx
 from common.models import HistoryFieldMixin, SaveWithoutHistoricalRecordMixin
@@ -36,6 +39,11 @@ LAB_ABBREVIATION_FOR_FILES = getattr(settings, "LAB_ABBREVIATION_FOR_FILES", "")
 MEDIA_URL = settings.MEDIA_URL
 AUTH_USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")
 SNAPGENE_ENABLED = getattr(settings, "SNAPGENE_ENABLED", False)
+# Oligos can be found in maps with SnapGene server or, unless the SnapGene engine
+# is enforced, with the native search, see map_dna/utils/oligo_search.py
+FIND_OLIGOS_ENABLED = SNAPGENE_ENABLED or (
+    getattr(settings, "OLIGO_SEARCH_ENGINE", "auto") != "snapgene"
+)
 
 
 class ApprovalFieldsMixin(models.Model):
@@ -80,6 +88,10 @@ class ApprovalFieldsMixin(models.Model):
     approval_formatted.short_description = "Approval"
     approval_formatted.boolean = True
     approval_formatted.field_type = "BooleanField"
+    approval_formatted.fields = [
+        "created_approval_by_pi",
+        "last_changed_approval_by_pi",
+    ]
 
 
 class OwnershipFieldsMixin(models.Model):
@@ -445,13 +457,14 @@ class MapFileCheckPropertiesMixin:
     def map_formatted(self):
         if self.map_dna:
             return mark_safe(
-                f'<a class="magnific-popup-iframe-map-dna viewlink" title="Map viewer" href="{self.map_dna_preview_url}{ "&snapgene_enabled=1" if SNAPGENE_ENABLED else "" }"></a>'
+                f'<a class="magnific-popup-iframe-map-dna viewlink" title="Map viewer" href="{self.map_dna_preview_url}{ "&snapgene_enabled=1" if FIND_OLIGOS_ENABLED else "" }"></a>'
             )
         else:
             return ""
 
     map_formatted.short_description = "Map"
     map_formatted.field_type = "FileField"
+    map_formatted.fields = ["map_dna"]
 
     # Map-related properties and methods
     def get_map_dna_seqrecord(self):
@@ -459,21 +472,32 @@ class MapFileCheckPropertiesMixin:
         if not self.map_dna:
             return None
         try:
-            return get_map_dna_seqrecord(self.map_dna.path)
+            return get_cached_map_dna_seqrecord(self.map_dna.path)
         except Exception:
             return None
 
+    def _get_map_dna_derived(self, name, func):
+        """Returns func(seq_record) for the map_dna file, memoized per file content"""
+
+        if self.map_dna:
+            try:
+                value = map_dna_cache.get_derived(self.map_dna.path, name, func)
+            except Exception:
+                value = None
+            if value is not None:
+                return list(value)
+
+        return func(self.get_map_dna_seqrecord())
+
     def get_map_dna_features_simple(self):
         """Returns a list of features in the map_dna file, or an empty list if not available or invalid"""
 
-        record = self.get_map_dna_seqrecord()
-        return get_map_dna_features_simple(record)
+        return self._get_map_dna_derived("features_simple", get_map_dna_features_simple)
 
     def get_map_dna_feature_names(self):
         """Return the names of the features in the map_dna file"""
 
-        record = self.get_map_dna_seqrecord()
-        return get_map_dna_feature_names(record)
+        return self._get_map_dna_derived("feature_names", get_map_dna_feature_names)
 
     def convert_map_dna_to_svg(self):
         """Convert the map_dna file to svg format for display in the frontend"""
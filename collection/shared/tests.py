@@ -0,0 +1,169 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import SimpleTestCase, override_settings
+
+from .map_dna.plannotate.plannotate import (
+    annotate as plannotate_annotate,
+    resources as plannotate_resources,
+)
+from .map_dna.utils.annotation_service import (
+    AnnotationService,
+    AnnotationServiceBusy,
+)
+
+
+class AnnotationServiceTest(SimpleTestCase):
+    """Tests for the plannotate annotation service"""
+
+    ANNOTATE = "collection.shared.map_dna.utils.annotation_service.plannotate_annotate"
+
+    def test_annotate_in_process(self):
+        service = AnnotationService(
+            max_workers=0, max_queue=0, yaml_file_loc="x", cache_alias=None
+        )
+        hits = pd.DataFrame()
+        with patch(self.ANNOTATE, return_value=hits) as annotate:
+            self.assertIs(service.annotate("ACGT", linear=True), hits)
+        annotate.assert_called_once_with(
+            "ACGT", "x", linear=True, is_detailed=False, max_workers=None
+        )
+
+    def test_busy_when_queue_full(self):
+        service = AnnotationService(
+            max_workers=0, max_queue=0, yaml_file_loc="x", cache_alias=None
+        )
+        service._slots.acquire()
+        with self.assertRaises(AnnotationServiceBusy):
+            service.annotate("ACGT")
+        service._slots.release()
+        with patch(self.ANNOTATE, return_value=pd.DataFrame()):
+            service.annotate("ACGT")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_annotations_are_cached(self):
+        service = AnnotationService(max_workers=0, max_queue=0, yaml_file_loc="x")
+        hits = pd.DataFrame({"Feature": ["ori"]})
+        with (
+            patch.object(
+                plannotate_resources, "get_databases_digest", return_value="v1"
+            ) as digest,
+            patch(self.ANNOTATE, return_value=hits) as annotate,
+        ):
+            for _ in range(2):
+                pd.testing.assert_frame_equal(service.annotate("ACGT"), hits)
+            self.assertEqual(annotate.call_count, 1)
+
+            # Topology, level of detail and databases are part of the key
+            service.annotate("ACGT", linear=True)
+            service.annotate("ACGT", is_detailed=True)
+            digest.return_value = "v2"
+            service.annotate("ACGT")
+            self.assertEqual(annotate.call_count, 4)
+
+    def test_raw_hits_searched_concurrently_with_timings(self):
+        databases = {"db1": {}, "db2": {}, "db3": {}}
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+        # Passed only once all searches are running at the same time
+        barrier = threading.Barrier(len(databases), timeout=5)
+
+        def database_hits(query, linear, database_name, database):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            try:
+                if barrier is not None:
+                    barrier.wait()
+            finally:
+                with lock:
+                    running["now"] -= 1
+            return pd.DataFrame(
+                {"score": [1], "length": [1], "percmatch": [1], "db": [database_name]}
+            )
+
+        with (
+            patch.object(plannotate_resources, "get_yaml", return_value=databases),
+            patch.object(plannotate_annotate, "get_database_hits", database_hits),
+        ):
+            hits = plannotate_annotate.get_raw_hits("ACGT", False, "x")
+
+            self.assertEqual(sorted(hits["db"]), ["db1", "db2", "db3"])
+            self.assertEqual(list(hits.attrs["db_timings"]), ["db1", "db2", "db3"])
+            self.assertEqual(running["max"], 3)
+
+            # One search at a time
+            barrier = None
+            running["max"] = 0
+            plannotate_annotate.get_raw_hits("ACGT", False, "x", max_workers=1)
+            self.assertEqual(running["max"], 1)
+
+    def test_slot_held_until_worker_done(self):
+        """Test a slot is freed when the worker finishes, not when waiting for
+        it times out"""
+        from concurrent.futures import ThreadPoolExecutor
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+
+        service = AnnotationService(
+            max_workers=1,
+            max_queue=0,
+            timeout=0.01,
+            yaml_file_loc="x",
+            cache_alias=None,
+        )
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        service._get_executor = lambda: executor
+        release = threading.Event()
+
+        def annotate(*args, **kwargs):
+            release.wait(5)
+            return pd.DataFrame()
+
+        with patch(self.ANNOTATE, annotate):
+            with self.assertRaises(FutureTimeoutError):
+                service.annotate("ACGT")
+            with self.assertRaises(AnnotationServiceBusy):
+                service.annotate("ACGT")
+            release.set()
+            executor.submit(lambda: None).result()
+            service.annotate("ACGT")
+
+
+class DatabasesDigestTest(SimpleTestCase):
+    """Tests for the memoized digest of the plannotate databases"""
+
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        self.yaml_file_loc = os.path.join(tmp_dir, "databases.yml")
+        with open(self.yaml_file_loc, "w") as f:
+            f.write("{}")
+        self.addCleanup(
+            plannotate_resources._databases_digests.pop, self.yaml_file_loc, None
+        )
+
+    def test_digest_memoized_until_config_changes(self):
+        with patch.object(
+            plannotate_resources, "_compute_databases_digest", return_value="v1"
+        ) as compute:
+            for _ in range(2):
+                self.assertEqual(
+                    plannotate_resources.get_databases_digest(self.yaml_file_loc),
+                    "v1",
+                )
+            self.assertEqual(compute.call_count, 1)
+
+            os.utime(self.yaml_file_loc, ns=(0, 0))
+            plannotate_resources.get_databases_digest(self.yaml_file_loc)
+            self.assertEqual(compute.call_count, 2)
+
+            # Recomputed once older than ttl
+            plannotate_resources.get_databases_digest(self.yaml_file_loc, ttl=0)
+            self.assertEqual(compute.call_count, 3)
@@ -0,0 +1,28 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Oligo
+from .shared.map_dna.utils.oligo_search import schedule_oligo_index_refresh
+
+logger = logging.getLogger("logfile")
+
+
+def _schedule_oligo_index_refresh():
+    # Keep the oligo export used to find oligos in maps up to date
+    try:
+        schedule_oligo_index_refresh()
+    except Exception as e:
+        logger.warning(f"Could not schedule a refresh of the oligo index: {e}")
+
+
+@receiver(post_save, sender=Oligo)
+def oligo_saved_receiver(sender, instance, **kwargs):
+    transaction.on_commit(_schedule_oligo_index_refresh)
+
+
+@receiver(post_delete, sender=Oligo)
+def oligo_deleted_receiver(sender, instance, **kwargs):
+    transaction.on_commit(_schedule_oligo_index_refresh)
@@ -5,6 +5,7 @@ from django_better_admin_arrayfield.models.fields import ArrayField as BetterArr
 from import_export.fields import Field
 
 from common.models import DocFileMixin, DownloadFileNameMixin
+from common.quick_search import get_trigram_indexes
 
 from ..shared.models import (
     BaseCollectionModel,
@@ -38,6 +39,7 @@ class SiRna(
     class Meta:
         verbose_name = "siRNA"
         verbose_name_plural = "siRNAs"
+        indexes = get_trigram_indexes("sirna", ["id", "name"])
 
     _model_upload_to = "collection/sirna/"
 
@@ -118,6 +120,7 @@ class SiRna(
     }
     _history_view_ignore_fields = BaseCollectionModel._history_view_ignore_fields
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -33,6 +33,8 @@ class Storage(models.Model):
     )
     history = HistoricalRecords()
 
+    _str_fields = ["collection"]
+
     class Meta:
         verbose_name = "storage"
         verbose_name_plural = "storage"
@@ -150,6 +152,8 @@ class Location(models.Model):
     active = models.BooleanField("active", default=True)
     history = HistoricalRecords()
 
+    _str_fields = ["level", "name__name", "storage_temperature", "storage_format"]
+
     class Meta:
         verbose_name = "location"
         verbose_name_plural = "locations"
@@ -197,6 +201,8 @@ class LocationName(models.Model):
     )
     history = HistoricalRecords()
 
+    _str_fields = ["name"]
+
     class Meta:
         verbose_name = "location name"
         verbose_name_plural = "location names"
@@ -233,6 +239,15 @@ class LocationItem(models.Model):
     comment = models.CharField("comment", max_length=150, blank=True)
     history = HistoricalRecords()
 
+    _str_fields = [
+        "location__level",
+        "location__name__name",
+        "location__storage_temperature",
+        "location__storage_format",
+        "box",
+        "coordinate",
+    ]
+
     def __str__(self):
         return " | ".join(
             [str(e) for e in [self.location, self.box, self.coordinate] if e]
@@ -3,6 +3,7 @@ from django.db import models
 from import_export.fields import Field
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 from formz.models import Species
 
 from ..shared.models import (
@@ -135,6 +136,7 @@ class VirusBase(
         + BaseCollectionModel._history_view_ignore_fields
     )
     _representation_field = "name"
+    _str_fields = ["id", "name", "typ_e", "type_other"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -242,6 +244,7 @@ class VirusMammalian(VirusBase):
     class Meta:
         verbose_name = "virus - Mammalian"
         verbose_name_plural = "viruses - Mammalian"
+        indexes = get_trigram_indexes("virusmammalian", ["id", "name"])
 
     typ_e = models.CharField(
         "type",
@@ -321,6 +324,7 @@ class VirusInsect(VirusBase):
     class Meta:
         verbose_name = "virus - Insect"
         verbose_name_plural = "viruses - Insect"
+        indexes = get_trigram_indexes("virusinsect", ["id", "name"])
 
     # Fields
     typ_e = models.CharField(
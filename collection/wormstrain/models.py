@@ -4,6 +4,7 @@ from django.db import models
 from import_export.fields import Field
 
 from common.models import DocFileMixin
+from common.quick_search import get_trigram_indexes
 from formz.models import Species
 
 from ..oligo.models import Oligo
@@ -45,6 +46,9 @@ class WormStrainAllele(
     class Meta:
         verbose_name = "allele - Worm"
         verbose_name_plural = "alleles - Worm"
+        indexes = get_trigram_indexes(
+            "wormstrainallele", ["id", "mutation", "transgene"]
+        )
 
     _model_upload_to = "collection/wormstrainallele/"
 
@@ -152,6 +156,7 @@ class WormStrainAllele(
     _history_view_ignore_fields = BaseCollectionModel._history_view_ignore_fields
     _list_display_links = ["id"]
     _representation_field = "name"
+    _str_fields = ["lab_identifier", "id", "transgene", "mutation"]
     _search_fields = ["id", "mutation", "transgene"]
     _list_display_frozen = ["id"]
     _list_display = [
@@ -282,6 +287,7 @@ class WormStrain(
     class Meta:
         verbose_name = "strain - Worm"
         verbose_name_plural = "strains - Worm"
+        indexes = get_trigram_indexes("wormstrain", ["id", "name"])
 
     name = models.CharField("name", max_length=255, blank=False)
     chromosomal_genotype = models.TextField("chromosomal genotype", blank=True)
@@ -403,6 +409,7 @@ class WormStrain(
     )
     _m2m_save_ignore_fields = ["history_genotyping_oligos"]
     _representation_field = "name"
+    _str_fields = ["id", "name"]
     _list_display_links = ["id"]
     _search_fields = [
         "id",
@@ -8,7 +8,16 @@ from django.utils.text import capfirst
 from import_export.fields import Field
 from import_export.resources import ModelResource, modelresource_factory
 
-from common.export import export_objects_tsv, export_objects_xlsx
+from common.export import (
+    export_objects_tsv,
+    export_objects_xlsx,
+    get_export_file_name,
+    iter_export_rows,
+    run_export_as_job,
+    submit_export_job,
+    write_tsv,
+    write_xlsx,
+)
 
 
 class OwnExportResource(ModelResource):
@@ -80,6 +89,8 @@ def optimize_export_queryset(
 
     _, field_names = _get_export_model_and_field_names(source, export_field_names)
 
+    if "created_by" in field_names:
+        queryset = queryset.select_related("created_by")
     if "locations" in field_names:
         queryset = queryset.prefetch_related("locations__location")
 
@@ -137,34 +148,78 @@ def create_export_resource(
     return export_resource
 
 
+def write_export_file(
+    queryset,
+    file,
+    file_format,
+    export_field_names="_export_field_names",
+    export_custom_fields="_export_custom_fields",
+):
+    """Write the export of a queryset in the requested format into a binary
+    file, used by background export jobs"""
+
+    model = queryset.model
+    queryset = optimize_export_queryset(model, queryset, export_field_names)
+    export_resource = create_export_resource(
+        model, export_field_names, export_custom_fields
+    )
+    rows = iter_export_rows(export_resource(), queryset)
+
+    if file_format == "xlsx":
+        write_xlsx(rows, file)
+    elif file_format == "tsv":
+        write_tsv(rows, file)
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+
 def export_action(
     source,
     queryset,
     file_format,
     export_field_names="_export_field_names",
     export_custom_fields="_export_custom_fields",
+    request=None,
+    file_name=None,
 ):
-    """Create export resource on the fly and export in the requested format."""
+    """Create export resource on the fly and export in the requested format.
+    Objects are exported in chunks, so that large querysets are never loaded
+    into memory at once. Large exports are run as background jobs"""
+
+    if file_format not in ("xlsx", "tsv"):
+        raise ValueError(f"Unsupported export format: {file_format}")
+    file_name = file_name or get_export_file_name(queryset, file_format)
+
+    if run_export_as_job(request, queryset):
+        return submit_export_job(
+            source,
+            request,
+            queryset,
+            "common.actions.write_export_file",
+            file_name,
+            file_format=file_format,
+            export_field_names=export_field_names,
+            export_custom_fields=export_custom_fields,
+        )
+
     queryset = optimize_export_queryset(source, queryset, export_field_names)
     export_resource = create_export_resource(
         source, export_field_names, export_custom_fields
     )
-    export_data = export_resource().export(queryset)
+    rows = iter_export_rows(export_resource(), queryset)
 
     if file_format == "xlsx":
-        return export_objects_xlsx(queryset, export_data)
-    if file_format == "tsv":
-        return export_objects_tsv(queryset, export_data)
-    raise ValueError(f"Unsupported export format: {file_format}")
+        return export_objects_xlsx(queryset, rows, file_name)
+    return export_objects_tsv(queryset, rows, file_name)
 
 
 @admin.action(description="To XLSX")
 def export_action_xlsx(source, request, queryset):
     """Create export resource on the fly and export as XLSX"""
-    return export_action(source, queryset, "xlsx")
+    return export_action(source, queryset, "xlsx", request=request)
 
 
 @admin.action(description="To TSV")
 def export_action_tsv(source, request, queryset):
     """Create export resource on the fly and export as TSV"""
-    return export_action(source, queryset, "tsv")
+    return export_action(source, queryset, "tsv", request=request)
@@ -108,9 +108,11 @@ from purchasing.models import (
 )
 
 from .admin import OwnUserAdmin
+from .jobs import get_job, user_can_access_job
 
 User = get_user_model()
 SITE_TITLE = getattr(settings, "SITE_TITLE", "BenchBaze")
+JOB_RESULT_PATH_RE = re.compile(r"^temp/job_([0-9a-f]{32})_result")
 
 
 class OwnAdminSite(OrderAdminSite, FormZAdminSite, admin.AdminSite):
@@ -152,6 +154,14 @@ class OwnAdminSite(OrderAdminSite, FormZAdminSite, admin.AdminSite):
 
         url_path = str(kwargs["url_path"])
 
+        # The results of background jobs, e.g. exports, are only available to
+        # the users who submitted them
+        job = None
+        if job_match := JOB_RESULT_PATH_RE.match(url_path):
+            job = get_job(job_match.group(1))
+            if not user_can_access_job(request.user, job):
+                raise Http404
+
         if default_storage.exists(url_path):  # check if file exists
             # Create HttpResponse and add Content Type and, if present, Encoding
             response = HttpResponse()
@@ -185,6 +195,11 @@ class OwnAdminSite(OrderAdminSite, FormZAdminSite, admin.AdminSite):
             except Exception:
                 pass
 
+            if job is not None:
+                download_file_name = (job.get("result") or {}).get(
+                    "file_name", download_file_name
+                )
+
             # Needed for file names that include special, non ascii, characters
             file_expr = "filename*=utf-8''{}".format(
                 urllib.parse.quote(download_file_name)
@@ -1,13 +1,39 @@
 from django.apps import AppConfig
-from django.core.signals import request_finished
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in
+from django.core.signals import request_finished
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class OwnAdminConfig(AppConfig):
     name = "common"
 
     def ready(self):
-        from .signals import user_login_failed_receiver
+        from . import jobs  # noqa: F401, registers the background job task
+        from django.contrib.auth.models import Group, Permission
+
+        from .navigation import build_model_registry
+        from .signals import (
+            permissions_changed_receiver,
+            user_changed_receiver,
+            user_logged_in_receiver,
+            user_login_failed_receiver,
+            user_permissions_changed_receiver,
+        )
 
         User = get_user_model()
         request_finished.connect(user_login_failed_receiver, sender=User)
+
+        build_model_registry()
+
+        # Invalidate the cached navigation when permissions change
+        user_logged_in.connect(user_logged_in_receiver)
+        post_save.connect(user_changed_receiver, sender=User)
+        for through in [User.groups.through, User.user_permissions.through]:
+            m2m_changed.connect(user_permissions_changed_receiver, sender=through)
+        m2m_changed.connect(
+            permissions_changed_receiver, sender=Group.permissions.through
+        )
+        for model in [Group, Permission]:
+            post_save.connect(permissions_changed_receiver, sender=model)
+            post_delete.connect(permissions_changed_receiver, sender=model)
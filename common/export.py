@@ -1,32 +1,264 @@
-from django.http import HttpResponse
+import csv
+import os
+import pickle
+import tempfile
+from base64 import b64decode, b64encode
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core import signing
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.module_loading import import_string
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+
+from .jobs import (
+    create_job_input,
+    get_job_input_path,
+    get_job_result_path,
+    submit_job,
+)
+
+# Number of objects loaded from the database at a time when exporting
+EXPORT_CHUNK_SIZE = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+# Size above which an XLSX file is spooled to disk while being written
+EXPORT_SPOOL_MAX_SIZE = getattr(settings, "EXPORT_SPOOL_MAX_SIZE", 10 * 1024 * 1024)
+# Exports of at least this number of objects are run as background jobs
+EXPORT_JOB_MIN_OBJECTS = getattr(settings, "EXPORT_JOB_MIN_OBJECTS", 5000)
+
+_QUERY_SIGNING_SALT = "common.export.query"
 
+CONTENT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "tsv": "text/tab-separated-values",
+}
 
-def export_objects_file(queryset, export_data, file_format):
+
+def get_export_file_name(queryset, file_format, name=None):
     now = timezone.localtime(timezone.now())
-    file_name = f"{queryset.model.__name__}_{now.strftime('%Y%m%d_%H%M%S')}"
+    name = name or queryset.model.__name__
+    return f"{name}_{now.strftime('%Y%m%d_%H%M%S')}.{file_format}"
+
+
+def iter_export_rows(export_resource, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the headers of an export resource and then the exported row of each
+    object in queryset. Objects are loaded chunk_size at a time, together with
+    their prefetched relations, instead of all at once
+    """
+
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+
+    yield export_resource.get_export_headers()
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield export_resource.export_resource(obj)
+
+
+class _Echo:
+    """File-like object that returns what is written to it, instead of
+    storing it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_tsv(rows):
+    """Yield rows formatted as TSV lines"""
+
+    writer = csv.writer(_Echo(), delimiter="\t")
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_tsv(rows, file):
+    """Write rows into a binary file as TSV"""
+
+    for line in iter_tsv(rows):
+        file.write(line.encode())
+
+
+def write_xlsx(rows, file):
+    """
+    Write rows into file as an XLSX workbook, formatted like those created by
+    tablib. The workbook is write-only, so that rows are not kept in memory
+    """
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Tablib Dataset")
+    worksheet.freeze_panes = "A2"
+    bold = Font(bold=True)
+    wrap_text = Alignment(wrap_text=True)
+
+    def to_cell(value, header=False):
+        try:
+            cell = WriteOnlyCell(worksheet, value=value)
+        except ValueError:
+            cell = WriteOnlyCell(worksheet, value=str(value))
+        if header:
+            cell.font = bold
+        elif "\n" in str(value):
+            cell.alignment = wrap_text
+        return cell
+
+    for i, row in enumerate(rows):
+        worksheet.append([to_cell(value, header=i == 0) for value in row])
+
+    workbook.save(file)
+
+
+def export_objects_file(queryset, rows, file_format, file_name=None):
+    """
+    Return a response with rows as an XLSX or TSV file. TSV files are streamed
+    while they are created, XLSX files are first written to a temporary file,
+    which is kept in memory only while small
+    """
+
+    file_name = file_name or get_export_file_name(queryset, file_format)
 
     if file_format == "xlsx":
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+        write_xlsx(rows, file)
+        file.seek(0)
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=file_name,
+            content_type=CONTENT_TYPES[file_format],
         )
-        response.write(export_data.xlsx)
     elif file_format == "tsv":
-        response = HttpResponse(content_type="text/tab-separated-values")
-        response.write(export_data.tsv)
+        response = StreamingHttpResponse(
+            iter_tsv(rows), content_type=CONTENT_TYPES[file_format]
+        )
     else:
         raise ValueError(f"Unsupported export format: {file_format}")
 
-    response["Content-Disposition"] = (
-        f'attachment; filename="{file_name}.{file_format}"'
-    )
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
 
     return response
 
 
-def export_objects_xlsx(queryset, export_data):
-    return export_objects_file(queryset, export_data, "xlsx")
+def export_objects_xlsx(queryset, rows, file_name=None):
+    return export_objects_file(queryset, rows, "xlsx", file_name)
+
+
+def export_objects_tsv(queryset, rows, file_name=None):
+    return export_objects_file(queryset, rows, "tsv", file_name)
+
+
+def run_export_as_job(request, queryset, min_objects=EXPORT_JOB_MIN_OBJECTS):
+    """Check whether an export should be run as a background job, because it
+    was requested with async=true or because it includes at least min_objects
+    objects, which are counted only up to min_objects"""
+
+    if request is None:
+        return False
+    if request.GET.get("async", "").lower() == "true":
+        return True
+    return queryset[:min_objects].count() >= min_objects
+
+
+def get_job_result_url(job_id, ext):
+    """Return the URL of the result file of a job, which is served by
+    OwnAdminSite.uploads"""
+
+    result_path = get_job_result_path(job_id, ext)
+    return f"{settings.MEDIA_URL}{os.path.relpath(result_path, settings.MEDIA_ROOT)}"
+
+
+def save_export_query(queryset):
+    """
+    Store the query of a queryset, with its filters and ordering, in a job
+    input file and return the name of the file. The pickled query is signed,
+    so that only queries stored by this function are loaded
+    """
+
+    name, path = create_job_input(".query")
+    data = b64encode(pickle.dumps(queryset.query)).decode()
+    with open(path, "w") as query_file:
+        query_file.write(signing.Signer(salt=_QUERY_SIGNING_SALT).sign(data))
+    return name
+
 
+def load_export_query(model, name):
+    """Return a queryset of model with the query stored by save_export_query"""
 
-def export_objects_tsv(queryset, export_data):
-    return export_objects_file(queryset, export_data, "tsv")
+    with open(get_job_input_path(name)) as query_file:
+        data = signing.Signer(salt=_QUERY_SIGNING_SALT).unsign(query_file.read())
+    queryset = model._default_manager.all()
+    queryset.query = pickle.loads(b64decode(data))
+    return queryset
+
+
+def export_job(
+    job_id, writer_path, app_label, model_name, query_name, ext, file_name, kwargs
+):
+    """
+    Background job that exports the objects of a model selected by the query
+    stored in query_name by save_export_query. writer_path is the dotted path
+    of a function that writes the export of a queryset into a binary file,
+    e.g. common.actions.write_export_file
+    """
+
+    model = apps.get_model(app_label, model_name)
+    try:
+        queryset = load_export_query(model, query_name)
+    finally:
+        os.remove(get_job_input_path(query_name))
+
+    result_path = get_job_result_path(job_id, ext)
+    temp_path = f"{result_path}.tmp"
+    with open(temp_path, "wb") as result_file:
+        import_string(writer_path)(queryset, result_file, **kwargs)
+    os.replace(temp_path, result_path)
+
+    return {
+        "file_name": file_name,
+        "ext": ext,
+        "url": get_job_result_url(job_id, ext),
+    }
+
+
+def submit_export_job(source, request, queryset, writer_path, file_name, **kwargs):
+    """
+    Queue the export of a queryset as a background job. From the admin, tell
+    the user where the export can be downloaded, otherwise return the id of
+    the job and the URL to poll its status, with status code 202
+    """
+
+    opts = queryset.model._meta
+    ext = os.path.splitext(file_name)[1]
+    job_id = submit_job(
+        "common.export.export_job",
+        writer_path,
+        opts.app_label,
+        opts.model_name,
+        save_export_query(queryset),
+        ext,
+        file_name,
+        kwargs,
+        user=request.user,
+        name=f"Export {file_name}",
+    )
+    status_url = reverse("job-detail", args=[job_id])
+
+    if isinstance(source, admin.ModelAdmin):
+        messages.info(
+            request,
+            format_html(
+                'The export is being created in the background, <a href="{}">'
+                "download {}</a> once it is ready.",
+                f"{status_url}?download=true",
+                file_name,
+            ),
+        )
+        return None
+
+    return JsonResponse(
+        {"success": True, "job_id": job_id, "status_url": status_url}, status=202
+    )
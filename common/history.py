@@ -0,0 +1,276 @@
+import itertools
+import os
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .query_planning import apply_query_plan, get_query_plan
+
+MEDIA_URL = settings.MEDIA_URL
+
+
+class FieldChange:
+    def __init__(
+        self,
+        field=None,
+        new_value="",
+        old_value="",
+        related_model=None,
+        related_objects=None,
+    ) -> None:
+        self.field = field
+        self.new_value = new_value
+        self.old_value = old_value
+        # Model of the objects referenced by a foreign key or an array field
+        # and those objects, by id, as resolved for the whole history
+        self.related_model = related_model
+        self.related_objects = related_objects if related_objects is not None else {}
+
+    def _get_related_object(self, value):
+        return self.related_objects.get(value, value)
+
+    def _pretty_format_value(self, value):
+        field = self.field
+        value_out = value if value else "None"
+        field_type = field.get_internal_type()
+
+        if field_type == "FileField":
+            link_text = os.path.basename(value)
+
+            # Prettify DNA map field name
+            if field.name == "map_dna":
+                link_text = os.path.splitext(link_text)[0]
+            value_out = (
+                format_html(
+                    "<a href={}>{}</a>",
+                    f"{MEDIA_URL}{value}",
+                    link_text,
+                )
+                if value
+                else "None"
+            )
+
+        elif field_type == "ForeignKey":
+            field_model = field.remote_field.model
+            value_out = (
+                format_html(
+                    '<a target="_blank" href={}>{}</a>',
+                    reverse(
+                        f"admin:{field_model._meta.app_label}_{field_model._meta.model_name}_change",
+                        args=(value,),
+                    ),
+                    self._get_related_object(value),
+                )
+                if value
+                else "None"
+            )
+
+        elif field_type == "ArrayField":
+            if self.related_model:
+                value_out = (
+                    ", ".join(
+                        str(self.related_objects[v])
+                        for v in value
+                        if v in self.related_objects
+                    )
+                    if value
+                    else "None"
+                )
+            else:
+                value_out = ", ".join(map(str, value))
+
+        elif field_type == "DateField" or field_type == "DateTimeField":
+            if value:
+                value_out = value.isoformat()
+
+        return value_out
+
+    @property
+    def new_value_prettified(self):
+        return self._pretty_format_value(self.new_value)
+
+    @property
+    def old_value_prettified(self):
+        return self._pretty_format_value(self.old_value)
+
+
+class HistoryChange:
+    def __init__(self, timestamp=None, activity_user=None, field_changes=None) -> None:
+        self.timestamp = timestamp
+        self.activity_user = activity_user
+        self.field_changes = field_changes if field_changes is not None else []
+
+
+def pairwise(iterable):
+    """Create pairs of consecutive items from
+    iterable"""
+
+    a, b = itertools.tee(iterable)
+    next(b, None)
+    return zip(a, b)
+
+
+def _get_related_model(obj, field):
+    """Return the model referenced by a foreign key or by a history array
+    field, if any"""
+
+    field_type = field.get_internal_type()
+    if field_type == "ForeignKey":
+        return field.remote_field.model
+    if field_type == "ArrayField":
+        model_name = getattr(obj, "_history_array_fields", {}).get(field.name)
+        if model_name:
+            try:
+                return apps.get_model(model_name.lower())
+            except LookupError:
+                return None
+    return None
+
+
+def _get_m2m_rows(obj, history_model, m2m_field_names):
+    """
+    Return the rows of the historical many-to-many tables of all historical
+    records of an object, with one query per field, as
+    {field name: {history_id: rows}}. Rows are compared like
+    HistoricalChanges.diff_against does, ordered by the related object
+    """
+
+    m2m_rows = {}
+    for field_name in m2m_field_names:
+        m2m_history_model = getattr(history_model, field_name).model
+        reverse_field = m2m_history_model._meta.get_field(
+            obj._meta.get_field(field_name).m2m_reverse_field_name()
+        )
+        through_fields = [
+            f.name
+            for f in m2m_history_model._meta.fields
+            if f.editable and f.name not in ["id", "m2m_history_id", "history"]
+        ]
+        rows = defaultdict(list)
+        for row in (
+            m2m_history_model._default_manager.filter(
+                history__in=obj.history.values("pk")
+            )
+            .order_by(reverse_field.attname)
+            .values("history", *through_fields)
+        ):
+            rows[row.pop("history")].append(row)
+        m2m_rows[field_name] = rows
+    return m2m_rows
+
+
+def _diff(obj, history_fields, m2m_rows, newer, older):
+    """
+    Compare two historical records, like HistoricalChanges.diff_against, but
+    without querying the database, with the historical many-to-many rows
+    returned by _get_m2m_rows
+    """
+
+    changes = [
+        (name, field.value_from_object(older), field.value_from_object(newer))
+        for name, field in history_fields
+        if field.value_from_object(older) != field.value_from_object(newer)
+    ]
+    for name, rows in m2m_rows.items():
+        old_rows = rows.get(older.pk, [])
+        new_rows = rows.get(newer.pk, [])
+        if old_rows != new_rows:
+            changes.append((name, old_rows, new_rows))
+    return sorted(changes)
+
+
+def get_history_changes(obj, limit=None, offset=0):
+    """
+    Return the changes between consecutive historical records of an object,
+    newest first, skipping the offset most recent changes and returning at most
+    limit changes.
+
+    Historical records, and their many-to-many rows, are diffed in memory and
+    all objects referenced by changed foreign keys and history array fields
+    are fetched with one query per model, as are the users who made the
+    changes
+    """
+
+    history_model = obj.history.model
+    ignore_fields = set(getattr(obj, "_history_view_ignore_fields", []))
+    m2m_field_names = {
+        f.name for f in getattr(history_model, "_history_m2m_fields", [])
+    }
+    history_fields = [
+        (f.name, history_model._meta.get_field(f.name))
+        for f in history_model.tracked_fields
+        if f.editable and f.name not in m2m_field_names and f.name not in ignore_fields
+    ]
+    m2m_field_names = m2m_field_names.difference(ignore_fields)
+
+    # Stream the historical records, so that only the records needed for the
+    # requested changes are loaded
+    records = obj.history.all().iterator(chunk_size=100)
+    m2m_rows = _get_m2m_rows(obj, history_model, m2m_field_names)
+    diffs = []
+    for newer, older in pairwise(records):
+        changes = _diff(obj, history_fields, m2m_rows, newer, older)
+        if not changes:
+            continue
+        diffs.append((newer, changes))
+        if limit is not None and len(diffs) >= offset + limit:
+            break
+    diffs = diffs[offset:]
+
+    # Collect the ids of all referenced objects and users
+    related_models = {}
+    related_ids = defaultdict(set)
+    user_ids = set()
+    for newer, changes in diffs:
+        if newer.history_user_id:
+            user_ids.add(int(newer.history_user_id))
+        for field_name, old_value, new_value in changes:
+            if field_name not in related_models:
+                related_models[field_name] = _get_related_model(
+                    obj, obj._meta.get_field(field_name)
+                )
+            related_model = related_models[field_name]
+            if related_model is None:
+                continue
+            for value in (old_value, new_value):
+                if isinstance(value, (list, tuple)):
+                    related_ids[related_model].update(value)
+                elif value:
+                    related_ids[related_model].add(value)
+
+    # Fetch them, once per model
+    related_objects = {}
+    for related_model, ids in related_ids.items():
+        queryset = apply_query_plan(
+            related_model._default_manager.filter(pk__in=ids),
+            get_query_plan(related_model, ()),
+        )
+        related_objects[related_model] = {o.pk: o for o in queryset}
+    users = get_user_model()._default_manager.in_bulk(user_ids)
+
+    history_changes = []
+    for newer, changes in diffs:
+        history_changes.append(
+            HistoryChange(
+                timestamp=newer.last_changed_date_time,
+                activity_user=users.get(int(newer.history_user_id))
+                if newer.history_user_id
+                else None,
+                field_changes=[
+                    FieldChange(
+                        field=obj._meta.get_field(field_name),
+                        new_value=new_value,
+                        old_value=old_value,
+                        related_model=related_models[field_name],
+                        related_objects=related_objects.get(related_models[field_name]),
+                    )
+                    for field_name, old_value, new_value in changes
+                ],
+            )
+        )
+
+    return history_changes
@@ -0,0 +1,138 @@
+import logging
+import time
+
+from django.apps import apps
+from django.db import connections, router, transaction
+
+logger = logging.getLogger("logfile")
+
+TIMESTAMP_FIELD = "last_changed_date_time"
+
+
+def get_pruned_models():
+    """Return the models whose historical records are pruned, those with a
+    history and a last_changed_date_time field"""
+
+    return [
+        m
+        for m in apps.get_models()
+        if getattr(m, "history", False) and getattr(m, TIMESTAMP_FIELD, False)
+    ]
+
+
+def get_duplicate_history_sql(model, since=None, using="default"):
+    """
+    Return the SQL, and its parameters, that selects the id of each
+    historical record of model, together with the id of the previous record
+    of the same object, when the type of change and all tracked columns but
+    last_changed_date_time of both records are equal. If since is set, only
+    the records of objects changed since then are compared
+    """
+
+    history_model = model.history.model
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    opts = history_model._meta
+    pk_column = quote_name(opts.get_field(model._meta.pk.name).column)
+
+    # The type of change keeps the records of deletions, which repeat the
+    # columns of the last change
+    columns = [quote_name(opts.get_field("history_type").column)] + [
+        quote_name(opts.get_field(f.name).column)
+        for f in history_model.tracked_fields
+        if f.name != TIMESTAMP_FIELD
+    ]
+    duplicate = " AND ".join(
+        f"{column} IS NOT DISTINCT FROM LAG({column}) OVER w" for column in columns
+    )
+
+    where, params = "", []
+    if since is not None:
+        changed, params = (
+            model._default_manager.using(using)
+            .filter(**{f"{TIMESTAMP_FIELD}__gte": since})
+            .values("pk")
+            .query.sql_with_params()
+        )
+        params = list(params)
+        where = f"WHERE {pk_column} IN ({changed})"
+
+    sql = (
+        "SELECT history_id, previous_history_id FROM ("
+        "SELECT history_id, LAG(history_id) OVER w AS previous_history_id, "
+        f"{duplicate} AS duplicate "
+        f"FROM {quote_name(opts.db_table)} {where} "
+        f"WINDOW w AS (PARTITION BY {pk_column} ORDER BY history_date, history_id)"
+        ") AS history WHERE previous_history_id IS NOT NULL AND duplicate"
+    )
+    return sql, params
+
+
+def get_duplicate_history_ids(model, since=None, using="default"):
+    """
+    Return the ids of the historical records of model that differ from the
+    previous record of the same object only by last_changed_date_time. The
+    columns are compared in SQL, only the many-to-many fields tracked by the
+    history, if any, are compared in memory, and only for those records
+    """
+
+    sql, params = get_duplicate_history_sql(model, since, using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        pairs = cursor.fetchall()
+
+    history_model = model.history.model
+    m2m_field_names = [
+        f.name for f in getattr(history_model, "_history_m2m_fields", [])
+    ]
+    if not pairs or not m2m_field_names:
+        return [history_id for history_id, _ in pairs]
+
+    records = history_model._default_manager.using(using).in_bulk(
+        {history_id for pair in pairs for history_id in pair}
+    )
+    return [
+        history_id
+        for history_id, previous_history_id in pairs
+        if not records[history_id]
+        .diff_against(records[previous_history_id], included_fields=m2m_field_names)
+        .changes
+    ]
+
+
+def prune_duplicate_history(models=None, since=None, dry_run=False):
+    """
+    Delete the historical records that differ from the previous record of the
+    same object only by last_changed_date_time, for models, by default all
+    models returned by get_pruned_models, and for objects changed since then,
+    if set. If dry_run is True, nothing is deleted.
+
+    Return a report with, for each model, the number of duplicate records and
+    the time taken to find and delete them, in seconds
+    """
+
+    report = []
+    for model in models if models is not None else get_pruned_models():
+        start = time.perf_counter()
+        history_model = model.history.model
+        using = router.db_for_write(history_model)
+        with transaction.atomic(using=using):
+            history_ids = get_duplicate_history_ids(model, since, using)
+            if history_ids and not dry_run:
+                history_model._default_manager.using(using).filter(
+                    history_id__in=history_ids
+                ).delete()
+        report.append(
+            {
+                "model": model._meta.label,
+                "duplicates": len(history_ids),
+                "seconds": time.perf_counter() - start,
+            }
+        )
+        logger.info(
+            f"{'Found' if dry_run else 'Deleted'} {len(history_ids)} duplicate "
+            f"historical records of {model._meta.label} "
+            f"in {report[-1]['seconds']:.2f} s"
+        )
+
+    return report
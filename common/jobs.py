@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from background_task import background
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger("logfile")
+
+# Status and result files are stored in uploads/temp/, which is periodically
+# cleaned up by extras/weekly_tasks.py
+JOBS_DIR = os.path.join(settings.MEDIA_ROOT, "temp")
+# "background_task" runs jobs in the process_tasks worker, "thread" runs them
+# in a thread pool of the process that submitted them
+BACKGROUND_JOBS_BACKEND = getattr(
+    settings, "BACKGROUND_JOBS_BACKEND", "background_task"
+)
+BACKGROUND_JOBS_THREADS = getattr(settings, "BACKGROUND_JOBS_THREADS", 2)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_JOB_INPUT_RE = re.compile(r"^input_[0-9a-f]{32}(\.\w+)?$")
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _check_job_id(job_id):
+    if not _JOB_ID_RE.match(str(job_id)):
+        raise ValueError("Invalid job id")
+
+
+def get_job_status_path(job_id):
+    """Return the path of the status file of a job"""
+
+    _check_job_id(job_id)
+    return os.path.join(JOBS_DIR, f"job_{job_id}.json")
+
+
+def get_job_result_path(job_id, ext=""):
+    """Return the path where a job should store its result file"""
+
+    _check_job_id(job_id)
+    return os.path.join(JOBS_DIR, f"job_{job_id}_result{ext}")
+
+
+def create_job_input(ext=""):
+    """Return the name and the path of a new file, in which input too large
+    for the parameters of a job is passed to it"""
+
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    name = f"input_{uuid.uuid4().hex}{ext}"
+    return name, os.path.join(JOBS_DIR, name)
+
+
+def get_job_input_path(name):
+    """Return the path of an input file created by create_job_input"""
+
+    if not _JOB_INPUT_RE.match(str(name)):
+        raise ValueError("Invalid job input")
+    return os.path.join(JOBS_DIR, name)
+
+
+def get_job(job_id):
+    """Return the status of a job as a dict, or None if it does not exist"""
+
+    try:
+        with open(get_job_status_path(job_id)) as status_file:
+            return json.load(status_file)
+    except (ValueError, OSError):
+        return None
+
+
+def _write_job(job):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    status_path = get_job_status_path(job["id"])
+    temp_path = f"{status_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as status_file:
+        json.dump(job, status_file)
+    os.replace(temp_path, status_path)
+
+
+def update_job(job_id, **fields):
+    """Update the status of a job"""
+
+    job = get_job(job_id) or {"id": job_id}
+    job.update(fields)
+    job["updated"] = timezone.now().isoformat()
+    _write_job(job)
+
+    return job
+
+
+def run_job_now(job_id, func_path, args=(), kwargs=None):
+    """Run a job in the current process. func_path is the dotted path of a
+    function that takes the job id as first argument and returns a
+    JSON-serializable result"""
+
+    update_job(job_id, status=JOB_RUNNING)
+    try:
+        result = import_string(func_path)(job_id, *args, **(kwargs or {}))
+    except Exception as e:
+        logger.exception(f"Background job {job_id} ({func_path}) failed")
+        update_job(job_id, status=JOB_FAILED, error=str(e) or type(e).__name__)
+    else:
+        update_job(job_id, status=JOB_DONE, result=result)
+
+
+@background(schedule=0)
+def run_job(job_id, func_path, args, kwargs):
+    """Run a job in the background_task worker"""
+
+    run_job_now(job_id, func_path, args, kwargs)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=BACKGROUND_JOBS_THREADS, thread_name_prefix="job"
+            )
+        return _executor
+
+
+def submit_job(func_path, *args, user=None, name="", **kwargs):
+    """Queue a job and return its id, which can be used to poll its status"""
+
+    job_id = uuid.uuid4().hex
+    now = timezone.now().isoformat()
+    _write_job(
+        {
+            "id": job_id,
+            "name": name,
+            "status": JOB_PENDING,
+            "user_id": getattr(user, "id", None),
+            "created": now,
+            "updated": now,
+        }
+    )
+
+    if BACKGROUND_JOBS_BACKEND == "thread":
+        _get_executor().submit(run_job_now, job_id, func_path, args, kwargs)
+    else:
+        run_job(
+            job_id,
+            func_path,
+            list(args),
+            kwargs,
+            verbose_name=f"{name or func_path} ({job_id})",
+        )
+
+    return job_id
+
+
+def user_can_access_job(user, job):
+    """Check whether a user may see the status and result of a job"""
+
+    return job is not None and (
+        job.get("user_id") == user.id or getattr(user, "is_superuser", False)
+    )
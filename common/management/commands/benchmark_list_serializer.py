@@ -0,0 +1,73 @@
+import timeit
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from common.query_planning import apply_query_plan, get_query_plan
+from common.serializers import (
+    ListSerializer,
+    build_model_serializer,
+    create_model_serializer,
+)
+from common.viewsets import get_list_serializer_field_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of serializing a list page of a model with a "
+        "new serializer class per request and DRF's generic to_representation, "
+        "as before, and with memoized serializer classes and the fast path"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model label, e.g. collection.oligo")
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(e)
+
+        field_names = get_list_serializer_field_names(model)
+        queryset = apply_query_plan(
+            model.objects.order_by("-id"),
+            get_query_plan(
+                model,
+                tuple(
+                    getattr(model, "_list_display_frozen", [])
+                    + getattr(model, "_list_display", [])
+                    + getattr(model, "_api_list_fields", [])
+                ),
+            ),
+        )
+        objs = list(queryset[: options["rows"]])
+        if not objs:
+            raise CommandError(f"No {model._meta.verbose_name_plural} to serialize")
+
+        def serialize_old():
+            serializer_class = create_model_serializer(
+                model, ListSerializer, field_names
+            )
+            serializer_class.fast_representation = False
+            return serializer_class(objs, many=True).data
+
+        def serialize_new():
+            serializer_class = build_model_serializer(
+                model, ListSerializer, field_names
+            )
+            return serializer_class(objs, many=True).data
+
+        if serialize_old() != serialize_new():
+            raise CommandError("The two serializations differ")
+
+        results = {}
+        for name, func in [("old", serialize_old), ("new", serialize_new)]:
+            seconds = min(timeit.repeat(func, number=options["repeat"], repeat=3))
+            results[name] = len(objs) * options["repeat"] / seconds
+            self.stdout.write(f"{name}: {results[name]:,.0f} rows/s")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Speedup: {results['new'] / results['old']:.2f}x")
+        )
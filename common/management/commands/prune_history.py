@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from common.history_pruning import get_pruned_models, prune_duplicate_history
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the historical records that differ from the previous record "
+        "of the same object only by last_changed_date_time, and reports how "
+        "many were found for each model and how long that took"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models", nargs="*", help="Model labels, e.g. collection.plasmid"
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=8,
+            help="Only check objects changed in the last days, 0 for all objects",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report duplicate records without deleting them",
+        )
+
+    def handle(self, *args, **options):
+        models = None
+        if options["models"]:
+            try:
+                models = [apps.get_model(label) for label in options["models"]]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+            unsupported = set(models).difference(get_pruned_models())
+            if unsupported:
+                raise CommandError(
+                    f"No history to prune for {', '.join(m._meta.label for m in unsupported)}"
+                )
+
+        since = (
+            timezone.now() - timedelta(days=options["days"])
+            if options["days"]
+            else None
+        )
+        report = prune_duplicate_history(
+            models=models, since=since, dry_run=options["dry_run"]
+        )
+
+        action = "Found" if options["dry_run"] else "Deleted"
+        for row in report:
+            self.stdout.write(
+                f"{row['model']:<40} {row['duplicates']:>8} {row['seconds']:>8.2f} s"
+            )
+        self.stdout.write(
+            f"{action} {sum(row['duplicates'] for row in report)} duplicate "
+            f"historical records in {sum(row['seconds'] for row in report):.2f} s"
+        )
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("admin", "0003_logentry_add_action_flag_choices"),
+        ("common", "0004_delete_layoutfrontend_user_primary_colour_and_more"),
+    ]
+
+    operations = [
+        # Index for the latest events per content type of a user, as ranked by
+        # UserViewSet.recent_events
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS django_admin_log_recent_events_idx "
+                "ON django_admin_log (user_id, content_type_id, action_time DESC);"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS django_admin_log_recent_events_idx;",
+        ),
+    ]
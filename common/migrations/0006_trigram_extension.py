@@ -0,0 +1,13 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("common", "0005_logentry_recent_events_index"),
+    ]
+
+    operations = [
+        # Used by the GIN indexes of quick search
+        TrigramExtension(),
+    ]
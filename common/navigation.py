@@ -0,0 +1,151 @@
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.utils.text import capfirst
+
+# Cache that stores the navigation of each user, by default none and the
+# navigation is built for each request. Only set it to a cache shared by all
+# processes, e.g. a file-based one, as the navigation is invalidated when
+# permissions change only in the cache of the process that changed them
+NAVIGATION_CACHE = getattr(settings, "NAVIGATION_CACHE", None)
+NAVIGATION_CACHE_TIMEOUT = getattr(settings, "NAVIGATION_CACHE_TIMEOUT", 300)
+
+_VERSION_KEY = "navigation:version"
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def build_model_registry():
+    """
+    Collect, once, the frontend information of all models with a
+    _show_in_frontend attribute, keyed by (app_label, model_name)
+    """
+
+    registry = {}
+    for model in apps.get_models():
+        show_in_frontend = getattr(model, "_show_in_frontend", False)
+        if not show_in_frontend:
+            continue
+        opts = model._meta
+        if isinstance(show_in_frontend, bool):
+            verbose_name = capfirst(opts.verbose_name)
+            verbose_plural = capfirst(opts.verbose_name_plural)
+        else:
+            verbose_name = getattr(model, "_frontend_verbose_name", opts.verbose_name)
+            verbose_plural = getattr(
+                model, "_frontend_verbose_plural", opts.verbose_name_plural
+            )
+        registry[(opts.app_label, opts.model_name)] = {
+            "model": model,
+            "model_class_name": opts.object_name,
+            "model_verbose_name": str(verbose_name),
+            "model_verbose_plural": str(verbose_plural),
+            "app_verbose_name": str(apps.get_app_config(opts.app_label).verbose_name),
+        }
+
+    with _registry_lock:
+        _registry.clear()
+        _registry.update(dict(sorted(registry.items())))
+
+    return _registry
+
+
+def get_model_registry():
+    """Return the registry of the models shown in the frontend"""
+
+    return _registry or build_model_registry()
+
+
+def get_registered_model(app_label, model_name):
+    """Return a model class by its app label and model name"""
+
+    entry = get_model_registry().get((app_label, model_name))
+    if entry is not None:
+        return entry["model"]
+    return ContentType.objects.get_by_natural_key(app_label, model_name).model_class()
+
+
+def _get_cache():
+    return caches[NAVIGATION_CACHE] if NAVIGATION_CACHE else None
+
+
+def _get_cache_key(cache, user_id):
+    version = cache.get_or_set(_VERSION_KEY, 1, None)
+    return f"navigation:{version}:{user_id}"
+
+
+def invalidate_navigation(user_id=None):
+    """Invalidate the cached navigation of a user or, if user_id is None, of
+    all users"""
+
+    cache = _get_cache()
+    if cache is None:
+        return
+    if user_id is not None:
+        cache.delete(_get_cache_key(cache, user_id))
+        return
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 2, None)
+
+
+def _build_navigation(user):
+    registry = get_model_registry()
+    content_types = ContentType.objects.get_for_models(
+        *[entry["model"] for entry in registry.values()]
+    )
+
+    navigation = []
+    module_perms = {}
+    for (app_label, model_name), entry in registry.items():
+        # Check whether user has any perms for the given app
+        if app_label not in module_perms:
+            module_perms[app_label] = user.has_module_perms(app_label)
+        if not module_perms[app_label]:
+            continue
+
+        # Check whether user has any perms for the given model
+        perms = {
+            action: user.has_perm(f"{app_label}.{action}_{model_name}")
+            for action in ["add", "change", "view"]
+        }
+        if True not in perms.values():
+            continue
+
+        navigation.append(
+            {
+                "id": content_types[entry["model"]].id,
+                "app_label": app_label,
+                "app_verbose_name": entry["app_verbose_name"],
+                "model_class_name": entry["model_class_name"],
+                "model_verbose_name": entry["model_verbose_name"],
+                "model_verbose_plural": entry["model_verbose_plural"],
+                "permissions": perms,
+            }
+        )
+
+    return navigation
+
+
+def get_user_navigation(user):
+    """
+    Return the models shown in the frontend for which a user has
+    add/change/view permissions, with those permissions, as serialized by
+    NavigationSerializer
+    """
+
+    cache = _get_cache()
+    if cache is None or not user.is_authenticated:
+        return _build_navigation(user)
+
+    cache_key = _get_cache_key(cache, user.pk)
+    navigation = cache.get(cache_key)
+    if navigation is None:
+        navigation = _build_navigation(user)
+        cache.set(cache_key, navigation, NAVIGATION_CACHE_TIMEOUT)
+    return navigation
@@ -1,7 +1,250 @@
-from rest_framework.pagination import PageNumberPagination
+import datetime
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 25
     page_size_query_param = "limit"
     max_page_size = 100
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """Like DjangoJSONEncoder but keeps the microseconds of datetimes, which
+    must match exactly to be used as keys"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def get_approximate_count(queryset):
+    """
+    Return the number of rows of a queryset as estimated by the PostgreSQL
+    query planner from the table statistics, without counting them
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetResultsSetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the ordering of a queryset plus its primary
+    key, so that every page is fetched with an index-friendly WHERE clause
+    instead of a growing OFFSET and without counting all rows.
+
+    The count is omitted unless requested with count=exact or
+    count=approximate, the latter estimated from the PostgreSQL statistics
+    """
+
+    page_size = StandardResultsSetPagination.page_size
+    page_size_query_param = StandardResultsSetPagination.page_size_query_param
+    max_page_size = StandardResultsSetPagination.max_page_size
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Return the ordering of a queryset as a list of (field path, descending)
+        with the primary key as the last, unique, key
+        """
+
+        ordering = []
+        for order_by in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(order_by, str) or order_by == "?":
+                raise NotFound("Unsupported ordering for cursor pagination")
+            descending = order_by.startswith("-")
+            path = order_by.lstrip("-")
+            if path == "pk":
+                path = queryset.model._meta.pk.name
+            # Order foreign keys by their value, not by the ordering of the
+            # related model
+            if "__" not in path:
+                try:
+                    field = queryset.model._meta.get_field(path)
+                except FieldDoesNotExist:
+                    raise NotFound("Unsupported ordering for cursor pagination")
+                if field.is_relation:
+                    path = field.attname
+            if path not in [p for p, _ in ordering]:
+                ordering.append((path, descending))
+
+        pk_name = queryset.model._meta.pk.name
+        if pk_name not in [p for p, _ in ordering]:
+            descending = ordering[-1][1] if ordering else True
+            ordering.append((pk_name, descending))
+
+        return ordering
+
+    @staticmethod
+    def _order_by(ordering, reverse):
+        # Explicitly place nulls, as PostgreSQL does by default, so that the
+        # keyset filter below knows where they are
+        return [
+            F(path).asc(nulls_last=True)
+            if descending == reverse
+            else F(path).desc(nulls_first=True)
+            for path, descending in ordering
+        ]
+
+    @staticmethod
+    def _after(ordering, values, reverse):
+        """Q filter for the rows that come after values in ordering"""
+
+        keyset_filter = Q(pk__in=[])
+        equal = Q()
+        for (path, descending), value in zip(ordering, values):
+            ascending = descending == reverse
+            if value is None:
+                greater = Q(**{f"{path}__isnull": False}) if not ascending else None
+                same = Q(**{f"{path}__isnull": True})
+            else:
+                if ascending:
+                    greater = Q(**{f"{path}__gt": value}) | Q(
+                        **{f"{path}__isnull": True}
+                    )
+                else:
+                    greater = Q(**{f"{path}__lt": value})
+                same = Q(**{path: value})
+            if greater is not None:
+                keyset_filter |= equal & greater
+            equal &= same
+        return keyset_filter
+
+    def encode_cursor(self, values, reverse):
+        cursor = json.dumps(
+            {"v": values, "r": int(reverse)}, cls=CursorJSONEncoder
+        ).encode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, b64encode(cursor).decode()
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(b64decode(encoded.encode()))
+            values, reverse = cursor["v"], bool(cursor["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound("Invalid cursor")
+        return values, reverse
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        values, reverse = self.decode_cursor(request)
+
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == "approximate":
+            self.count = get_approximate_count(queryset)
+        elif count_mode == "exact":
+            self.count = queryset.count()
+        else:
+            self.count = None
+
+        page_queryset = queryset.order_by(*self._order_by(self.ordering, reverse))
+        if values is not None:
+            # Values of the wrong type for their fields come from a tampered
+            # cursor
+            try:
+                page_queryset = page_queryset.filter(
+                    self._after(self.ordering, values, reverse)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound("Invalid cursor")
+
+        # Fetch one more row to know whether there is a following page
+        results = list(page_queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (values is not None) if not reverse else has_more
+        self.page = results
+
+        self.first_values = self.last_values = None
+        if results:
+            paths = [path for path, _ in self.ordering]
+            rows = {
+                row[0]: list(row[1:])
+                for row in queryset.model._default_manager.filter(
+                    pk__in={results[0].pk, results[-1].pk}
+                ).values_list("pk", *paths)
+            }
+            self.first_values = rows[results[0].pk]
+            self.last_values = rows[results[-1].pk]
+
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        return self.encode_cursor(self.last_values, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_values is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_values, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "nullable": True},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,165 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import FieldDoesNotExist
+
+QueryPlan = namedtuple("QueryPlan", ["select_related", "prefetch_related", "only"])
+
+
+def _resolve_path(model, path):
+    """
+    Split a field path, e.g. location__name__name, into the relations to
+    follow with select_related and prefetch_related and the columns to load.
+    Return None if the path cannot be resolved
+    """
+
+    select_related = None
+    prefetch_related = None
+    only = []
+    parts = path.split("__")
+    current_model = model
+
+    for i, part in enumerate(parts):
+        prefix = "__".join(parts[:i])
+        try:
+            field = current_model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+
+        if not field.is_relation:
+            if prefetch_related is None:
+                only.append(path)
+            break
+
+        lookup = "__".join(parts[: i + 1])
+        single_valued = field.concrete and (field.many_to_one or field.one_to_one)
+        if prefetch_related is None and single_valued:
+            select_related = lookup
+            if i == len(parts) - 1:
+                only.append(lookup)
+        else:
+            # Everything from the first multi-valued relation onwards is loaded
+            # by a separate query
+            if prefetch_related is None and isinstance(field, GenericForeignKey):
+                only += [
+                    "__".join(filter(None, [prefix, field.ct_field])),
+                    "__".join(filter(None, [prefix, field.fk_field])),
+                ]
+            prefetch_related = lookup
+
+        current_model = field.related_model
+        if current_model is None:
+            # Generic foreign keys do not have a single related model
+            break
+
+    return select_related, prefetch_related, only
+
+
+def _get_field_dependencies(model, field_name):
+    """
+    Return the field paths needed to render a list field, or None if they are
+    unknown. Methods declare theirs with a fields attribute, e.g.
+    approval_formatted.fields = ["created_approval_by_pi", ...]
+    """
+
+    attr = getattr(model, field_name, None)
+    if callable(attr):
+        dependencies = getattr(attr, "fields", None)
+        return list(dependencies) if dependencies is not None else None
+
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return None
+    # Foreign keys are serialized as their primary key, which is stored in
+    # the model's own table
+    if field.concrete and (field.many_to_one or field.one_to_one):
+        return [field.attname]
+    return [field_name]
+
+
+@lru_cache(maxsize=None)
+def get_query_plan(model, field_names):
+    """
+    Work out which relations to select_related/prefetch_related and which
+    columns to load to render field_names and the string representation of
+    the objects of a model.
+
+    The dependencies of __str__ are declared in the model's _str_fields.
+    Columns are only restricted with only() when all dependencies are known
+    """
+
+    dependencies = []
+    complete = True
+
+    str_fields = getattr(model, "_str_fields", None)
+    if str_fields is None:
+        complete = False
+    else:
+        dependencies += str_fields
+
+    for field_name in field_names:
+        field_dependencies = _get_field_dependencies(model, field_name)
+        if field_dependencies is None:
+            # Some fields are displayed with the _formatted suffix stripped
+            stripped_name = field_name.replace("_formatted", "")
+            field_dependencies = (
+                _get_field_dependencies(model, stripped_name)
+                if stripped_name != field_name
+                else None
+            )
+        if field_dependencies is None:
+            complete = False
+            continue
+        dependencies += field_dependencies
+
+    select_related = set()
+    prefetch_related = set()
+    only = {model._meta.pk.name}
+
+    for path in dependencies:
+        try:
+            field = model._meta.get_field(path)
+        except FieldDoesNotExist:
+            field = None
+        if field is not None and field.attname == path != field.name:
+            only.add(field.name)
+            continue
+        resolved = _resolve_path(model, path)
+        if resolved is None:
+            complete = False
+            continue
+        path_select_related, path_prefetch_related, path_only = resolved
+        if path_select_related:
+            select_related.add(path_select_related)
+            # Relations followed with select_related must not be deferred
+            only.add(path_select_related)
+        if path_prefetch_related:
+            prefetch_related.add(path_prefetch_related)
+        only.update(path_only)
+
+    # A relation selected as part of a longer path does not need to be listed
+    select_related = {
+        s
+        for s in select_related
+        if not any(o.startswith(f"{s}__") for o in select_related)
+    }
+
+    return QueryPlan(
+        sorted(select_related),
+        sorted(prefetch_related),
+        sorted(only) if complete else None,
+    )
+
+
+def apply_query_plan(queryset, plan):
+    """Apply a QueryPlan to a queryset"""
+
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if plan.only is not None:
+        queryset = queryset.only(*plan.only)
+    return queryset
@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.backends.utils import names_digest
+from django.db.models import Q, TextField
+from django.db.models.functions import Cast, Greatest, Upper
+from django.utils.module_loading import import_string
+
+# Dotted path of the backend used for the quick search of the models with
+# _search_fields, in the API and in the admin
+QUICK_SEARCH_BACKEND = getattr(
+    settings, "QUICK_SEARCH_BACKEND", "common.quick_search.TrigramSearchBackend"
+)
+
+
+class IContainsSearchBackend:
+    """Match a search value with icontains against any of the _search_fields
+    of a model"""
+
+    def get_search_fields(self, model):
+        return getattr(model, "_search_fields", [])
+
+    def filter(self, queryset, search_value, rank=True, search_fields=None):
+        """Return the objects in queryset that match search_value in
+        search_fields, by default the model's _search_fields. If rank is True
+        and supported, order them by relevance"""
+
+        if search_fields is None:
+            search_fields = self.get_search_fields(queryset.model)
+        search_filter = Q()
+        for field_name in search_fields:
+            search_filter |= Q(**{f"{field_name}__icontains": search_value})
+        return queryset.filter(search_filter)
+
+
+class TrigramSearchBackend(IContainsSearchBackend):
+    """
+    On PostgreSQL, back the icontains lookups of quick search with the pg_trgm
+    GIN indexes returned by get_trigram_indexes, and rank the results by
+    trigram similarity. Other databases use plain icontains
+    """
+
+    def __init__(self):
+        self._has_trigram = {}
+
+    def _get_local_fields(self, model, search_fields=None):
+        """Return the search fields of a model stored in its own table"""
+
+        if search_fields is None:
+            search_fields = self.get_search_fields(model)
+        fields = []
+        for field_name in search_fields:
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.is_relation:
+                fields.append(field)
+        return fields
+
+    def has_trigram(self, using):
+        """Check whether the pg_trgm extension is available"""
+
+        if using not in self._has_trigram:
+            connection = connections[using]
+            if connection.vendor != "postgresql":
+                self._has_trigram[using] = False
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+                    )
+                    self._has_trigram[using] = cursor.fetchone() is not None
+        return self._has_trigram[using]
+
+    def filter(self, queryset, search_value, rank=True, search_fields=None):
+        queryset = super().filter(queryset, search_value, rank, search_fields)
+        if not rank or not self.has_trigram(queryset.db):
+            return queryset
+
+        model = queryset.model
+        similarities = [
+            TrigramSimilarity(Cast(field.name, TextField()), search_value)
+            for field in self._get_local_fields(model, search_fields)
+        ]
+        if not similarities:
+            return queryset
+        search_rank = (
+            Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        )
+        ordering = queryset.query.order_by or model._meta.ordering or ["pk"]
+        return queryset.annotate(search_rank=search_rank).order_by(
+            "-search_rank", *ordering
+        )
+
+
+def get_trigram_indexes(model_name, field_names):
+    """
+    Return, for the Meta of a model, a pg_trgm GIN index on UPPER(column::text)
+    of each of field_names, the expression that Django compares with LIKE for
+    icontains. Names end with a hash of the model and field names, so that
+    shortened names cannot collide
+    """
+
+    return [
+        GinIndex(
+            OpClass(Upper(Cast(field_name, TextField())), name="gin_trgm_ops"),
+            name=(
+                f"{model_name[:12]}_{field_name[:5]}_"
+                f"{names_digest(model_name, field_name, length=6)}_trgm"
+            ),
+        )
+        for field_name in field_names
+    ]
+
+
+_backend = None
+
+
+def get_search_backend():
+    """Return the quick search backend set by QUICK_SEARCH_BACKEND"""
+
+    global _backend
+    if _backend is None:
+        _backend = import_string(QUICK_SEARCH_BACKEND)()
+    return _backend
+
+
+def quick_search(queryset, search_value, rank=True, search_fields=None):
+    """Filter queryset by search_value with the quick search backend"""
+
+    return get_search_backend().filter(
+        queryset, search_value, rank=rank, search_fields=search_fields
+    )
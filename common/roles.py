@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import caches
+
+# Cache that stores the group names of each user, from which their roles are
+# resolved, by default none and they are loaded once per user instance, e.g.
+# per request. As for the navigation, only set it to a cache shared by all
+# processes, as the roles are invalidated when groups change only in the cache
+# of the process that changed them
+ROLES_CACHE = getattr(settings, "ROLES_CACHE", None)
+ROLES_CACHE_TIMEOUT = getattr(settings, "ROLES_CACHE_TIMEOUT", 300)
+
+_VERSION_KEY = "roles:version"
+
+
+def _get_cache():
+    return caches[ROLES_CACHE] if ROLES_CACHE else None
+
+
+def _get_cache_key(cache, user_id):
+    version = cache.get_or_set(_VERSION_KEY, 1, None)
+    return f"roles:{version}:{user_id}"
+
+
+def get_group_names(user):
+    """Return the names of the groups of a user as a frozenset"""
+
+    if user.pk is None:
+        return frozenset()
+
+    cache = _get_cache()
+    if cache is None:
+        return frozenset(user.groups.values_list("name", flat=True))
+
+    cache_key = _get_cache_key(cache, user.pk)
+    group_names = cache.get(cache_key)
+    if group_names is None:
+        group_names = frozenset(user.groups.values_list("name", flat=True))
+        cache.set(cache_key, group_names, ROLES_CACHE_TIMEOUT)
+    return group_names
+
+
+def invalidate_roles(user_ids=None):
+    """Invalidate the cached group names of some users or, if user_ids is
+    None, of all users"""
+
+    cache = _get_cache()
+    if cache is None:
+        return
+    if user_ids is not None:
+        cache.delete_many([_get_cache_key(cache, user_id) for user_id in user_ids])
+        return
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 2, None)
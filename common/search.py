@@ -1,10 +1,31 @@
 from django.contrib.auth import get_user_model
-from django.db.models.functions import Collate
 from djangoql.schema import StrField
 
+from .suggestions import SuggestionIndex
+
 User = get_user_model()
 
 
+def get_user_suggestion_index(field_name, model_user_options=None):
+    """Return the suggestion index of a field of the non-system users, only of
+    those who created objects of model_user_options if set"""
+
+    def get_values():
+        users = User.objects.exclude(is_system_user=True)
+        if model_user_options:
+            users = users.filter(
+                id__in=model_user_options.objects.values_list("created_by_id")
+            )
+        return users.values_list(field_name, flat=True)
+
+    models = [User]
+    name = f"user.{field_name}"
+    if model_user_options:
+        models.append(model_user_options)
+        name += f":{model_user_options._meta.label_lower}"
+    return SuggestionIndex(name, get_values, models)
+
+
 def check_search_length(search):
     """Check if the search string is less than 3 characters long and
     return a default message if so."""
@@ -14,40 +35,28 @@ def check_search_length(search):
 
 
 class SearchFieldWithOptions(StrField):
-    """Search field with a certain number of options"""
-
-    def __init__(self, limit_options=20, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.limit_options = limit_options
+    """Search field with options suggested from a SuggestionIndex"""
 
     suggest_options = True
+    # Only suggest options for searches of at least 3 characters
+    require_search_length = True
+
+    def get_suggestion_index(self):
+        return SuggestionIndex(
+            f"{self.model._meta.label_lower}.{self.model_fieldname}",
+            lambda: self.model.objects.values_list(self.model_fieldname, flat=True),
+            [self.model],
+        )
 
     def get_options(self, search):
-        filter_search = {f"{self.model_fieldname}__icontains": search}
+        """Suggest the values of model_fieldname that contain search, those
+        that start with it first. Suggestions are paginated by the view"""
 
-        if self.limit_options:
+        if self.require_search_length:
             if default_option := check_search_length(search):
                 return default_option
 
-            option_field = (
-                self.name if self.name == self.model_fieldname else self.model_fieldname
-            )
-            options = list(
-                self.model.objects.filter(**filter_search)
-                .distinct()
-                .order_by(option_field)
-                .values_list(option_field, flat=True)[: self.limit_options + 1]
-            )
-
-            if len(options) > self.limit_options:
-                return options[: self.limit_options] + ["..."]
-            return options
-
-        return (
-            self.model.objects.filter(**filter_search)
-            .order_by(self.model_fieldname)
-            .values_list(self.model_fieldname, flat=True)
-        )
+        return self.get_suggestion_index().search(search)
 
     def get_lookup_name(self):
         if self.name == self.model_fieldname:
@@ -68,39 +77,12 @@ class SearchFieldUserUsernameWithOptions(StrField):
         super().__init__(**kwargs)
 
     def get_options(self, search):
-        """Removes system users from the list of options,
-        distinct() returns only unique values
-        sorted in alphabetical order by last name"""
-
-        if self.model_user_options:
-            return (
-                self.model.objects.annotate(
-                    **{f"{self.name}_deterministic": Collate(self.name, "und-x-icu")},
-                )
-                .filter(
-                    **{
-                        "id__in": self.model_user_options.objects.all()
-                        .values_list("created_by_id", flat=True)
-                        .distinct(),
-                        f"{self.name}_deterministic__icontains": search,
-                    }
-                )
-                .exclude(is_system_user=True)
-                .distinct()
-                .order_by("last_name")
-                .values_list(self.name, flat=True)
-            )
-        else:
-            return (
-                self.model.objects.annotate(
-                    **{f"{self.name}_deterministic": Collate(self.name, "und-x-icu")},
-                )
-                .filter(**{f"{self.name}_deterministic__icontains": search})
-                .exclude(is_system_user=True)
-                .distinct()
-                .order_by("last_name")
-                .values_list(self.name, flat=True)
-            )
+        """Suggest the usernames of non-system users, only of those who
+        created objects of model_user_options if set"""
+
+        return get_user_suggestion_index(self.name, self.model_user_options).search(
+            search
+        )
 
 
 class SearchFieldUserLastnameWithOptions(StrField):
@@ -117,28 +99,9 @@ class SearchFieldUserLastnameWithOptions(StrField):
         super().__init__(**kwargs)
 
     def get_options(self, search):
-        """Removes system users from the list of options,
-        distinct() returns only unique values sorted in
-        alphabetical order"""
-
-        if self.model_user_options:
-            return (
-                self.model.objects.filter(
-                    id__in=self.model_user_options.objects.all()
-                    .values_list("created_by_id", flat=True)
-                    .distinct(),
-                    last_name__icontains=search,
-                )
-                .exclude(is_system_user=True)
-                .distinct()
-                .order_by(self.name)
-                .values_list(self.name, flat=True)
-            )
-        else:
-            return (
-                self.model.objects.filter(last_name__icontains=search)
-                .exclude(is_system_user=True)
-                .distinct()
-                .order_by(self.name)
-                .values_list(self.name, flat=True)
-            )
+        """Suggest the last names of non-system users, only of those who
+        created objects of model_user_options if set"""
+
+        return get_user_suggestion_index(self.name, self.model_user_options).search(
+            search
+        )
@@ -1,12 +1,20 @@
+import copy
+import threading
+
 from django.contrib.admin.models import LogEntry
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
 
 User = get_user_model()
 
+_serializer_classes = {}
+_serializer_classes_lock = threading.Lock()
 
-def build_model_serializer(model_obj, serializer, field_names, *args, **kwargs):
+
+def create_model_serializer(model_obj, serializer, field_names):
     """
     Based on https://stackoverflow.com/questions/297383
     Create a serializer on the fly where the Meta class's model
@@ -18,13 +26,15 @@ def build_model_serializer(model_obj, serializer, field_names, *args, **kwargs):
 
         class Meta:
             model = model_obj
-            fields = field_names + ["representation"]
+            fields = list(field_names) + ["representation"]
 
-        def __init__(self, *args_init, **kwargs_init):
-            kwargs_copy = kwargs_init.copy()
-            # if "model" in kwargs_copy:
-            #     del kwargs_copy["model"]
-            super().__init__(*args_init, **kwargs_copy)
+        def get_fields(self):
+            # Introspect the model only once per serializer class, like DRF
+            # does for declared fields
+            cls = type(self)
+            if "_fields_prototype" not in cls.__dict__:
+                cls._fields_prototype = super().get_fields()
+            return copy.deepcopy(cls._fields_prototype)
 
         def get_representation(self, obj):
             return str(obj)
@@ -32,6 +42,22 @@ def build_model_serializer(model_obj, serializer, field_names, *args, **kwargs):
     return DynamicModelSerializer
 
 
+def build_model_serializer(model_obj, serializer, field_names, *args, **kwargs):
+    """
+    Return a serializer for a model and a list of fields, created
+    only once per process for each combination
+    """
+
+    key = (model_obj, serializer, tuple(field_names))
+    serializer_class = _serializer_classes.get(key)
+    if serializer_class is None:
+        with _serializer_classes_lock:
+            serializer_class = _serializer_classes.setdefault(
+                key, create_model_serializer(model_obj, serializer, field_names)
+            )
+    return serializer_class
+
+
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     representation = serializers.SerializerMethodField()
 
@@ -99,6 +125,13 @@ class LogEntrySerializer(serializers.ModelSerializer):
         ]
 
     def get_representation(self, obj):
+        # Representations resolved in bulk, see UserViewSet.recent_events
+        representations = self.context.get("representations")
+        if representations is not None:
+            return representations.get(
+                (obj.content_type_id, obj.object_id), obj.object_repr
+            )
+
         try:
             edited_object = obj.get_edited_object()
             return getattr(
@@ -149,8 +182,91 @@ class NavigationSerializer(serializers.ModelSerializer):
 
 
 class ListSerializer(serializers.ModelSerializer):
+    # Read model columns directly, instead of through each field's
+    # get_attribute, when serializing
+    fast_representation = True
+
+    _to_python = {
+        serializers.BooleanField: None,
+        serializers.CharField: str,
+        serializers.IntegerField: int,
+    }
+
+    def _get_value_getter(self, field):
+        """
+        Return a function that returns the serialized value of a field for an
+        instance, the same as Serializer.to_representation does
+        """
+
+        if isinstance(field, serializers.SerializerMethodField):
+            return getattr(self, field.method_name)
+
+        # Replaced with approval_formatted() in to_representation
+        if field.field_name == "approval":
+            return lambda obj: None
+
+        model = self.Meta.model
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            model_field = None
+
+        if model_field is not None and model_field.concrete:
+            if (
+                isinstance(field, PrimaryKeyRelatedField)
+                and field.use_pk_only_optimization()
+                and field.pk_field is None
+            ):
+                # Foreign keys are serialized as the value of their column
+                attname = model_field.attname
+                return lambda obj: getattr(obj, attname)
+
+            if not model_field.is_relation:
+                attname = model_field.attname
+                to_python = self._to_python.get(type(field), field.to_representation)
+                if to_python is None:
+                    return lambda obj: getattr(obj, attname)
+
+                def get_value(obj):
+                    value = getattr(obj, attname)
+                    return None if value is None else to_python(value)
+
+                return get_value
+
+        def get_value(obj):
+            try:
+                attribute = field.get_attribute(obj)
+            except serializers.SkipField:
+                return serializers.empty
+            check_for_none = (
+                attribute.pk
+                if isinstance(attribute, serializers.PKOnlyObject)
+                else attribute
+            )
+            if check_for_none is None:
+                return None
+            return field.to_representation(attribute)
+
+        return get_value
+
     def to_representation(self, instance):
-        representation = super().to_representation(instance)
+        if not self.fast_representation:
+            representation = super().to_representation(instance)
+        else:
+            # Build the getters once per serializer, i.e. once for all the
+            # objects of a list
+            value_getters = self.__dict__.get("_value_getters")
+            if value_getters is None:
+                value_getters = self._value_getters = [
+                    (field.field_name, self._get_value_getter(field))
+                    for field in self._readable_fields
+                ]
+            representation = {}
+            for field_name, get_value in value_getters:
+                value = get_value(instance)
+                if value is not serializers.empty:
+                    representation[field_name] = value
+
         if "approval" in representation:
             representation["approval"] = instance.approval_formatted()
         return representation
@@ -3,9 +3,15 @@ import socket
 
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.contrib.auth.signals import user_login_failed
 from django.dispatch import receiver
 
+from .navigation import invalidate_navigation
+from .roles import invalidate_roles
+from .suggestions import invalidate_suggestions
+
 LOGGER = logging.getLogger("logfile")
 
 FAIL2BAN_ENABLE = getattr(settings, "FAIL2BAN_ENABLE", False)
@@ -52,3 +58,56 @@ def user_login_failed_receiver(sender, credentials, request, **kwargs):
     # fail2ban can be used to monitor these log entries
     # datepattern = ^\[WARNING\]\ \[%%d/%%b/%%Y %%H:%%M:%%S\]
     # failregex = Failed login attempt.*, ip: <HOST>
+
+
+def user_logged_in_receiver(sender, user, **kwargs):
+    """Recompute the navigation of a user when they log in"""
+
+    invalidate_navigation(user.pk)
+
+
+def user_changed_receiver(sender, instance, **kwargs):
+    """Recompute the navigation of a user when they change, e.g. become
+    superuser or inactive"""
+
+    invalidate_navigation(instance.pk)
+
+
+def user_permissions_changed_receiver(
+    sender, instance, action, reverse, pk_set=None, **kwargs
+):
+    """Recompute the navigation of a user when their groups or permissions
+    change, or of all users when the permissions of a group change.
+    When the groups of users change, also reload their roles"""
+
+    if not action.startswith("post_"):
+        return
+    invalidate_navigation(None if reverse else instance.pk)
+
+    if sender is get_user_model().groups.through:
+        if not reverse:
+            instance.clear_group_names()
+            invalidate_roles([instance.pk])
+        else:
+            # The users added to or removed from a group, all of them when a
+            # group is cleared
+            invalidate_roles(pk_set if action != "post_clear" else None)
+
+
+def permissions_changed_receiver(sender, **kwargs):
+    """Recompute the navigation of all users when groups or permissions change,
+    and reload the roles of all users when groups are renamed or deleted"""
+
+    action = kwargs.get("action")
+    if action is not None and not action.startswith("post_"):
+        return
+    invalidate_navigation()
+    if sender is Group:
+        invalidate_roles()
+
+
+def suggestions_model_changed_receiver(sender, **kwargs):
+    """Refresh the suggestion indexes that depend on a model when one of its
+    objects is saved or deleted"""
+
+    invalidate_suggestions(sender)
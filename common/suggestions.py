@@ -0,0 +1,115 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+# Cache that stores the suggestion indexes of DjangoQL search fields, by
+# default none and an index is built in memory for each lookup. As for the
+# navigation, only set it to a cache shared by all processes, as indexes are
+# refreshed when objects change only in the cache of the process that changed
+# them
+SUGGESTIONS_CACHE = getattr(settings, "SUGGESTIONS_CACHE", None)
+# Indexes are refreshed when objects are saved or deleted, this timeout only
+# catches changes that do not send signals, e.g. QuerySet.update, or that are
+# made by processes that have not used the index yet
+SUGGESTIONS_CACHE_TIMEOUT = getattr(settings, "SUGGESTIONS_CACHE_TIMEOUT", 600)
+
+_connected_models = set()
+_connected_models_lock = threading.Lock()
+
+
+def _get_cache():
+    return caches[SUGGESTIONS_CACHE] if SUGGESTIONS_CACHE else None
+
+
+def _get_version_key(model):
+    return f"suggestions:version:{model._meta.label_lower}"
+
+
+def invalidate_suggestions(model):
+    """Invalidate the suggestion indexes that depend on the objects of a
+    model"""
+
+    cache = _get_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(_get_version_key(model))
+    except ValueError:
+        cache.set(_get_version_key(model), 2, None)
+
+
+def connect_suggestions_receivers(models):
+    """Refresh the suggestion indexes that depend on models when their
+    objects are saved or deleted"""
+
+    from .signals import suggestions_model_changed_receiver
+
+    with _connected_models_lock:
+        for model in models:
+            if model in _connected_models:
+                continue
+            for signal in [post_save, post_delete]:
+                signal.connect(suggestions_model_changed_receiver, sender=model)
+            _connected_models.add(model)
+
+
+class SuggestionIndex:
+    """
+    The distinct values of a field, sorted case-insensitively, from which the
+    options of a DjangoQL search field are suggested. With SUGGESTIONS_CACHE
+    set, the database is not queried on every keystroke.
+
+    get_values returns the values, models are the models whose changes
+    invalidate the index
+    """
+
+    def __init__(self, name, get_values, models):
+        self.name = name
+        self.get_values = get_values
+        self.models = models
+        if SUGGESTIONS_CACHE:
+            connect_suggestions_receivers(models)
+
+    def _get_cache_key(self, cache):
+        versions = [
+            str(cache.get_or_set(_get_version_key(model), 1, None))
+            for model in self.models
+        ]
+        return f"suggestions:{self.name}:{':'.join(versions)}"
+
+    def _build(self):
+        values = {str(value) for value in self.get_values() if value}
+        return sorted((value.casefold(), value) for value in values)
+
+    def get_entries(self):
+        """Return the values as a sorted list of (casefolded value, value)"""
+
+        cache = _get_cache()
+        if cache is None:
+            return self._build()
+
+        cache_key = self._get_cache_key(cache)
+        entries = cache.get(cache_key)
+        if entries is None:
+            entries = self._build()
+            cache.set(cache_key, entries, SUGGESTIONS_CACHE_TIMEOUT)
+        return entries
+
+    def search(self, search):
+        """Return the values that start with search, followed by those that
+        contain it, ignoring case"""
+
+        entries = self.get_entries()
+        search = search.casefold()
+
+        # Values that start with search are contiguous in the sorted entries
+        start = end = bisect_left(entries, (search,))
+        while end < len(entries) and entries[end][0].startswith(search):
+            end += 1
+
+        return [value for _, value in entries[start:end]] + [
+            value for key, value in entries[:start] + entries[end:] if search in key
+        ]
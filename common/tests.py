@@ -1,8 +1,43 @@
+import json
+import os
+import shutil
+import tempfile
+from base64 import b64encode
+from types import SimpleNamespace
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
-from django.test import TestCase
+from django.contrib.auth.models import Group, Permission
+from django.test import SimpleTestCase, TestCase
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from . import jobs, suggestions
+from .actions import export_action
+from .export import (
+    iter_tsv,
+    run_export_as_job,
+    save_export_query,
+    submit_export_job,
+    write_xlsx,
+)
+from .history import FieldChange, _diff
+from .history_pruning import get_duplicate_history_sql, prune_duplicate_history
+from .navigation import (
+    get_model_registry,
+    get_registered_model,
+    get_user_navigation,
+)
+from .paginators import KeysetResultsSetPagination
+from .serializers import ListSerializer, build_model_serializer
+from .query_planning import apply_query_plan, get_query_plan
+from .quick_search import (
+    IContainsSearchBackend,
+    TrigramSearchBackend,
+    get_trigram_indexes,
+)
 
 User = get_user_model()
 
@@ -132,6 +167,41 @@ class UserPropertiesTest(TestCase):
         user = make_user(email="regular@example.com")
         self.assertFalse(user.is_elevated_user)
 
+    def test_roles_resolved_with_one_query(self):
+        user = self._user_in_group("Lab manager")
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_lab_manager)
+            self.assertFalse(user.is_guest)
+            self.assertFalse(user.is_order_manager)
+            self.assertTrue(user.is_elevated_user)
+        # Other instances of the user, e.g. in later requests, reload them
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_lab_manager)
+
+    @patch("common.roles.ROLES_CACHE", "default")
+    def test_roles_cached_across_requests(self):
+        user = self._user_in_group("Lab manager")
+        self.assertTrue(User.objects.get(pk=user.pk).is_lab_manager)
+        user = User.objects.get(pk=user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.is_lab_manager)
+
+    @patch("common.roles.ROLES_CACHE", "default")
+    def test_roles_reloaded_when_groups_change(self):
+        user = self._user_in_group("Lab manager")
+        self.assertTrue(user.is_lab_manager)
+        user.groups.clear()
+        self.assertFalse(user.is_lab_manager)
+
+        guest_group, _ = Group.objects.get_or_create(name="Guest")
+        self.assertFalse(User.objects.get(pk=user.pk).is_guest)
+        guest_group.user_set.add(user)
+        self.assertTrue(User.objects.get(pk=user.pk).is_guest)
+        guest_group.delete()
+        self.assertFalse(User.objects.get(pk=user.pk).is_guest)
+
 
 # ---------------------------------------------------------------------------
 # CaseInsensitiveAuthenticationBackend
@@ -285,6 +355,47 @@ class UserViewSetTest(APITestCase):
         response = self.client.get("/api/common/user/logged/recent_events/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_recent_events_representations_in_bulk(self):
+        from django.contrib.admin.models import ADDITION, CHANGE, LogEntry
+        from django.contrib.contenttypes.models import ContentType
+
+        from collection.oligo.models import Oligo
+
+        oligos = [
+            Oligo.objects.create(
+                name=f"oligo{i}", sequence="ACGT", created_by=self.user
+            )
+            for i in range(3)
+        ]
+        content_type = ContentType.objects.get_for_model(Oligo)
+        for oligo in oligos:
+            LogEntry.objects.create(
+                user=self.user,
+                content_type=content_type,
+                object_id=str(oligo.pk),
+                object_repr="outdated",
+                action_flag=ADDITION,
+            )
+        LogEntry.objects.create(
+            user=self.user,
+            content_type=content_type,
+            object_id="0",
+            object_repr="deleted oligo",
+            action_flag=CHANGE,
+        )
+
+        ContentType.objects.get_for_id(content_type.id)
+        # Log entries, and one query for all oligos
+        with self.assertNumQueries(2):
+            data = self.client.get(
+                "/api/common/user/logged/recent_events/",
+                {"user_id": self.user.id},
+            ).data
+        representations = {e["id"]: e["representation"] for e in data}
+        self.assertEqual(representations["0"], "deleted oligo")
+        for oligo in oligos:
+            self.assertEqual(representations[str(oligo.pk)], oligo.name)
+
     def test_unauthenticated_user_list_returns_403(self):
         self.client.force_authenticate(user=None)
         response = self.client.get("/api/common/user/")
@@ -292,3 +403,841 @@ class UserViewSetTest(APITestCase):
             response.status_code,
             [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
         )
+
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+
+
+def job_succeeding(job_id, value):
+    return {"value": value}
+
+
+def job_failing(job_id):
+    raise ValueError("Something went wrong")
+
+
+class BackgroundJobsTest(SimpleTestCase):
+    def setUp(self):
+        self.jobs_dir = tempfile.mkdtemp()
+        patcher = patch.object(jobs, "JOBS_DIR", self.jobs_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.jobs_dir, ignore_errors=True)
+        self.user = SimpleNamespace(id=1, is_superuser=False)
+
+    def _submit(self, func_name, *args):
+        with patch.object(jobs, "run_job") as run_job:
+            job_id = jobs.submit_job(
+                f"common.tests.{func_name}", *args, user=self.user, name="Test"
+            )
+        run_job.assert_called_once()
+        return job_id
+
+    def test_submitted_job_is_pending(self):
+        job_id = self._submit("job_succeeding", 1)
+        job = jobs.get_job(job_id)
+        self.assertEqual(job["status"], jobs.JOB_PENDING)
+        self.assertEqual(job["user_id"], 1)
+
+    def test_run_job_stores_result(self):
+        job_id = self._submit("job_succeeding", 42)
+        jobs.run_job_now(job_id, "common.tests.job_succeeding", [42])
+        job = jobs.get_job(job_id)
+        self.assertEqual(job["status"], jobs.JOB_DONE)
+        self.assertEqual(job["result"], {"value": 42})
+
+    def test_run_job_stores_error(self):
+        job_id = self._submit("job_failing")
+        with self.assertLogs("logfile", "ERROR"):
+            jobs.run_job_now(job_id, "common.tests.job_failing")
+        job = jobs.get_job(job_id)
+        self.assertEqual(job["status"], jobs.JOB_FAILED)
+        self.assertEqual(job["error"], "Something went wrong")
+
+    def test_job_access(self):
+        job_id = self._submit("job_succeeding", 1)
+        job = jobs.get_job(job_id)
+        self.assertTrue(jobs.user_can_access_job(self.user, job))
+        self.assertFalse(
+            jobs.user_can_access_job(SimpleNamespace(id=2, is_superuser=False), job)
+        )
+        self.assertTrue(
+            jobs.user_can_access_job(SimpleNamespace(id=2, is_superuser=True), job)
+        )
+
+    def test_invalid_job_id(self):
+        self.assertIsNone(jobs.get_job("../../etc/passwd"))
+
+
+# ---------------------------------------------------------------------------
+# Query planning
+# ---------------------------------------------------------------------------
+
+
+class QueryPlanTest(SimpleTestCase):
+    def test_str_dependencies_are_selected(self):
+        from collection.storage.models import LocationItem
+
+        plan = get_query_plan(LocationItem, ())
+        self.assertEqual(plan.select_related, ["location__name"])
+        self.assertEqual(plan.prefetch_related, [])
+        self.assertIn("location__name__name", plan.only)
+        self.assertIn("box", plan.only)
+        self.assertNotIn("comment", plan.only)
+
+    def test_many_to_many_dependencies_are_prefetched(self):
+        from formz.models import SequenceFeature
+
+        plan = get_query_plan(
+            SequenceFeature,
+            ("id", "name", "donor_species_names_formatted", "nuc_acid_risk_formatted"),
+        )
+        self.assertEqual(plan.select_related, ["nuc_acid_risk"])
+        self.assertEqual(plan.prefetch_related, ["donor_organism"])
+        self.assertEqual(plan.only, ["common_feature", "id", "name", "nuc_acid_risk"])
+
+    def test_list_foreign_keys_are_not_selected(self):
+        from collection.models import Plasmid
+
+        plan = get_query_plan(
+            Plasmid,
+            tuple(
+                Plasmid._list_display_frozen
+                + Plasmid._list_display
+                + getattr(Plasmid, "_api_list_fields", [])
+            ),
+        )
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, [])
+        self.assertEqual(
+            plan.only,
+            [
+                "created_approval_by_pi",
+                "created_by",
+                "id",
+                "last_changed_approval_by_pi",
+                "map_dna",
+                "name",
+                "selection",
+            ],
+        )
+
+    def test_unknown_dependencies_load_all_columns(self):
+        from collection.models import WormStrain
+
+        plan = get_query_plan(WormStrain, tuple(WormStrain._list_display))
+        self.assertIsNone(plan.only)
+
+        plan = get_query_plan(User, ())
+        self.assertIsNone(plan.only)
+
+    def test_apply_query_plan(self):
+        from collection.storage.models import LocationItem
+
+        queryset = apply_query_plan(
+            LocationItem.objects.all(), get_query_plan(LocationItem, ())
+        )
+        sql = str(queryset.query)
+        self.assertIn("collection_locationname", sql)
+        self.assertNotIn("comment", sql)
+
+    def test_str_fields_are_valid(self):
+        from django.apps import apps
+
+        for model in apps.get_models():
+            if getattr(model, "_str_fields", None) is None:
+                continue
+            with self.subTest(model=model._meta.label):
+                self.assertIsNotNone(get_query_plan(model, ()).only)
+
+
+# ---------------------------------------------------------------------------
+# Cursor pagination
+# ---------------------------------------------------------------------------
+
+
+class KeysetResultsSetPaginationTest(SimpleTestCase):
+    def setUp(self):
+        from collection.models import Oligo
+
+        self.model = Oligo
+        self.paginator = KeysetResultsSetPagination()
+
+    def test_ordering_ends_with_primary_key(self):
+        queryset = self.model.objects.order_by("name", "-created_by")
+        self.assertEqual(
+            self.paginator.get_ordering(queryset),
+            [("name", False), ("created_by_id", True), ("id", True)],
+        )
+        self.assertEqual(
+            self.paginator.get_ordering(self.model.objects.order_by("-id")),
+            [("id", True)],
+        )
+
+    def test_keyset_filter(self):
+        ordering = [("name", False), ("id", True)]
+        queryset = self.model.objects.filter(
+            self.paginator._after(ordering, ["oTest", 10], reverse=False)
+        )
+        where = str(queryset.query).split("WHERE")[1]
+        self.assertIn('"collection_oligo"."name" > oTest', where)
+        self.assertIn('"collection_oligo"."name" IS NULL', where)
+        self.assertIn('"collection_oligo"."id" < 10', where)
+
+        # Going backwards inverts the comparisons
+        queryset = self.model.objects.filter(
+            self.paginator._after(ordering, ["oTest", 10], reverse=True)
+        )
+        where = str(queryset.query).split("WHERE")[1]
+        self.assertIn('"collection_oligo"."name" < oTest', where)
+        self.assertIn('"collection_oligo"."id" > 10', where)
+
+    def test_null_keys(self):
+        ordering = [("name", False), ("id", True)]
+        queryset = self.model.objects.filter(
+            self.paginator._after(ordering, [None, 10], reverse=False)
+        )
+        where = str(queryset.query).split("WHERE")[1]
+        self.assertNotIn(">", where)
+        self.assertIn('"collection_oligo"."id" < 10', where)
+
+    def test_cursor_values_of_wrong_type(self):
+        cursor = b64encode(json.dumps({"v": ["abc"], "r": 0}).encode()).decode()
+        request = Request(APIRequestFactory().get("/", {"cursor": cursor}))
+        with self.assertRaises(NotFound):
+            self.paginator.paginate_queryset(
+                self.model.objects.order_by("-id"), request
+            )
+
+
+# ---------------------------------------------------------------------------
+# Navigation
+# ---------------------------------------------------------------------------
+
+
+class ModelRegistryTest(SimpleTestCase):
+    def test_registry(self):
+        from collection.models import Plasmid
+
+        registry = get_model_registry()
+        self.assertEqual(list(registry), sorted(registry))
+        entry = registry[("collection", "plasmid")]
+        self.assertIs(entry["model"], Plasmid)
+        self.assertEqual(entry["model_class_name"], "Plasmid")
+        self.assertEqual(entry["model_verbose_plural"], "Plasmids")
+        self.assertNotIn(("auth", "group"), registry)
+
+    def test_get_registered_model(self):
+        from collection.models import Plasmid
+
+        # SimpleTestCase would fail if the database were queried
+        self.assertIs(get_registered_model("collection", "plasmid"), Plasmid)
+
+
+class UserNavigationTest(TestCase):
+    def setUp(self):
+        self.user = make_user(email="navuser@example.com")
+        self.user.user_permissions.add(
+            Permission.objects.get(
+                codename="view_plasmid", content_type__app_label="collection"
+            )
+        )
+        self.group = Group.objects.create(name="Navigation test")
+
+    def _get_navigation(self):
+        # Reload the user as permissions are cached on the instance
+        return {
+            e["model_class_name"]: e["permissions"]
+            for e in get_user_navigation(User.objects.get(pk=self.user.pk))
+        }
+
+    def test_navigation(self):
+        navigation = self._get_navigation()
+        self.assertEqual(
+            navigation, {"Plasmid": {"add": False, "change": False, "view": True}}
+        )
+
+    def test_navigation_not_cached_by_default(self):
+        self._get_navigation()
+        self.user.user_permissions.add(
+            Permission.objects.get(
+                codename="add_plasmid", content_type__app_label="collection"
+            )
+        )
+        self.assertTrue(self._get_navigation()["Plasmid"]["add"])
+
+    @patch("common.navigation.NAVIGATION_CACHE", "default")
+    def test_navigation_cached(self):
+        self._get_navigation()
+        with self.assertNumQueries(0):
+            get_user_navigation(self.user)
+
+    @patch("common.navigation.NAVIGATION_CACHE", "default")
+    def test_navigation_invalidated_on_group_changes(self):
+        self._get_navigation()
+
+        self.user.groups.add(self.group)
+        self.group.permissions.add(
+            Permission.objects.get(
+                codename="add_plasmid", content_type__app_label="collection"
+            )
+        )
+        self.assertTrue(self._get_navigation()["Plasmid"]["add"])
+
+        self.user.groups.remove(self.group)
+        self.assertFalse(self._get_navigation()["Plasmid"]["add"])
+
+    def test_navigation_api(self):
+        self.client.force_login(self.user)
+        response = self.client.get("/api/navigation/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([e["model_class_name"] for e in response.json()], ["Plasmid"])
+
+
+# ---------------------------------------------------------------------------
+# Serializers
+# ---------------------------------------------------------------------------
+
+
+class BuildModelSerializerTest(SimpleTestCase):
+    field_names = [
+        "id",
+        "name",
+        "sequence",
+        "length",
+        "restriction_site",
+        "info_sheet",
+        "created_by",
+        "created_date_time",
+        "created_approval_by_pi",
+    ]
+
+    def setUp(self):
+        from datetime import datetime, timezone
+
+        from collection.models import Oligo
+
+        self.model = Oligo
+        self.oligos = [
+            Oligo(
+                id=1,
+                name="oTest",
+                sequence="ATCGATCGATCGATCGATCG",
+                length=20,
+                created_by_id=3,
+                created_date_time=datetime(2024, 1, 2, 3, 4, 5, 678, timezone.utc),
+                created_approval_by_pi=True,
+            ),
+            Oligo(id=2, name="oEmpty", sequence="ATCG", created_by_id=None),
+        ]
+
+    def test_serializer_classes_are_memoized(self):
+        serializer_class = build_model_serializer(
+            self.model, ListSerializer, self.field_names
+        )
+        self.assertIs(
+            build_model_serializer(self.model, ListSerializer, list(self.field_names)),
+            serializer_class,
+        )
+        self.assertIsNot(
+            build_model_serializer(self.model, ListSerializer, ["id"]),
+            serializer_class,
+        )
+
+    def test_fast_representation(self):
+        serializer_class = build_model_serializer(
+            self.model, ListSerializer, self.field_names
+        )
+        data = serializer_class(self.oligos, many=True).data
+
+        class SlowSerializer(serializer_class):
+            fast_representation = False
+
+        expected = SlowSerializer(self.oligos, many=True).data
+        self.assertEqual(data, expected)
+        self.assertEqual(data[0]["representation"], "1 - oTest")
+        self.assertEqual(data[0]["created_by"], 3)
+        self.assertEqual(list(data[0]), self.field_names + ["representation"])
+
+    def test_fast_representation_approval(self):
+        serializer_class = build_model_serializer(
+            self.model, ListSerializer, ["id", "approval"]
+        )
+        data = serializer_class(self.oligos, many=True).data
+        self.assertIs(data[0]["approval"], True)
+        self.assertIs(data[1]["approval"], False)
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+
+
+class HistoryDiffTest(SimpleTestCase):
+    def setUp(self):
+        from collection.models import Oligo
+
+        self.model = Oligo
+        self.history_model = Oligo.history.model
+        self.history_fields = [
+            (name, self.history_model._meta.get_field(name))
+            for name in ["name", "sequence", "created_by", "history_locations"]
+        ]
+
+    def test_diff(self):
+        older = self.history_model(
+            name="oOld", sequence="ATCG", created_by_id=1, history_locations=[1]
+        )
+        newer = self.history_model(
+            name="oNew", sequence="ATCG", created_by_id=2, history_locations=[1, 2]
+        )
+        self.assertEqual(
+            _diff(self.model, self.history_fields, {}, newer, older),
+            [
+                ("created_by", 1, 2),
+                ("history_locations", [1], [1, 2]),
+                ("name", "oOld", "oNew"),
+            ],
+        )
+        self.assertEqual(_diff(self.model, self.history_fields, {}, newer, newer), [])
+
+    def test_diff_m2m_rows(self):
+        older = self.history_model(history_id=1, name="oTest")
+        newer = self.history_model(history_id=2, name="oTest")
+        m2m_rows = {"formz_projects": {1: [{"project": 1}]}}
+        self.assertEqual(
+            _diff(self.model, self.history_fields, m2m_rows, newer, older),
+            [("formz_projects", [{"project": 1}], [])],
+        )
+        m2m_rows["formz_projects"][2] = [{"project": 1}]
+        self.assertEqual(
+            _diff(self.model, self.history_fields, m2m_rows, newer, older), []
+        )
+
+    def test_field_change_uses_resolved_objects(self):
+        from collection.storage.models import LocationItem
+
+        items = {1: LocationItem(id=1, box="B1"), 2: LocationItem(id=2, box="B2")}
+        field_change = FieldChange(
+            field=self.model._meta.get_field("history_locations"),
+            old_value=[1],
+            new_value=[1, 2, 3],
+            related_model=LocationItem,
+            related_objects=items,
+        )
+        self.assertEqual(field_change.old_value_prettified, "B1")
+        # Objects that do not exist anymore are skipped
+        self.assertEqual(field_change.new_value_prettified, "B1, B2")
+
+
+class HistoryPruningSqlTest(SimpleTestCase):
+    def test_sql_compares_tracked_columns_but_timestamp(self):
+        from django.utils import timezone
+
+        from collection.models import Oligo
+
+        since = timezone.now()
+        sql, params = get_duplicate_history_sql(Oligo, since=since)
+        self.assertIn('"sequence" IS NOT DISTINCT FROM LAG("sequence") OVER w', sql)
+        self.assertIn('"created_by_id" IS NOT DISTINCT FROM', sql)
+        self.assertIn('"history_type" IS NOT DISTINCT FROM', sql)
+        self.assertNotIn('LAG("last_changed_date_time")', sql)
+        self.assertIn("PARTITION BY", sql)
+        self.assertEqual(params, [since])
+
+
+class HistoryPruningTest(TestCase):
+    def setUp(self):
+        from collection.models import Oligo
+
+        self.model = Oligo
+        self.user = make_user(email="pruning@example.com")
+        self.oligo = Oligo.objects.create(
+            name="oPrune", sequence="ATCG", created_by=self.user
+        )
+        # Saved without changes, differs only by last_changed_date_time
+        self.oligo.save()
+        self.oligo.name = "oPruned"
+        self.oligo.save()
+
+    def test_dry_run_reports_duplicates(self):
+        report = prune_duplicate_history(models=[self.model], dry_run=True)
+        self.assertEqual(report[0]["model"], "collection.Oligo")
+        self.assertEqual(report[0]["duplicates"], 1)
+        self.assertEqual(self.oligo.history.count(), 3)
+
+    def test_prune_deletes_duplicates(self):
+        duplicate_id = self.oligo.history.order_by("history_id")[1].history_id
+        report = prune_duplicate_history(models=[self.model])
+        self.assertEqual(report[0]["duplicates"], 1)
+        self.assertEqual(self.oligo.history.count(), 2)
+        self.assertFalse(self.oligo.history.filter(history_id=duplicate_id).exists())
+
+    def test_prune_keeps_deletions(self):
+        oligo_id = self.oligo.id
+        self.oligo.delete()
+        report = prune_duplicate_history(models=[self.model], since=None)
+        self.assertEqual(report[0]["duplicates"], 1)
+        history = self.model.history.filter(id=oligo_id)
+        self.assertEqual(history.count(), 3)
+        self.assertEqual(history.latest().history_type, "-")
+
+
+class HistoryViewTest(APITestCase):
+    def setUp(self):
+        from collection.models import Oligo
+
+        self.user = make_user(email="history@example.com", is_superuser=True)
+        self.client.force_authenticate(user=self.user)
+        self.oligo = Oligo.objects.create(
+            name="oHistory", sequence="ATCG", created_by=self.user
+        )
+        for i in range(3):
+            self.oligo.name = f"oHistory{i}"
+            self.oligo.save()
+        self.url = f"/api/collection/oligo/{self.oligo.pk}/history/"
+
+    def get_history(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_history_created_first(self):
+        history = self.get_history()
+        self.assertEqual(
+            [entry["activity_type"] for entry in history],
+            ["created", "changed", "changed", "changed"],
+        )
+        self.assertIn(
+            "oHistory2", [change["new_value"] for change in history[1]["changes"]]
+        )
+
+    def test_history_created_only_on_first_page(self):
+        first_page = self.get_history(limit=2)
+        self.assertEqual(
+            [entry["activity_type"] for entry in first_page],
+            ["created", "changed", "changed"],
+        )
+        second_page = self.get_history(limit=2, offset=2)
+        self.assertEqual([entry["activity_type"] for entry in second_page], ["changed"])
+        self.assertIn(
+            "oHistory0",
+            [change["new_value"] for change in second_page[0]["changes"]],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Exports
+# ---------------------------------------------------------------------------
+
+
+class StreamingExportTest(SimpleTestCase):
+    rows = [
+        ["ID", "Name", "Comment"],
+        [1, "oligo1", ""],
+        [2, "oligo\t2", "first line\nsecond line"],
+        [3, None, 'with "quotes"'],
+    ]
+
+    def test_tsv_matches_tablib(self):
+        import tablib
+
+        self.assertEqual(
+            "".join(iter_tsv(self.rows)),
+            tablib.Dataset(*self.rows[1:], headers=self.rows[0]).tsv,
+        )
+
+    def test_xlsx_matches_tablib(self):
+        import io
+
+        import tablib
+        from openpyxl import load_workbook
+
+        file = io.BytesIO()
+        write_xlsx(self.rows, file)
+        worksheet = load_workbook(file).active
+        expected = load_workbook(
+            io.BytesIO(tablib.Dataset(*self.rows[1:], headers=self.rows[0]).xlsx)
+        ).active
+
+        self.assertEqual(
+            list(worksheet.iter_rows(values_only=True)),
+            list(expected.iter_rows(values_only=True)),
+        )
+        self.assertEqual(worksheet.title, expected.title)
+        self.assertEqual(worksheet.freeze_panes, "A2")
+        self.assertTrue(worksheet["A1"].font.bold)
+        self.assertTrue(worksheet["C3"].alignment.wrap_text)
+
+
+class ExportActionTest(TestCase):
+    def setUp(self):
+        from collection.oligo.models import Oligo
+
+        self.model = Oligo
+        self.user = make_user()
+        for i in range(5):
+            Oligo.objects.create(
+                name=f"oligo{i}", sequence="ACGT", created_by=self.user
+            )
+
+    def test_tsv_export_is_streamed(self):
+        response = export_action(self.model, self.model.objects.all(), "tsv")
+        self.assertTrue(response.streaming)
+        self.assertIn(".tsv", response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(
+            [line.split("\t")[1] for line in lines[1:]],
+            [f"oligo{i}" for i in range(5)],
+        )
+
+    def test_xlsx_export(self):
+        import io
+
+        from openpyxl import load_workbook
+
+        response = export_action(self.model, self.model.objects.all(), "xlsx")
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        worksheet = load_workbook(
+            io.BytesIO(b"".join(response.streaming_content))
+        ).active
+        self.assertEqual(worksheet.max_row, 6)
+
+
+class ExportJobTest(APITestCase):
+    def setUp(self):
+        from collection.oligo.models import Oligo
+
+        self.jobs_dir = tempfile.mkdtemp()
+        patcher = patch.object(jobs, "JOBS_DIR", self.jobs_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.jobs_dir, ignore_errors=True)
+
+        self.model = Oligo
+        self.user = make_user()
+        self.client.force_authenticate(user=self.user)
+        self.oligos = [
+            Oligo.objects.create(
+                name=f"oligo{i}", sequence="ACGT", created_by=self.user
+            )
+            for i in range(3)
+        ]
+
+    def test_async_export_is_queued(self):
+        with patch.object(jobs, "run_job") as run_job:
+            response = self.client.get(
+                "/api/navigation/collection/oligo/action/",
+                {"name": "export_action_tsv", "id": 0, "async": "true"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_job.assert_called_once()
+        job_id = response.json()["job_id"]
+        self.assertEqual(jobs.get_job(job_id)["status"], jobs.JOB_PENDING)
+
+        jobs.run_job_now(job_id, *run_job.call_args.args[1:])
+        job = jobs.get_job(job_id)
+        self.assertEqual(job["status"], jobs.JOB_DONE)
+        with open(jobs.get_job_result_path(job_id, ".tsv")) as result_file:
+            lines = result_file.read().splitlines()
+        self.assertEqual(len(lines), len(self.oligos) + 1)
+
+        response = self.client.get(f"/api/common/job/{job_id}/")
+        self.assertEqual(response.data["status"], jobs.JOB_DONE)
+        self.assertEqual(response.data["download_url"], job["result"]["url"])
+        response = self.client.get(f"/api/common/job/{job_id}/", {"download": "true"})
+        self.assertRedirects(
+            response, job["result"]["url"], fetch_redirect_response=False
+        )
+
+    def test_export_job_keeps_filters_and_ordering(self):
+        queryset = self.model.objects.exclude(name="oligo1").order_by("-name")
+        with patch.object(jobs, "run_job") as run_job:
+            response = submit_export_job(
+                None,
+                SimpleNamespace(user=self.user),
+                queryset,
+                "common.actions.write_export_file",
+                "oligos.tsv",
+                file_format="tsv",
+            )
+        job_id = json.loads(response.content)["job_id"]
+        query_name = run_job.call_args.args[2][3]
+        self.assertTrue(os.path.exists(jobs.get_job_input_path(query_name)))
+
+        jobs.run_job_now(job_id, *run_job.call_args.args[1:])
+        self.assertEqual(jobs.get_job(job_id)["status"], jobs.JOB_DONE)
+        self.assertFalse(os.path.exists(jobs.get_job_input_path(query_name)))
+        with open(jobs.get_job_result_path(job_id, ".tsv")) as result_file:
+            rows = result_file.read().splitlines()[1:]
+        self.assertEqual(len(rows), 2)
+        self.assertIn("oligo2", rows[0])
+        self.assertIn("oligo0", rows[1])
+
+    def test_tampered_export_query_not_loaded(self):
+        query_name = save_export_query(self.model.objects.all())
+        with open(jobs.get_job_input_path(query_name), "a") as query_file:
+            query_file.write("x")
+        with patch.object(jobs, "run_job") as run_job:
+            job_id = jobs.submit_job(
+                "common.export.export_job",
+                "common.actions.write_export_file",
+                "collection",
+                "oligo",
+                query_name,
+                ".tsv",
+                "oligos.tsv",
+                {"file_format": "tsv"},
+                user=self.user,
+            )
+        jobs.run_job_now(job_id, *run_job.call_args.args[1:])
+        self.assertEqual(jobs.get_job(job_id)["status"], jobs.JOB_FAILED)
+        self.assertFalse(os.path.exists(jobs.get_job_input_path(query_name)))
+
+    def test_run_export_as_job_counts_up_to_min_objects(self):
+        request = SimpleNamespace(GET={})
+        queryset = self.model.objects.all()
+        with self.assertNumQueries(1):
+            self.assertTrue(run_export_as_job(request, queryset, min_objects=2))
+        self.assertFalse(run_export_as_job(request, queryset, min_objects=4))
+
+    def test_job_of_other_user_not_found(self):
+        with patch.object(jobs, "run_job"):
+            job_id = jobs.submit_job("common.tests.job_succeeding", 1, user=self.user)
+        self.client.force_authenticate(user=make_user(email="other@example.com"))
+        response = self.client.get(f"/api/common/job/{job_id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ---------------------------------------------------------------------------
+# Quick search
+# ---------------------------------------------------------------------------
+
+
+class QuickSearchTest(SimpleTestCase):
+    def setUp(self):
+        from collection.oligo.models import Oligo
+
+        self.model = Oligo
+        self.backend = TrigramSearchBackend()
+
+    def test_icontains_on_search_fields(self):
+        sql = str(
+            IContainsSearchBackend().filter(self.model.objects.all(), "abc").query
+        )
+        # The expressions indexed by get_trigram_indexes
+        self.assertIn('UPPER("collection_oligo"."id"::text) LIKE', sql)
+        self.assertIn('UPPER("collection_oligo"."name"::text) LIKE', sql)
+
+    def test_results_ranked_by_similarity(self):
+        with patch.object(self.backend, "has_trigram", return_value=True):
+            queryset = self.backend.filter(self.model.objects.all(), "abc")
+        sql = str(queryset.query)
+        self.assertIn("GREATEST(SIMILARITY(", sql)
+        self.assertEqual(queryset.query.order_by[0], "-search_rank")
+
+    def test_no_ranking(self):
+        with patch.object(self.backend, "has_trigram", return_value=True):
+            queryset = self.backend.filter(self.model.objects.all(), "abc", rank=False)
+        self.assertNotIn("SIMILARITY", str(queryset.query))
+
+    def test_search_fields_have_trigram_indexes(self):
+        from django.apps import apps
+
+        index_names = []
+        for model in apps.get_models():
+            indexes = {
+                index.name: index
+                for index in model._meta.indexes
+                if index.name.endswith("_trgm")
+            }
+            index_names += indexes
+            fields = self.backend._get_local_fields(model)
+            expected = get_trigram_indexes(
+                model._meta.model_name, [f.name for f in fields]
+            )
+            for index in expected:
+                self.assertIn(index.name, indexes, model._meta.label)
+                self.assertEqual(indexes[index.name].deconstruct(), index.deconstruct())
+        self.assertEqual(len(index_names), len(set(index_names)))
+
+    def test_custom_search_fields(self):
+        with patch.object(self.backend, "has_trigram", return_value=True):
+            queryset = self.backend.filter(
+                self.model.objects.all(), "abc", search_fields=["name"]
+            )
+        sql = str(queryset.query)
+        self.assertNotIn('"collection_oligo"."id"::text', sql)
+        self.assertNotIn("GREATEST", sql)
+
+
+# ---------------------------------------------------------------------------
+# Search suggestions
+# ---------------------------------------------------------------------------
+
+
+class SuggestionIndexTest(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        from collection.oligo.models import Oligo
+
+        patcher = patch("common.suggestions.SUGGESTIONS_CACHE", "default")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        caches["default"].clear()
+        self.model = Oligo
+        self.values = ["pCMV", "Alpha", "beta", "alphabet", "", "pcmv2", "Alpha"]
+        self.builds = 0
+        self.index = suggestions.SuggestionIndex("test", self._get_values, [Oligo])
+
+    def _get_values(self):
+        self.builds += 1
+        return self.values
+
+    def test_prefix_matches_first(self):
+        self.assertEqual(self.index.search("alpha"), ["Alpha", "alphabet"])
+        self.assertEqual(self.index.search("bet"), ["beta", "alphabet"])
+        self.assertEqual(self.index.search("PCMV"), ["pCMV", "pcmv2"])
+        self.assertEqual(self.index.search("x"), [])
+
+    def test_index_is_cached(self):
+        self.index.search("alpha")
+        self.index.search("beta")
+        self.assertEqual(self.builds, 1)
+
+    def test_index_is_built_for_each_lookup_by_default(self):
+        with patch("common.suggestions.SUGGESTIONS_CACHE", None):
+            index = suggestions.SuggestionIndex("test", self._get_values, [])
+            self.assertEqual(index.search("alpha"), ["Alpha", "alphabet"])
+            self.values = ["Alpha", "alpine"]
+            self.assertEqual(index.search("alp"), ["Alpha", "alpine"])
+        self.assertEqual(self.builds, 2)
+
+    def test_index_is_refreshed_when_objects_change(self):
+        self.index.search("alpha")
+        self.values = ["Alpha", "alpine"]
+        self.assertEqual(self.index.search("alp"), ["Alpha", "alphabet"])
+
+        suggestions.invalidate_suggestions(self.model)
+        self.assertEqual(self.index.search("alp"), ["Alpha", "alpine"])
+        self.assertEqual(self.builds, 2)
+
+    def test_receivers_connected_to_index_models_only(self):
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models.signals import post_delete, post_save
+
+        from .signals import suggestions_model_changed_receiver
+
+        for signal in [post_save, post_delete]:
+            self.assertIn(
+                suggestions_model_changed_receiver,
+                signal._live_receivers(self.model),
+            )
+            self.assertNotIn(
+                suggestions_model_changed_receiver,
+                signal._live_receivers(ContentType),
+            )
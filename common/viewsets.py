@@ -1,15 +1,18 @@
+from collections import defaultdict
 from importlib import import_module
 
-from django.apps import apps
 from django.conf import settings
 from django.contrib.admin.models import LogEntry
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.core.paginator import EmptyPage, Paginator
 from django.core.validators import validate_slug
-from django.db.models import F, Q
+from django.db import connection
+from django.db.models import F
 from django.db.models.expressions import Window
 from django.db.models.functions import DenseRank
+from django.http import HttpResponseRedirect
 from django.utils.text import capfirst
 from djangoql.queryset import apply_search as apply_djangoql_search
 from djangoql.serializers import SuggestionsAPISerializer
@@ -19,7 +22,11 @@ from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.viewsets import GenericViewSet
 
-from .paginators import StandardResultsSetPagination
+from .jobs import JOB_DONE, get_job, user_can_access_job
+from .navigation import get_registered_model, get_user_navigation
+from .paginators import KeysetResultsSetPagination, StandardResultsSetPagination
+from .query_planning import apply_query_plan, get_query_plan
+from .quick_search import quick_search
 from .serializers import (
     ItemSerializer,
     ListSerializer,
@@ -36,6 +43,9 @@ User = get_user_model()
 DOCS_URL = getattr(settings, "DOCS_URL", "")
 IMPRESSUM_URL = getattr(settings, "IMPRESSUM_URL", "")
 DATA_PROTECTION_URL = getattr(settings, "DATA_PROTECTION_URL", "")
+# Add the number of DB queries run by a request to the X-Query-Count header
+# of the responses of ModelViewSet
+API_QUERY_COUNT_HEADER = getattr(settings, "API_QUERY_COUNT_HEADER", settings.DEBUG)
 
 
 def get_query_schema(model):
@@ -46,6 +56,19 @@ def get_query_schema(model):
     )
 
 
+def get_list_serializer_field_names(model):
+    """Return the fields serialized in the list view of a model"""
+
+    return [
+        f
+        if getattr(getattr(model, f, None), "use_api", False)
+        else f.replace("_formatted", "")
+        for f in getattr(model, "_list_display_frozen", [])
+        + getattr(model, "_list_display", [])
+        + getattr(model, "_api_list_fields", [])
+    ]
+
+
 class PassthroughRenderer(renderers.BaseRenderer):
     """
     Return data from a viewset action as is returned by the viewset,
@@ -60,6 +83,48 @@ class PassthroughRenderer(renderers.BaseRenderer):
         return data
 
 
+def get_log_entry_representations(log_entries):
+    """
+    Return the representations of the objects edited in a list of log entries,
+    keyed by (content_type_id, object_id). Objects are fetched with one query
+    per model, and only their _representation_field
+    """
+
+    object_ids = defaultdict(set)
+    for log_entry in log_entries:
+        object_ids[log_entry.content_type_id].add(log_entry.object_id)
+
+    representations = {}
+    for content_type_id, ids in object_ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        representation_field = getattr(model, "_representation_field", "")
+        if model is None or not representation_field:
+            continue
+
+        pk_field = model._meta.pk
+        pks = {}
+        for object_id in ids:
+            try:
+                pks[pk_field.to_python(object_id)] = object_id
+            except ValidationError:
+                continue
+
+        queryset = model._default_manager.all()
+        try:
+            model._meta.get_field(representation_field)
+        except FieldDoesNotExist:
+            pass
+        else:
+            queryset = queryset.only(pk_field.name, representation_field)
+
+        for pk, obj in queryset.in_bulk(list(pks)).items():
+            representations[(content_type_id, pks[pk])] = getattr(
+                obj, representation_field
+            )
+
+    return representations
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Show user information"""
 
@@ -159,10 +224,45 @@ class UserViewSet(viewsets.ModelViewSet):
             )
         )
 
-        data = LogEntrySerializer(queryset, many=True).data
+        log_entries = list(queryset)
+        data = LogEntrySerializer(
+            log_entries,
+            many=True,
+            context={"representations": get_log_entry_representations(log_entries)},
+        ).data
         return Response(data)
 
 
+class JobViewSet(viewsets.ViewSet):
+    """Show the status of a background job, e.g. an export, of the logged
+    user. With download=true, redirect to its result file once done"""
+
+    def retrieve(self, request, pk=None):
+        job = get_job(pk)
+        if not user_can_access_job(request.user, job):
+            return Response(
+                {"detail": "Job not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        result = job.get("result") or {}
+        download_url = result.get("url") if job["status"] == JOB_DONE else None
+        if download_url and request.GET.get("download", "").lower() == "true":
+            return HttpResponseRedirect(download_url)
+
+        return Response(
+            {
+                "id": job["id"],
+                "name": job.get("name", ""),
+                "status": job["status"],
+                "error": job.get("error", ""),
+                "created": job.get("created"),
+                "updated": job.get("updated"),
+                "file_name": result.get("file_name", ""),
+                "download_url": download_url,
+            }
+        )
+
+
 class NavigationBaseViewSet(GenericViewSet):
     """Show frontend layout information"""
 
@@ -180,19 +280,10 @@ class NavigationBaseViewSet(GenericViewSet):
         # Perform the lookup filtering.
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
 
-        # Disabled this because it was raising an error for the advanced_search_introspection
-        # view, it
-
-        # assert lookup_url_kwarg in self.kwargs, (
-        #     "Expected view %s to be called with a URL keyword argument "
-        #     'named "%s". Fix your URL conf, or set the `.lookup_field` '
-        #     "attribute on the view correctly."
-        #     % (self.__class__.__name__, lookup_url_kwarg)
-        # )
-
         filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
         obj = next(
-            (e for e in queryset if str(e.pk) == filter_kwargs.get("pk", None)), None
+            (e for e in queryset if str(e["id"]) == filter_kwargs.get("pk", None)),
+            None,
         )
 
         # May raise a permission denied
@@ -202,76 +293,25 @@ class NavigationBaseViewSet(GenericViewSet):
 
     def filter_queryset(self, queryset, request=None):
         """
-        Filter queryset of content types and return only those
-        for which the logged user has add/change/view permissions
-        is the model's _show_in_frontend attribute is True
-
-        Also sort result by app_label and model, it is nicer here
+        Return the content types of the models shown in the frontend for
+        which the logged user has add/change/view permissions, sorted by
+        app_label and model, already serialized.
 
+        The result is cached per user only if NAVIGATION_CACHE is set, see
+        common.navigation
         """
 
-        queryset = queryset.order_by("app_label", "model")
-        filtered = []
-
-        for ct in queryset:
-            # Check whether user has any perms for the given app
-            has_module_perms = request.user.has_module_perms(ct.app_label)
-            if not has_module_perms:
-                continue
-
-            # Check whether user has any perms for the given model
-            perms = {
-                action: request.user.has_perm(
-                    f"{ct.app_label}.{f'{action}_{ct.model}'}"
-                )
-                for action in ["add", "change", "view"]
-            }
-            if True not in perms.values():
-                continue
-
-            # Return model
-            try:
-                model = ct.model_class()
-
-                # If model has _show_in_frontend
-                if getattr(model, "_show_in_frontend", False):
-                    # Set additional attributes in ct
-                    ct.model_name = model._meta.object_name
-                    ct.model_verbose_name = (
-                        capfirst(model._meta.verbose_name)
-                        if isinstance(model._show_in_frontend, bool)
-                        else getattr(
-                            model, "_frontend_verbose_name", model._meta.verbose_name
-                        )
-                    )
-                    ct.model_verbose_plural = (
-                        capfirst(model._meta.verbose_name_plural)
-                        if isinstance(model._show_in_frontend, bool)
-                        else getattr(
-                            model,
-                            "_frontend_verbose_plural",
-                            model._meta.verbose_name_plural,
-                        )
-                    )
-                    ct.app_verbose_name = apps.get_app_config(ct.app_label).verbose_name
-                    ct.permissions = perms
-                    filtered.append(ct)
-            except Exception:
-                continue
-
-        return filtered
+        return get_user_navigation(request.user)
 
     def get_related_model(self, kwargs):
-        return ContentType.objects.get(**kwargs).model_class()
+        return get_registered_model(kwargs["app_label"], kwargs["model"])
 
 
 class NavigationListViewSet(mixins.ListModelMixin, NavigationBaseViewSet):
     def list(self, request, **kwargs):
         """The same as super but accepts a request too"""
 
-        queryset = self.filter_queryset(self.get_queryset(), request)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return Response(self.filter_queryset(self.get_queryset(), request))
 
 
 class NavigationViewSet(NavigationBaseViewSet):
@@ -530,17 +570,73 @@ class ModelViewSet(viewsets.ModelViewSet):
 
     serializer_class = ListSerializer
     pagination_class = StandardResultsSetPagination
+    cursor_pagination_class = KeysetResultsSetPagination
     serializer_list_class = ListSerializer
     serializer_item_class = ItemSerializer
 
+    @property
+    def paginator(self):
+        """
+        Use cursor pagination, instead of page numbers, if requested with
+        pagination=cursor or when following a cursor link
+        """
+
+        if not hasattr(self, "_paginator"):
+            query_params = self.request.query_params
+            if (
+                query_params.get("pagination") == "cursor"
+                or self.cursor_pagination_class.cursor_query_param in query_params
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def dispatch(self, request, *args, **kwargs):
+        if not API_QUERY_COUNT_HEADER:
+            return super().dispatch(request, *args, **kwargs)
+
+        query_count = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            response = super().dispatch(request, *args, **kwargs)
+        response["X-Query-Count"] = str(query_count)
+        return response
+
     def get_queryset(self):
         # Get requested model based on the url parameters app_label and model
         # and set it in self.model and self.queryset
-        self.model = ContentType.objects.get(
-            app_label=self.kwargs["app_label"], model=self.kwargs["model"]
+        self.model = ContentType.objects.get_by_natural_key(
+            self.kwargs["app_label"], self.kwargs["model"]
         ).model_class()
         self.queryset = self.model.objects.all().order_by("-id")
-        return super().get_queryset()
+        queryset = super().get_queryset()
+        if query_plan := self.get_query_plan():
+            queryset = apply_query_plan(queryset, query_plan)
+        return queryset
+
+    def get_query_plan(self):
+        """
+        Return the relations to fetch and the columns to load for the
+        fields rendered by the current action
+        """
+
+        if self.action == "list":
+            field_names = (
+                getattr(self.model, "_list_display_frozen", [])
+                + getattr(self.model, "_list_display", [])
+                + getattr(self.model, "_api_list_fields", [])
+            )
+        elif self.action == "autocomplete":
+            field_names = []
+        else:
+            return None
+        return get_query_plan(self.model, tuple(field_names))
 
     def order_queryset(self, queryset, request=None, **kwargs):
         ordering = request.GET.getlist("ordering")
@@ -567,10 +663,13 @@ class ModelViewSet(viewsets.ModelViewSet):
             and view_name in ["autocomplete", "list"]
             and (search_value := request.GET.getlist("search", [""])[0])
         ):
-            q_filter_ = Q()
-            for field_name in getattr(queryset.model, "_search_fields", []):
-                q_filter_ |= Q(**{f"{field_name}__icontains": search_value})
-            queryset = queryset.filter(q_filter_)
+            # Results are ranked by relevance, unless paginated by cursor,
+            # which requires an ordering by fields
+            queryset = quick_search(
+                queryset,
+                search_value,
+                rank=not isinstance(self.paginator, KeysetResultsSetPagination),
+            )
 
         return queryset
 
@@ -615,19 +714,40 @@ class ModelViewSet(viewsets.ModelViewSet):
         return Response(obj.readonly_fields(request))
 
     @rest_action(detail=True, methods=["get"])
-    def history(self, *args, **kwargs):
-        """Returns the history of an object"""
+    def history(self, request, *args, **kwargs):
+        """Returns the history of an object, optionally only the limit
+        most recent changes after offset. The creation of the object comes
+        first and is only included in the first page, i.e. if offset is 0"""
+
+        try:
+            limit = request.GET.get("limit")
+            limit = int(limit) if limit else None
+            offset = int(request.GET.get("offset") or 0)
+            if (limit is not None and limit < 0) or offset < 0:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"error": "limit and offset must be positive integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         obj = self.get_object()
-        created_history_obj = obj.history.filter(history_type="+").earliest()
-        ret = [
-            {
-                "timestamp": created_history_obj.history_date.isoformat(),
-                "activity_user": created_history_obj.history_user.id,
-                "activity_user_pretty": str(created_history_obj.history_user),
-                "activity_type": "created",
-            }
-        ] + [
+        ret = []
+        if offset == 0:
+            created_history_obj = (
+                obj.history.filter(history_type="+")
+                .select_related("history_user")
+                .earliest()
+            )
+            ret.append(
+                {
+                    "timestamp": created_history_obj.history_date.isoformat(),
+                    "activity_user": created_history_obj.history_user.id,
+                    "activity_user_pretty": str(created_history_obj.history_user),
+                    "activity_type": "created",
+                }
+            )
+        ret += [
             {
                 "timestamp": change.timestamp.isoformat(),
                 "activity_user": change.activity_user.id,
@@ -643,7 +763,7 @@ class ModelViewSet(viewsets.ModelViewSet):
                     for field_change in change.field_changes
                 ],
             }
-            for change in obj.history_changes
+            for change in obj.get_history_changes(limit=limit, offset=offset)
         ]
 
         return Response(ret)
@@ -653,14 +773,7 @@ class ModelViewSet(viewsets.ModelViewSet):
         serializer_class = None
 
         if self.action == "list":
-            field_names = [
-                f
-                if getattr(getattr(self.model, f, None), "use_api", False)
-                else f.replace("_formatted", "")
-                for f in getattr(self.model, "_list_display_frozen", [])
-                + getattr(self.model, "_list_display", [])
-                + getattr(self.model, "_api_list_fields", [])
-            ]
+            field_names = get_list_serializer_field_names(self.model)
             serializer_class = self.serializer_list_class
         elif self.action == "retrieve":
             field_names = (
@@ -1,6 +1,7 @@
 from rest_framework import routers
 
 from common.viewsets import (
+    JobViewSet,
     ModelViewSet,
     NavigationListViewSet,
     NavigationViewSet,
@@ -9,6 +10,7 @@ from common.viewsets import (
 
 router = routers.DefaultRouter()
 router.register(r"common/user", UserViewSet, basename="user")
+router.register(r"common/job", JobViewSet, basename="job")
 router.register(r"navigation", NavigationListViewSet, basename="navigation-tree")
 router.register(
     r"navigation/(?P<app_label>[^/.]+)/(?P<model>[^/.]+)",
@@ -3,7 +3,6 @@ import os
 from datetime import timedelta
 
 from background_task.models import CompletedTask
-from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
@@ -11,6 +10,8 @@ from django.urls import reverse
 from django.utils import timezone
 
 from approval.models import Approval
+from collection.shared.map_dna.utils.oligo_search import refresh_oligo_index
+from common.history_pruning import prune_duplicate_history
 
 User = get_user_model()
 SITE_TITLE = getattr(settings, "SITE_TITLE", "BenchBaze")
@@ -77,41 +78,6 @@ if (
 CompletedTask.objects.all().delete()
 
 
-def delete_dup_hist_rec_ids(model, time_delta):
-    """Delete history items that differ just by last_changed_date_time"""
-
-    def pairwise(iterable):
-        """Create pairs of consecutive items from
-        iterable"""
-
-        import itertools
-
-        a, b = itertools.tee(iterable)
-        next(b, None)
-        return zip(a, b)
-
-    items_to_check = model.objects.filter(last_changed_date_time__gte=time_delta)
-
-    hist_item_ids_delete = []
-
-    for item in items_to_check:
-        history_records = item.history.all()
-        if history_records.count() > 1:
-            history_pairs = pairwise(history_records)
-            for history_element in history_pairs:
-                newer_record = history_element[0]
-                older_record = history_element[1]
-                delta = newer_record.diff_against(older_record)
-                changed_fields = delta.changed_fields
-                if (
-                    "last_changed_date_time" in changed_fields
-                    and len(changed_fields) == 1
-                ):
-                    hist_item_ids_delete.append(delta.new_record.history_id)
-
-    return hist_item_ids_delete
-
-
 def cleanup_temp_files(temp_dir, days=8):
     """Delete all files in the temp directory that are older than days"""
 
@@ -133,13 +99,10 @@ def cleanup_temp_files(temp_dir, days=8):
 cleanup_temp_files(os.path.join(settings.MEDIA_ROOT, "temp"))
 
 
+# Delete historical records that differ just by last_changed_date_time
 NOW_MINUS_8DAYS = timezone.now() - timedelta(days=8)
-for model in [
-    m
-    for m in apps.get_models()
-    if getattr(m, "history", False) and getattr(m, "last_changed_date_time", False)
-]:
-    ids_to_delete = delete_dup_hist_rec_ids(model, NOW_MINUS_8DAYS)
-    if ids_to_delete:
-        history_records = model.history.filter(history_id__in=ids_to_delete)
-        history_records.delete()
+prune_duplicate_history(since=NOW_MINUS_8DAYS)
+
+# Repair the oligo index used to find oligos in maps, e.g. after oligos were
+# changed without signals
+refresh_oligo_index()
@@ -1,26 +1,27 @@
 import zipfile
 
 from bs4 import BeautifulSoup
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
 from django.template.loader import get_template
 from django.utils import timezone
 
+from common.export import run_export_as_job, submit_export_job
 from formz.models import Header
 
 User = get_user_model()
+# Exports of at least this number of objects are run as background jobs
+FORMZ_EXPORT_JOB_MIN_OBJECTS = getattr(settings, "FORMZ_EXPORT_JOB_MIN_OBJECTS", 50)
 
 
-@admin.action(description="To Formblatt Z")
-def formz_as_html(modeladmin, request, queryset):
-    """Export ForblattZ as html"""
+def write_formz_zip(queryset, file, map_attachment_type="none"):
+    """Write the Formblatt Z of each object in queryset, as html, into a zip
+    file"""
 
     # Get FormZ header
-    if Header.objects.all().first():
-        formz_header = Header.objects.all().first()
-    else:
-        formz_header = None
+    formz_header = Header.objects.all().first()
 
     # Get PI
     try:
@@ -28,22 +29,11 @@ def formz_as_html(modeladmin, request, queryset):
     except Exception:
         pi = None
 
-    # Create response
-    model_name = queryset[0].__class__.__name__
-    response = HttpResponse(content_type="application/zip")
-    response["Content-Disposition"] = (
-        'attachment; filename="formblattz_{}_{}.zip'.format(
-            model_name.lower(), timezone.now().strftime("%Y%m%d%H%M%S")
-        )
-    )
-
+    model_name = queryset.model.__name__
     template = get_template("admin/formz/formz_for_export.html")
     # Generate zip file
-    with zipfile.ZipFile(response, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zip_file:
         for obj in queryset:
-            map_attachment_type = request.POST.get(
-                "map_attachment_type", default="none"
-            )
             html = template.render(
                 {
                     "object": obj,
@@ -56,4 +46,31 @@ def formz_as_html(modeladmin, request, queryset):
             html = html.prettify("utf-8")
             zip_file.writestr(f"{model_name}_{obj.id}.html", html)
 
+
+@admin.action(description="To Formblatt Z")
+def formz_as_html(modeladmin, request, queryset):
+    """Export ForblattZ as html"""
+
+    model_name = queryset.model.__name__
+    file_name = "formblattz_{}_{}.zip".format(
+        model_name.lower(), timezone.now().strftime("%Y%m%d%H%M%S")
+    )
+    map_attachment_type = request.POST.get("map_attachment_type", default="none")
+
+    # Rendering many objects takes long, therefore do it in the background
+    if run_export_as_job(request, queryset, FORMZ_EXPORT_JOB_MIN_OBJECTS):
+        return submit_export_job(
+            modeladmin,
+            request,
+            queryset,
+            "formz.actions.write_formz_zip",
+            file_name,
+            map_attachment_type=map_attachment_type,
+        )
+
+    # Create response
+    response = HttpResponse(content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    write_formz_zip(queryset, response, map_attachment_type)
+
     return response
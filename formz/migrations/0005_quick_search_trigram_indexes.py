@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 21:44
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("formz", "0004_remove_species_name_for_search"),
+        ("common", "0006_trigram_extension"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sequencefeature",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "id", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sequencefeat_id_ac7ad1_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sequencefeature",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(
+                        django.db.models.functions.comparison.Cast(
+                            "name", models.TextField()
+                        )
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="sequencefeat_name_89462e_trgm",
+            ),
+        ),
+    ]
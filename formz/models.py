@@ -6,6 +6,8 @@ from django.urls import reverse
 from django.utils.html import format_html, mark_safe
 from import_export.fields import Field as ImportExportField
 
+from common.quick_search import get_trigram_indexes
+
 AUTH_USER_MODEL = getattr(settings, "AUTH_USER_MODEL", "auth.User")
 
 
@@ -365,11 +367,13 @@ class SequenceFeature(models.Model):
     class Meta:
         verbose_name = "sequence feature"
         verbose_name_plural = "sequence features"
+        indexes = get_trigram_indexes("sequencefeature", ["id", "name"])
         ordering = [
             "name",
         ]
 
     _show_in_frontend = True
+    _str_fields = ["name", "common_feature", "donor_organism"]
 
     name = models.CharField(
         "name",
@@ -507,6 +511,7 @@ class SequenceFeature(models.Model):
 
     donor_species_names_formatted.use_api = True
     donor_species_names_formatted.field_type = models.CharField
+    donor_species_names_formatted.fields = ["donor_organism"]
 
     def donor_species_risk_groups(self):
         species_risk_groups = []
@@ -518,6 +523,7 @@ class SequenceFeature(models.Model):
 
     donor_species_risk_groups.use_api = True
     donor_species_risk_groups.field_type = models.CharField
+    donor_species_risk_groups.fields = ["donor_organism"]
 
     def donor_species_max_risk_group(self):
         species_risk_groups = [0]
@@ -529,6 +535,7 @@ class SequenceFeature(models.Model):
 
     donor_species_max_risk_group.use_api = True
     donor_species_max_risk_group.field_type = models.IntegerField
+    donor_species_max_risk_group.fields = ["donor_organism"]
 
     def get_admin_change_url(self):
         return reverse("admin:formz_sequencefeature_change", args=[self.id])
@@ -538,18 +545,21 @@ class SequenceFeature(models.Model):
 
     nuc_acid_risk_formatted.use_api = True
     nuc_acid_risk_formatted.field_type = models.CharField
+    nuc_acid_risk_formatted.fields = ["nuc_acid_risk"]
 
     def zkbs_oncogene_formatted(self):
         return self.zkbs_oncogene.name if self.zkbs_oncogene else ""
 
     zkbs_oncogene_formatted.use_api = True
     zkbs_oncogene_formatted.field_type = models.CharField
+    zkbs_oncogene_formatted.fields = ["zkbs_oncogene"]
 
     def nuc_acid_purity_formatted(self):
         return self.nuc_acid_purity.english_name if self.nuc_acid_purity else ""
 
     nuc_acid_purity_formatted.use_api = True
     nuc_acid_purity_formatted.field_type = models.CharField
+    nuc_acid_purity_formatted.fields = ["nuc_acid_purity"]
 
 
 class SequenceFeatureAlias(models.Model):
@@ -199,6 +199,13 @@ export const getCreateModelStore = (appLabel, modelName) => {
                 responseType: "blob"
               }
             );
+            // Large exports run as background jobs, wait for them to finish
+            // and download their result
+            if (response.status === 202) {
+              const job = JSON.parse(await response.data.text());
+              await this.downloadJobResult(job.status_url);
+              return;
+            }
             // Get file name from response
             const fileName = response.headers["content-disposition"]
               .split('filename="')[1]
@@ -221,6 +228,25 @@ export const getCreateModelStore = (appLabel, modelName) => {
           }
         },
 
+        async downloadJobResult(statusUrl, pollInterval = 2000) {
+          // Poll the status of a background job until it is done
+          let job;
+          do {
+            await new Promise((resolve) => setTimeout(resolve, pollInterval));
+            const response = await axios.get(statusUrl);
+            job = response.data;
+          } while (job.status === "pending" || job.status === "running");
+          if (job.status !== "done") {
+            throw new Error(job.error || "Background job failed");
+          }
+          const link = document.createElement("a");
+          link.href = job.download_url;
+          link.setAttribute("download", job.file_name);
+          document.body.appendChild(link);
+          link.click();
+          document.body.removeChild(link);
+        },
+
         async getItem(id) {
           try {
             const response = await axios.get(`${this.api.endpointMain}/${id}/`);
@@ -1,6 +1,7 @@
 from djangoql.schema import DjangoQLSchema, StrField
 
 from common.search import check_search_length
+from common.suggestions import SuggestionIndex
 
 from .models import MsdsForm
 
@@ -10,23 +11,22 @@ class MsdsFormSearchFieldLabel(StrField):
     model = MsdsForm
     model_fieldname = "label"
     suggest_options = True
-    limit_options = 20
 
     def get_options(self, search):
-        filter_search = {f"{self.model_fieldname}__icontains": search}
+        """Suggest the descriptions of the MSDS forms that contain search,
+        those that start with it first. Suggestions are paginated by the
+        view"""
+
         if default_option := check_search_length(search):
             return default_option
 
-        records = list(
-            self.model.objects.filter(**filter_search)
-            .distinct()
-            .order_by("label")[: self.limit_options + 1]
-        )
-
-        descriptions = [r.file_name_description for r in records]
-        if len(descriptions) > self.limit_options:
-            return descriptions[: self.limit_options] + ["..."]
-        return descriptions
+        return SuggestionIndex(
+            f"{self.model._meta.label_lower}.file_name_description",
+            lambda: [
+                form.file_name_description for form in self.model.objects.only("label")
+            ],
+            [self.model],
+        ).search(search)
 
     def get_lookup_value(self, value):
         return value.replace(" ", "_")
@@ -21,6 +21,7 @@ from django.utils.encoding import smart_str
 from django.utils.safestring import mark_safe
 
 from common.actions import export_action
+from common.export import get_export_file_name
 
 from .forms import MassUpdateOrderForm
 
@@ -100,30 +101,28 @@ def change_order_status_to_delivered(modeladmin, request, queryset):
             order.save()
 
 
-def _export_action_chemical(source, queryset, file_format):
-    response = export_action(
+def _export_action_chemical(source, request, queryset, file_format):
+    return export_action(
         source,
         queryset,
         file_format,
         export_field_names="_export_chemical_field_names",
         export_custom_fields="_export_chemical_custom_fields",
+        request=request,
+        file_name=get_export_file_name(queryset, file_format, name="Chemical"),
     )
-    response["Content-Disposition"] = response["Content-Disposition"].replace(
-        "Order_", "Chemical_"
-    )
-    return response
 
 
 @admin.action(description="To chemicals as XLSX")
 def export_action_chemical_xlsx(source, request, queryset):
     """Create export resource on the fly and export as XLSX"""
-    return _export_action_chemical(source, queryset, "xlsx")
+    return _export_action_chemical(source, request, queryset, "xlsx")
 
 
 @admin.action(description="To chemicals as TSV")
 def export_action_chemical_tsv(source, request, queryset):
     """Create export resource on the fly and export as TSV"""
-    return _export_action_chemical(source, queryset, "tsv")
+    return _export_action_chemical(source, request, queryset, "tsv")
 
 
 @admin.action(description="Mass update")
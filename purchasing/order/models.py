@@ -180,6 +180,7 @@ class Order(SaveWithoutHistoricalRecordMixin, HistoryFieldMixin):
     }
     _show_in_frontend = True
     _backup = True
+    _str_fields = ["id", "part_description"]
 
     # Export for orders
     _export_field_names = (
@@ -42,7 +42,6 @@ class OrderSearchFieldSupplier(SearchFieldWithOptions):
     name = "supplier"
     model = Order
     model_fieldname = name
-    limit_options = 10
 
 
 class OrderSearchFieldPartDescription(SearchFieldWithOptions):
@@ -51,7 +50,6 @@ class OrderSearchFieldPartDescription(SearchFieldWithOptions):
     name = "part_description"
     model = Order
     model_fieldname = name
-    limit_options = 10
 
 
 class OrderSearchFieldHazardousPregnancy(StrField):
@@ -96,7 +94,6 @@ class OrderSearchFieldMsdsForm(SearchFieldWithOptions):
     name = "msds_form"
     model = MsdsForm
     model_fieldname = "label"
-    limit_options = 10
 
 
 class OrderSearchFieldHasGhsSymbol(BoolField):